@@ -0,0 +1,505 @@
+"""Benchmarks of the dailylog-lib hot paths.
+
+Every case is timed in rounds of a fixed number of calls, the best round
+gives the calls per second. A separate tracemalloc pass reports the peak
+number of bytes allocated by a single call. Measurements can be saved to a JSON
+baseline and later runs compared against it, a case whose calls per second
+dropped by more than the threshold is reported and makes the run fail.
+
+Baselines only compare runs on the same machine and Python version::
+
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stderr
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.logger import Logger, log_label, log_level
+from dailylog_lib.record import CONST_DAY
+
+CONST_ALLOC_SAMPLES = 200
+CONST_THRESHOLD = 0.25
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_LOG_FILES = 100
+DEFAULT_REPEAT = 5
+HOT_CALLS = 2000
+HOT_ENTRIES = 1000
+SAVE_CALLS = 100
+LOAD_ROUNDS = 3
+MESSAGE = "benchmark message"
+
+
+class Case(NamedTuple):
+    """A benchmarked call."""
+
+    name: str
+    call: Callable[[], object]
+    number: int
+
+
+class Measurement(NamedTuple):
+    """Measurements of a case."""
+
+    name: str
+    ops: float
+    alloc: float
+
+
+class Workspace:
+    """Temporary config, cache and log files of a benchmark run."""
+
+    def __init__(self, root: Path, log_files: int) -> None:
+        """Class constructor writing the config file.
+
+        Parameters
+        ----------
+        root : Path
+            Empty directory holding the files
+        log_files : int
+            Number of log files written round robin
+        """
+        self.root = root
+        self.config = root / "dailylog.json"
+        default_log = root / "default.log"
+        self.config.write_text(
+            json.dumps({"default_log": str(default_log), "version": 1}),
+        )
+        self.log_files = [
+            str(root / "logs" / "bench-{0}.log".format(index))
+            for index in range(max(1, log_files))
+        ]
+        (root / "logs").mkdir()
+
+    def cache_file(self, entries: int) -> Path:
+        """Return a JSON cache file holding entries records.
+
+        Parameters
+        ----------
+        entries : int
+            Number of records
+
+        Returns
+        -------
+        Path
+            The cache file
+        """
+        path = self.root / "cache-{0}.json".format(entries)
+        if not path.exists():
+            now = int(time.time())
+            record = {"shown": now, "suppressed": 0, "expires": now + CONST_DAY}
+            keys = ("key-{0}".format(index) for index in range(entries))
+            document = {"version": 1, "entries": dict.fromkeys(keys, record)}
+            path.write_text(json.dumps(document))
+        return path
+
+    def cache(self, entries: int, **kwargs: bool | int | str) -> Cache:
+        """Return a Cache of a cache file holding entries records.
+
+        Parameters
+        ----------
+        entries : int
+            Number of records
+        kwargs : dict
+            Keyword arguments of Cache
+
+        Returns
+        -------
+        Cache
+            The unloaded cache
+        """
+        return Cache(
+            config=str(self.config),
+            cache=str(self.cache_file(entries)),
+            **kwargs,
+        )
+
+    def logger(self, entries: int) -> Logger:
+        """Return a Logger of a cache file holding entries records.
+
+        Parameters
+        ----------
+        entries : int
+            Number of records
+
+        Returns
+        -------
+        Logger
+            The logger
+        """
+        cache_fn = str(self.cache_file(entries))
+        return Logger(config=str(self.config), cache=cache_fn)
+
+    def rotating(self) -> Iterator[str]:
+        """Yield the log files round robin forever.
+
+        Yields
+        ------
+        str
+            Path name of a log file
+        """
+        while True:  # noqa: WPS457
+            yield from self.log_files
+
+
+def hot_cases(space: Workspace) -> List[Case]:
+    """Return the cases of the per message paths.
+
+    Parameters
+    ----------
+    space : Workspace
+        The benchmark files
+
+    Returns
+    -------
+    List[Case]
+        The cases
+    """
+    log_fn = space.log_files[0]
+    logger = space.logger(HOT_ENTRIES)
+    batched = space.cache(HOT_ENTRIES, flush_count=0)
+    write_through = space.cache(HOT_ENTRIES)
+    files = space.rotating()
+    return [
+        Case("Cache.t_stamp", Cache.t_stamp, HOT_CALLS),
+        Case("log_level", lambda: log_level("info"), HOT_CALLS),
+        Case("log_label", lambda: log_label("20"), HOT_CALLS),
+        Case(
+            "Cache.append_daily",
+            lambda: Cache.append_daily("INFO", MESSAGE, log_fn),
+            HOT_CALLS,
+        ),
+        Case(
+            "Cache.append_daily {0} files".format(len(space.log_files)),
+            lambda: Cache.append_daily("INFO", MESSAGE, next(files)),
+            HOT_CALLS,
+        ),
+        Case(
+            "Logger.log quiet",
+            lambda: logger.log(MESSAGE, logfn=log_fn, quiet=True),
+            HOT_CALLS,
+        ),
+        Case("Logger.log", lambda: logger.log(MESSAGE, logfn=log_fn), HOT_CALLS),
+        Case(
+            "Cache.log_message quiet",
+            lambda: batched.log_message("key-1", MESSAGE, logfn=log_fn, quiet=True),
+            HOT_CALLS,
+        ),
+        Case(
+            "Cache.log_message",
+            lambda: batched.log_message("key-1", MESSAGE, logfn=log_fn),
+            HOT_CALLS,
+        ),
+        Case(
+            "Cache.log_message write through",
+            lambda: write_through.log_message("key-1", MESSAGE, logfn=log_fn),
+            SAVE_CALLS,
+        ),
+    ]
+
+
+def load_cases(space: Workspace, sizes: List[int]) -> List[Case]:
+    """Return the cases constructing and loading caches of the given sizes.
+
+    Parameters
+    ----------
+    space : Workspace
+        The benchmark files
+    sizes : List[int]
+        Numbers of cached records
+
+    Returns
+    -------
+    List[Case]
+        The cases
+    """
+    return [
+        Case(
+            "Cache load {0} entries".format(size),
+            _loader(space, size),
+            1,
+        )
+        for size in sizes
+    ]
+
+
+def _loader(space: Workspace, size: int) -> Callable[[], object]:
+    """Return a call constructing a Cache and loading its records.
+
+    Parameters
+    ----------
+    space : Workspace
+        The benchmark files
+    size : int
+        Number of cached records
+
+    Returns
+    -------
+    Callable[[], object]
+        The call
+    """
+    space.cache_file(size)
+
+    def load() -> object:  # noqa: WPS430
+        with space.cache(size, flush_count=0) as cache:
+            return len(cache.store)
+
+    return load
+
+
+def measure(case: Case, repeat: int) -> Measurement:
+    """Return the best calls per second and the peak allocation per call.
+
+    Parameters
+    ----------
+    case : Case
+        The case
+    repeat : int
+        Number of timed rounds
+
+    Returns
+    -------
+    Measurement
+        The measurements
+    """
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for _ in range(case.number):  # noqa: WPS440
+            case.call()
+        best = min(best, time.perf_counter() - started)
+    return Measurement(case.name, case.number / best, _allocation(case))
+
+
+def _allocation(case: Case) -> float:
+    """Return the mean peak of bytes allocated by one call.
+
+    Parameters
+    ----------
+    case : Case
+        The case
+
+    Returns
+    -------
+    float
+        Bytes per call
+    """
+    samples = min(case.number, CONST_ALLOC_SAMPLES)
+    total = 0
+    tracemalloc.start()
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        case.call()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / samples
+
+
+def compare(
+    measurements: List[Measurement],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Return the names of cases slower than the baseline by over threshold.
+
+    Parameters
+    ----------
+    measurements : List[Measurement]
+        Measurements of this run
+    baseline : Dict[str, Dict[str, float]]
+        Saved measurements by case name
+    threshold : float
+        Allowed fraction of lost calls per second
+
+    Returns
+    -------
+    List[str]
+        Names of the regressed cases
+    """
+    kept = 1 - threshold
+    regressed = []
+    for measured in measurements:
+        saved = baseline.get(measured.name)
+        if saved is not None and measured.ops < saved["ops"] * kept:
+            regressed.append(measured.name)
+    return regressed
+
+
+def report(
+    measurements: List[Measurement],
+    baseline: Dict[str, Dict[str, float]],
+) -> None:
+    """Print the measurements with the change against the baseline.
+
+    Parameters
+    ----------
+    measurements : List[Measurement]
+        Measurements of this run
+    baseline : Dict[str, Dict[str, float]]
+        Saved measurements by case name, may be empty
+    """
+    row = "{0:<36} {1:>14} {2:>14} {3:>9}\n"
+    sys.stdout.write(row.format("case", "ops/sec", "bytes/call", "change"))
+    for measured in measurements:
+        change = ""
+        saved = baseline.get(measured.name)
+        if saved:
+            change = "{0:+.1%}".format(measured.ops / saved["ops"] - 1)
+        sys.stdout.write(
+            row.format(
+                measured.name,
+                "{0:,.{1}f}".format(measured.ops, 0 if measured.ops >= 100 else 2),
+                "{0:,.0f}".format(measured.alloc),
+                change,
+            ),
+        )
+
+
+def save(measurements: List[Measurement], path: Path) -> None:
+    """Write the measurements to a baseline file.
+
+    Parameters
+    ----------
+    measurements : List[Measurement]
+        Measurements of this run
+    path : Path
+        The baseline file
+    """
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {
+            measured.name: {"ops": measured.ops, "alloc": measured.alloc}
+            for measured in measurements
+        },
+    }
+    path.write_text(json.dumps(document, indent=2))
+
+
+def load_baseline(path: Optional[Path]) -> Dict[str, Dict[str, float]]:
+    """Return the measurements saved in a baseline file.
+
+    Parameters
+    ----------
+    path : Optional[Path]
+        The baseline file
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Measurements by case name, empty without a baseline file
+    """
+    if path is None or not path.is_file():
+        return {}
+    return json.loads(path.read_text())["cases"]  # type: ignore[no-any-return]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Return the parsed command line.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]]
+        Arguments, by default sys.argv
+
+    Returns
+    -------
+    argparse.Namespace
+        The options
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dailylog-lib.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--log-files", type=int, default=DEFAULT_LOG_FILES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--filter", default="", help="only cases containing it")
+    parser.add_argument("--save", type=Path, help="write a baseline file")
+    parser.add_argument("--compare", type=Path, help="read a baseline file")
+    parser.add_argument("--threshold", type=float, default=CONST_THRESHOLD)
+    return parser.parse_args(argv)
+
+
+def measure_all(options: argparse.Namespace, space: Workspace) -> List[Measurement]:
+    """Measure the selected cases.
+
+    Parameters
+    ----------
+    options : argparse.Namespace
+        The command line options
+    space : Workspace
+        The benchmark files
+
+    Returns
+    -------
+    List[Measurement]
+        The measurements
+    """
+    sizes = [int(size) for size in options.sizes.split(",") if size]
+    measurements = []
+    for case in hot_cases(space) + load_cases(space, sizes):
+        if options.filter in case.name:
+            repeat = options.repeat if case.number > 1 else LOAD_ROUNDS
+            measurements.append(measure(case, repeat))
+    return measurements
+
+
+def run(options: argparse.Namespace) -> List[Measurement]:
+    """Measure the selected cases in a temporary workspace.
+
+    Terminal output of the logging calls is discarded.
+
+    Parameters
+    ----------
+    options : argparse.Namespace
+        The command line options
+
+    Returns
+    -------
+    List[Measurement]
+        The measurements
+    """
+    with tempfile.TemporaryDirectory(prefix="dailylog-bench-") as root:
+        space = Workspace(Path(root), options.log_files)
+        with open(os.devnull, "w") as devnull, redirect_stderr(devnull):
+            measurements = measure_all(options, space)
+        Cache.handles.close()
+    return measurements
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]]
+        Arguments, by default sys.argv
+
+    Returns
+    -------
+    int
+        Exit status, 1 when a case regressed against the baseline
+    """
+    options = parse_args(argv)
+    measurements = run(options)
+    baseline = load_baseline(options.compare)
+    report(measurements, baseline)
+    if options.save is not None:
+        save(measurements, options.save)
+    regressed = compare(measurements, baseline, options.threshold)
+    for name in regressed:
+        sys.stdout.write("regression: {0}\n".format(name))
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
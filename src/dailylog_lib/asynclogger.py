@@ -0,0 +1,244 @@
+"""Top level module asynclogger for dailylog-lib."""
+
+import asyncio
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Callable, Optional, Type, TypeVar
+
+from dailylog_lib.logger import (  # noqa: WPS235
+    LEVEL_CRITICAL,
+    LEVEL_DEBUG,
+    LEVEL_ERROR,
+    LEVEL_INFO,
+    LEVEL_NOTICE,
+    LEVEL_TRACE,
+    LEVEL_WARNING,
+    WARNING,
+    Logger,
+    log_level,
+)
+from dailylog_lib.message import Message
+
+ResultT = TypeVar("ResultT")
+
+
+def _report_failure(future: "Future[ResultT]") -> None:
+    """Report the exception of a background log call nobody awaits.
+
+    Parameters
+    ----------
+    future : Future[ResultT]
+        The finished call
+    """
+    err = future.exception()
+    if err is not None:
+        sys.stderr.write("dailylog async logger: {0}\n".format(err))
+
+
+# WPS214 Found too many methods
+class AsyncLogger:  # noqa: WPS214
+    """Logging class for asyncio applications.
+
+    The coroutines only check the level and queue the call, a wrapped Logger
+    does the file I/O and cache saves on a single worker thread. The worker
+    runs calls in order, so log lines keep the order of the calls and the
+    Logger is never used by two threads at once. aclose() waits until every
+    queued call is done. Deferred messages are rendered on the worker, so
+    template arguments must not be changed after the call.
+    """
+
+    _level: int
+
+    def __init__(self, **kwargs: bool | int | str) -> None:
+        """
+        Initialize the AsyncLogger class with provided keyword arguments.
+
+        Parameters
+        ----------
+        kwargs : dict
+            Keyword arguments of Logger, the Logger is created on the worker
+            thread so loading the config and cache does not block either.
+        """
+        self._level = log_level(kwargs.get("level", WARNING))
+        self._logger: Optional[Logger] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="dailylog-async",
+        )
+        self._executor.submit(self._open, kwargs).add_done_callback(_report_failure)
+
+    async def __aenter__(self) -> "AsyncLogger":
+        """Enter the runtime context returning the instance."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Exit the runtime context draining queued calls."""
+        await self.aclose()
+
+    async def log(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Queue Logger.log with the same parameters."""
+        self._submit(lambda logger: logger.log(message, *args, **kwargs))
+
+    async def log_message(
+        self,
+        key: str,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Queue Cache.log_message with the same parameters.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        message : Message
+            The message to log, rendered on the worker thread
+        args : object
+            Arguments of the message template
+        kwargs : dict
+            Keyword arguments of Cache.log_message
+        """
+        self._submit(
+            lambda logger: logger.log_message(key, message, *args, **kwargs),
+        )
+
+    async def trace(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a trace message."""
+        if self._level <= LEVEL_TRACE:
+            self._submit(lambda logger: logger.trace(message, *args, **kwargs))
+
+    async def debug(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a debug message."""
+        if self._level <= LEVEL_DEBUG:
+            self._submit(lambda logger: logger.debug(message, *args, **kwargs))
+
+    async def info(  # noqa: WPS110
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a info message."""
+        if self._level <= LEVEL_INFO:
+            self._submit(lambda logger: logger.info(message, *args, **kwargs))
+
+    async def notice(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a notice message."""
+        if self._level <= LEVEL_NOTICE:
+            self._submit(lambda logger: logger.notice(message, *args, **kwargs))
+
+    async def warning(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a warning message."""
+        if self._level <= LEVEL_WARNING:
+            self._submit(lambda logger: logger.warning(message, *args, **kwargs))
+
+    async def error(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a error message."""
+        if self._level <= LEVEL_ERROR:
+            self._submit(lambda logger: logger.error(message, *args, **kwargs))
+
+    async def critical(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a critical message."""
+        if self._level <= LEVEL_CRITICAL:
+            self._submit(lambda logger: logger.critical(message, *args, **kwargs))
+
+    async def aflush(self) -> None:
+        """Wait for the queued calls and save pending cache changes."""
+        await asyncio.wrap_future(
+            self._executor.submit(self._call, lambda logger: logger.flush()),
+        )
+
+    async def aclose(self) -> None:
+        """Wait for the queued calls, close the Logger and stop the worker."""
+        await asyncio.wrap_future(self._executor.submit(self._close))
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, method: Callable[[Logger], object]) -> None:
+        """Queue a call whose failure is reported on stderr.
+
+        Parameters
+        ----------
+        method : Callable[[Logger], object]
+            Called with the Logger on the worker thread
+        """
+        future = self._executor.submit(self._call, method)
+        future.add_done_callback(_report_failure)
+
+    def _open(self, kwargs: dict[str, bool | int | str]) -> None:
+        """Create the Logger on the worker thread.
+
+        Parameters
+        ----------
+        kwargs : dict[str, bool | int | str]
+            Keyword arguments of Logger
+        """
+        self._logger = Logger(**kwargs)
+
+    def _call(self, method: Callable[[Logger], ResultT]) -> ResultT:
+        """Call method with the Logger on the worker thread.
+
+        Parameters
+        ----------
+        method : Callable[[Logger], ResultT]
+            Called with the Logger
+
+        Returns
+        -------
+        ResultT
+            The result of method
+
+        Raises
+        ------
+        RuntimeError
+            When the Logger could not be created
+        """
+        if self._logger is None:
+            raise RuntimeError("Logger is not open")
+        return method(self._logger)
+
+    def _close(self) -> None:
+        """Close the Logger on the worker thread."""
+        if self._logger is not None:
+            self._logger.close()
@@ -1,86 +1,121 @@
 """Top level module cache for dailylog-lib."""
 
+import atexit
+import importlib
 import sys
-from datetime import datetime, timezone
-from typing import Dict, Optional
+import threading
+import time
+import weakref
+from pathlib import Path
+from types import MappingProxyType, TracebackType
+from typing import ClassVar, List, Mapping, Optional, Tuple, Type, Union
 
-from wtforglib.dirs import ensure_directory
-from wtforglib.files import load_json_file, write_json_file
 from wtforglib.kinds import StrAnyDict
 
 from dailylog_lib.config import Config
-
-CONST_CACHE_VERSION = 1
-CONST_DAY = 86400
-
-
-class CacheRecord:
-    """Class representing a cache record."""
-
-    shown: int
-    suppressed: int
-
-    def __init__(self, d_obj: Optional[Dict[str, int]] = None) -> None:
-        """Class constructor.
-
-        Parameters
-        ----------
-        d_obj : Dict[str, int], optional
-            Cache record object, by default None
-        """
-        if d_obj is None:
-            self.shown = 0
-            self.suppressed = 0
-            return
-        self._from_dict(d_obj)
-
-    def suppress(self, stifle: int) -> bool:
-        """Suppress display of cache record.
-
-        Parameters
-        ----------
-        stifle : int
-            Suppress if last display is > stifle seconds
-
-        Returns
-        -------
-        bool
-            True if suppressed
-        """
-        now = int(datetime.now(timezone.utc).timestamp())
-        if now - self.shown > stifle:
-            self.shown = now
-            self.suppressed = 0
-            return False
-        self.suppressed += 1
-        return True
-
-    def to_dict(self) -> Dict[str, int]:
-        """Convert instance to dict.
-
-        Returns
-        -------
-        Dict[str, int]
-            Instance data as dict
-        """
-        return {"shown": self.shown, "suppressed": self.suppressed}
-
-    def _from_dict(self, d_obj: Dict[str, int]) -> None:
-        """Assign instance data from dict.
-
-        Parameters
-        ----------
-        d_obj : Dict[str, int]
-            Record data
-        """
-        self.shown = d_obj.get("shown", 0)
-        self.suppressed = d_obj.get("suppressed", 0)
-
-
-class Cache(Config):
-    """Class to manage the cache."""
-
-    cache: StrAnyDict
+from dailylog_lib.handles import HandlePool
+from dailylog_lib.locks import CONST_LOCK_STRIPES, Flusher, StripedLock
+from dailylog_lib.message import Message, render_message
+from dailylog_lib.metrics import SAVE_CACHE, SAVES, Metrics
+from dailylog_lib.record import CONST_DAY
+from dailylog_lib.record import CacheRecord as CacheRecord  # noqa: F401
+from dailylog_lib.rotation import Rotation
+from dailylog_lib.stamps import LocalStamper, Stamper, make_stamper
+from dailylog_lib.storage import (  # noqa: F401
+    CONST_CACHE_VERSION as CONST_CACHE_VERSION,
+)
+from dailylog_lib.storage import (
+    CONST_PRUNE_BUDGET,
+    CacheStore,
+    JsonStore,
+    Snapshot,
+)
+from dailylog_lib.writer import CONST_QUEUE_SIZE, OVERFLOW_BLOCK, BackgroundWriter
+
+# Cache class methods setting state shared by all instances mapped to the
+# options of that state, the constructor rejects them so no instance changes
+# the behavior of the others
+SHARED_OPTIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {
+        "use_rotation": (
+            "rotate",
+            "max_bytes",
+            "retain",
+            "compress",
+            "compress_workers",
+        ),
+        "use_stamper": ("stamp",),
+        "start_writer": ("async_write", "queue_size", "overflow"),
+        "enable_metrics": ("metrics",),
+    },
+)
+
+# module and class name of the backend by suffix, imported by open_store
+# when first used so sqlite3 and mmap are only loaded by caches using them
+CACHE_STORES: Mapping[str, Tuple[str, str]] = MappingProxyType(
+    {
+        ".db": ("dailylog_lib.sqlstore", "SqliteStore"),
+        ".journal": ("dailylog_lib.journal", "JournalStore"),
+        ".mmap": ("dailylog_lib.mmapstore", "MmapStore"),
+        ".sqlite": ("dailylog_lib.sqlstore", "SqliteStore"),
+        ".sqlite3": ("dailylog_lib.sqlstore", "SqliteStore"),
+    },
+)
+
+
+def open_store(cache_path: Path, max_entries: int = 0) -> CacheStore:
+    """Return the storage backend for a cache file.
+
+    The backend is selected by the file suffix, JSON is used for unknown suffixes.
+
+    Parameters
+    ----------
+    cache_path : Path
+        Path of the cache file
+    max_entries : int
+        Maximum number of records, 0 for no limit
+
+    Returns
+    -------
+    CacheStore
+        Unloaded storage backend
+    """
+    store_class: Type[CacheStore] = JsonStore
+    backend = CACHE_STORES.get(cache_path.suffix.lower())
+    if backend is not None:
+        module_name, class_name = backend
+        store_class = getattr(importlib.import_module(module_name), class_name)
+    return store_class(cache_path, max_entries=max_entries)
+
+
+def _flush_at_exit() -> None:
+    """Flush pending cache changes of the still living batched instances."""
+    for instance in list(_BATCHED_CACHES):
+        instance.flush()
+
+
+# WPS214 Found too many methods
+class Cache(Config):  # noqa: WPS214
+    """Class to manage the cache.
+
+    The cache is loaded on first use of store, so instances that only log
+    without a key never read or write the cache file.
+    """
+
+    _store: Optional[CacheStore]
+    handles: ClassVar[HandlePool] = HandlePool()
+    stamper: ClassVar[Stamper] = LocalStamper()
+    writer: ClassVar[Optional[BackgroundWriter]] = None
+    metrics: ClassVar[Optional[Metrics]] = None
+    rotation: ClassVar[Rotation] = Rotation()
+    _changes: List[int]
+    _flush_count: int
+    _flush_interval: float
+    _flushed_at: float
+    _max_entries: int
+    _prune_count: int
+    _locks: Optional[StripedLock]
+    _flusher: Optional[Flusher]
 
     def __init__(self, **kwargs: bool | int | str) -> None:
         """
@@ -93,24 +128,143 @@ class Cache(Config):
             - debug (bool | int): Debug level, defaults to 0.
             - test (bool): Test mode flag, defaults to False.
             - verbose (bool | int): Verbosity level, defaults to 0.
-            - cache (str): Cache file path.
+            - cache (str): Cache file path, the suffix selects the storage
+              backend: ".journal" for an append only journal, ".mmap" for a
+              table shared between processes, ".db", ".sqlite" or ".sqlite3"
+              for SQLite, otherwise JSON.
             - config (str): Config file path.
-
-        This constructor initializes the cache by loading it from a file or creating
-        a new cache if no file exists.
+            - config_check (int): Seconds between checks of the config file
+              for changes, defaults to 0 (never reload).
+            - flush_count (int): Save the cache after this many changes,
+              defaults to 1 (write through) unless flush_interval is set.
+            - flush_interval (int): Save the cache on the first change made
+              this many seconds after the last save, defaults to 0
+              (disabled). The interval is checked per change, no timer runs
+              unless thread_safe is set, close(), flush() and interpreter
+              exit save changes left pending by an idle instance.
+            - max_entries (int): Maximum number of cached records, the least
+              recently used record is evicted beyond it, defaults to 0
+              (no limit).
+            - prune_count (int): Number of records examined for expiry on
+              every logged message, defaults to 8, 0 disables pruning.
+            - thread_safe (bool): Allow threads to share the instance,
+              defaults to False. Records are locked by key stripe and the
+              cache is saved by a flusher thread that coalesces changes,
+              flush_count is ignored and flush_interval delays each save.
+            - lock_stripes (int): Number of key stripes in thread safe mode,
+              defaults to 64.
+
+        This constructor does no file I/O, the cache is loaded from file or
+        created on first use. When saving is batched pending changes are also
+        saved by close() and at interpreter exit. The time stamp format, log
+        partitioning, the background writer and metrics apply to all
+        instances and are set by use_stamper(), use_rotation(), start_writer()
+        and enable_metrics(), their options are rejected with ValueError.
         """
+        Cache._reject_shared_options(kwargs)
         super().__init__(**kwargs)
-        self._load_cache()
+        self._flush_interval = float(kwargs.get("flush_interval", 0))
+        default_count = 0 if self._flush_interval > 0 else 1
+        self._flush_count = int(kwargs.get("flush_count", default_count))
+        self._max_entries = int(kwargs.get("max_entries", 0))
+        self._prune_count = int(kwargs.get("prune_count", CONST_PRUNE_BUDGET))
+        self._locks = None
+        self._flusher = None
+        if kwargs.get("thread_safe", False):
+            self._locks = StripedLock(
+                int(kwargs.get("lock_stripes", CONST_LOCK_STRIPES)),
+            )
+        stripes = 1 if self._locks is None else len(self._locks)
+        self._changes = [0 for _ in range(stripes)]
+        self._flushed_at = time.monotonic()
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if self._flush_count != 1 or self._locks is not None:
+            _BATCHED_CACHES.add(self)
+
+    def __enter__(self) -> "Cache":
+        """Enter the runtime context returning the instance."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Exit the runtime context closing open log handles."""
+        self.close()
 
-    def log_message(self, key: str, message: str, **kwargs: bool | int | str) -> bool:
+    def close(self) -> None:
+        """Save pending cache changes and close the pooled log file handles.
+
+        Lines queued for the background writer are written first and the
+        flusher thread of thread safe mode is stopped. Handles and the
+        flusher are restarted on demand, so the instance remains usable.
+        """
+        flusher = self._flusher
+        self._flusher = None
+        if flusher is not None:
+            flusher.close()
+        self.flush()
+        if self._store is not None:
+            self._store.close()
+        writer = Cache.writer
+        if writer is not None:
+            writer.flush()
+        self.handles.close()
+
+    def flush(self) -> None:
+        """Save the cache to file if it has unsaved changes."""
+        if self._locks is None:
+            if self.dirty:
+                self._save_cache()
+            return
+        self._save_detached(self._locks, 0)
+
+    @property
+    def store(self) -> CacheStore:
+        """Return the storage backend, loading the cache on first use."""
+        store = self._store
+        if store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = self._load_cache()
+                store = self._store
+        return store
+
+    @property
+    def dirty(self) -> int:
+        """Return the number of changes not yet saved to file."""
+        return sum(self._changes)
+
+    @property
+    def cache(self) -> StrAnyDict:
+        """Return the cache contents in the JSON cache layout."""
+        return self.store.to_dict()
+
+    def log_message(
+        self,
+        key: str,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> bool:
         """Log a message with specified parameters, handling suppression and caching.
 
+        The message is rendered once after the suppression check and the
+        text is shared by the terminal and the log file.
+
         Parameters
         ----------
         key : str
             Unique key for the cache record.
-        message : str
-            The message to log.
+        message : Message
+            The message to log, a %-style template rendered with args or a
+            callable returning the message.
+        args : object
+            Arguments of the template.
         kwargs : dict
             Additional keyword arguments:
                 - label (str): Log level label, defaults to "ERROR".
@@ -127,26 +281,96 @@ class Cache(Config):
         """
         rtn_val = False
         label = str(kwargs.get("label", "ERROR"))
-        log_fn = str(kwargs.get("logfn", self.default_log()))
+        log_fn = str(kwargs["logfn"]) if "logfn" in kwargs else self.default_log()
         if kwargs.get("quiet", False):
-            Cache.append_daily(label, message, log_fn)
+            Cache.append_daily(label, render_message(message, args), log_fn)
             rtn_val = True
         else:
-            record: CacheRecord = self._get_record(key)
-            if not record.suppress(int(kwargs.get("suppress", CONST_DAY))):
-                sys.stderr.write("{0}: {1}\n".format(label, message))
+            record = self._suppress_key(key, int(kwargs.get("suppress", CONST_DAY)))
+            text = render_message(message, args)
+            if not record.suppressed:
+                sys.stderr.write("{0}: {1}\n".format(label, text))
                 rtn_val = True
-            Cache.append_daily(label, message, log_fn, record.suppressed)
-            self.cache["entries"][key] = record.to_dict()
-            self._save_cache()
+            Cache.append_daily(label, text, log_fn, record.suppressed)
+        if Cache.metrics is not None:
+            Cache.metrics.logged(label, not rtn_val)
         return rtn_val
 
     @classmethod
     def t_stamp(cls) -> str:
         """Return current time stamp."""
-        # WPS323 Found `%` string formatting
-        fmt = "%a %b %d %H:%M:%S %p %Z %Y"  # noqa: WPS323
-        return datetime.now(timezone.utc).astimezone().strftime(fmt)
+        return Cache.stamper.stamp()
+
+    @classmethod
+    def use_stamper(cls, stamper: Union[str, Stamper]) -> None:
+        """Set the time stamp format of all log lines.
+
+        Parameters
+        ----------
+        stamper : Union[str, Stamper]
+            A Stamper or the name of a format: "local" for the traditional
+            stamp, "iso" for ISO-8601 or "epoch" for epoch seconds
+        """
+        if isinstance(stamper, str):
+            stamper = make_stamper(stamper)
+        Cache.stamper = stamper
+
+    @classmethod
+    def use_rotation(cls, rotation: Rotation) -> None:
+        """Set the partitioning of all log files.
+
+        Log path names with a {date} field, for example
+        "/var/log/dailylog-{date}.log", are written to one file per period.
+        Retention threads of the previous rotation are waited for.
+
+        Parameters
+        ----------
+        rotation : Rotation
+            The rotation
+        """
+        previous = Cache.rotation
+        Cache.rotation = rotation
+        previous.join()
+
+    @classmethod
+    def start_writer(
+        cls,
+        queue_size: int = CONST_QUEUE_SIZE,
+        overflow: str = OVERFLOW_BLOCK,
+    ) -> BackgroundWriter:
+        """Append log lines of all instances from a background thread.
+
+        append_daily() then only queues the formatted line. A writer that
+        is already running is kept and returned.
+
+        Parameters
+        ----------
+        queue_size : int
+            Maximum number of queued lines
+        overflow : str
+            Policy for a full queue "block", "drop-oldest" or "drop-new"
+
+        Returns
+        -------
+        BackgroundWriter
+            The running writer
+        """
+        writer = Cache.writer
+        if writer is None:
+            writer = BackgroundWriter(queue_size, overflow)
+            writer.metrics = Cache.metrics
+            atexit.register(writer.close)
+            Cache.writer = writer
+        return writer
+
+    @classmethod
+    def stop_writer(cls) -> None:
+        """Write queued lines, stop the background writer and write synchronously."""
+        writer = Cache.writer
+        Cache.writer = None
+        if writer is not None:
+            writer.close()
+            atexit.unregister(writer.close)
 
     @classmethod
     def append_daily(
@@ -158,6 +382,11 @@ class Cache(Config):
     ) -> None:
         """Append a message to the specified log file.
 
+        The file is kept open in the shared handle pool, it is reopened when
+        it has been rotated or deleted since the previous write. While the
+        background writer runs the line is queued instead. A {date} field
+        in log_fn selects the current partition, see use_rotation().
+
         Parameters
         ----------
         label : str
@@ -169,45 +398,383 @@ class Cache(Config):
         s_cnt : int
             Number of seconds to suppress screen output.
         """
+        line, size = cls._format_line(label, message, s_cnt)
+        log_fn = Cache.rotation.path(log_fn, size)
+        metrics = Cache.metrics
+        if metrics is None:
+            cls._write_line(log_fn, line)
+            return
+        started = time.perf_counter()
+        cls._write_line(log_fn, line)
+        metrics.wrote(size, time.perf_counter() - started)
+
+    @classmethod
+    def enable_metrics(cls) -> Metrics:
+        """Collect counters and latency histograms of all instances.
+
+        Metrics that are already collected are kept and returned. While
+        disabled the only cost is a check of Cache.metrics per message.
+
+        Returns
+        -------
+        Metrics
+            The collected metrics
+        """
+        metrics = Cache.metrics
+        if metrics is None:
+            metrics = Metrics()
+            Cache.metrics = metrics
+        if Cache.writer is not None:
+            Cache.writer.metrics = metrics
+        return metrics
+
+    @classmethod
+    def disable_metrics(cls) -> None:
+        """Stop collecting metrics and discard the collected values."""
+        Cache.metrics = None
+        if Cache.writer is not None:
+            Cache.writer.metrics = None
+
+    @classmethod
+    def stats(cls) -> StrAnyDict:
+        """Return a snapshot of the collected metrics.
+
+        Returns
+        -------
+        StrAnyDict
+            Messages per level, the counters suppressed, dropped, saves and
+            bytes_written and the latency histograms append_daily and
+            save_cache, empty while metrics are disabled
+        """
+        metrics = Cache.metrics
+        if metrics is None:
+            return {}
+        return metrics.stats()
+
+    @classmethod
+    def export_metrics(cls, metrics_fn: str) -> None:
+        """Write the collected metrics in the Prometheus text format.
+
+        Parameters
+        ----------
+        metrics_fn : str
+            Path name of the metrics file, replaced atomically
+
+        Raises
+        ------
+        ValueError
+            When metrics are disabled
+        """
+        metrics = Cache.metrics
+        if metrics is None:
+            raise ValueError("Metrics are not enabled")
+        metrics.write_prometheus(Path(metrics_fn))
+
+    @classmethod
+    def _reject_shared_options(cls, options: Mapping[str, bool | int | str]) -> None:
+        """Reject constructor options of the state shared by all instances.
+
+        Parameters
+        ----------
+        options : Mapping[str, bool | int | str]
+            Keyword arguments of the constructor
+
+        Raises
+        ------
+        ValueError
+            When an option of SHARED_OPTIONS like retain is passed
+        """
+        rejected: List[str] = []
+        setters: List[str] = []
+        for setter, names in SHARED_OPTIONS.items():
+            passed = [name for name in names if name in options]
+            if passed:
+                rejected.extend(passed)
+                setters.append("Cache.{0}()".format(setter))
+        if rejected:
+            raise ValueError(
+                "Options {0} apply to all instances, set them with {1}".format(
+                    ", ".join(rejected),
+                    ", ".join(setters),
+                ),
+            )
+
+    @classmethod
+    def _format_line(
+        cls,
+        label: str,
+        message: str,
+        s_cnt: Optional[int],
+    ) -> Tuple[str, int]:
+        """Return a stamped log line and its size in bytes.
+
+        Parameters
+        ----------
+        label : str
+            Log level label DEBUG, INFO, WARNING, ERROR ...
+        message : str
+            Record to log
+        s_cnt : Optional[int]
+            Suppressed count, None to leave it out
+
+        Returns
+        -------
+        Tuple[str, int]
+            The line and the length of its UTF-8 encoding
+        """
         stamp = Cache.t_stamp()
-        with open(log_fn, "a") as daily_log:
-            if s_cnt is None:  # no suppressed count
-                daily_log.write("{0} {1}: {2}\n".format(stamp, label, message))
-            else:
-                daily_log.write(
-                    "{0} {1}: {2} [{3}]\n".format(stamp, label, message, s_cnt),
-                )
-            daily_log.close()
+        if s_cnt is None:  # no suppressed count
+            line = "{0} {1}: {2}\n".format(stamp, label, message)
+        else:
+            line = "{0} {1}: {2} [{3}]\n".format(stamp, label, message, s_cnt)
+        return line, len(line.encode())
+
+    @classmethod
+    def _write_line(cls, log_fn: str, line: str) -> None:
+        """Append a formatted line directly or through the background writer.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of log file
+        line : str
+            The line
+        """
+        writer = Cache.writer
+        if writer is None or writer.closed:
+            cls.handles.write(log_fn, line)
+        else:
+            writer.write(log_fn, line)
+
+    def _load_cache(self) -> CacheStore:
+        """Load cache from file if it exists otherwise create a cache.
 
-    def _get_record(self, key: str) -> CacheRecord:
-        """Get cache record.
+        Returns
+        -------
+        CacheStore
+            The loaded storage backend
+        """
+        store = open_store(self.cache_path(), self._max_entries)
+        store.load()
+        return store
+
+    def _suppress_key(self, key: str, stifle: int) -> CacheRecord:
+        """Suppress key under the stripe lock in thread safe mode.
 
         Parameters
         ----------
         key : str
-            unique key for record
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
 
         Returns
         -------
         CacheRecord
-            The record
+            The updated record
         """
-        entries = self.cache.get("entries", {})
-        return CacheRecord(entries.get(key, None))
+        if self._locks is None:
+            return self._suppress(key, stifle)
+        return self._suppress_locked(key, stifle, self._locks)
 
-    def _load_cache(self) -> None:
-        """Load cache from file if it exists otherwise create a cache."""
-        cache_path = self.cache_path()
-        if cache_path.is_file():
-            self.cache = load_json_file(cache_path)
-        else:
-            self.cache = {}
-            self.cache["version"] = CONST_CACHE_VERSION
-            self.cache["entries"] = {}
-            self._save_cache()
+    def _suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Suppress key, prune expired records and save if a threshold is reached.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record
+        """
+        record = self.store.suppress(key, stifle)
+        if self._prune_count:
+            self.store.prune(self._prune_count)
+        self._mark_dirty()
+        return record
+
+    def _suppress_locked(
+        self,
+        key: str,
+        stifle: int,
+        locks: StripedLock,
+    ) -> CacheRecord:
+        """Suppress key holding its stripe and request a flush.
+
+        Adding a record may move or evict others, so it holds all stripes.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+        locks : StripedLock
+            The key stripes
+
+        Returns
+        -------
+        CacheRecord
+            The updated record
+        """
+        with locks.hold(key) as stripe:
+            exclusive = self.store.changes_layout(key)
+            if not exclusive:
+                record = self.store.suppress(key, stifle)
+                self._changes[stripe] += 1
+        if exclusive:
+            with locks.hold_all():
+                record = self.store.suppress(key, stifle)
+                self._changes[locks.index(key)] += 1
+        self._request_flush(locks)
+        return record
+
+    def _request_flush(self, locks: StripedLock) -> None:
+        """Wake the flusher thread, starting it when needed.
+
+        Parameters
+        ----------
+        locks : StripedLock
+            The key stripes
+        """
+        flusher = self._flusher
+        if flusher is None:
+            with locks.hold_all():
+                if self._flusher is None:
+                    self._flusher = Flusher(self._flush_pruned, self._flush_interval)
+                flusher = self._flusher
+        flusher.request()
+
+    def _flush_pruned(self) -> None:
+        """Prune expired records and save the cache, run by the flusher."""
+        if self._locks is not None:
+            self._save_detached(self._locks, self._prune_count)
+
+    def _save_detached(self, locks: StripedLock, prune_count: int) -> None:
+        """Save the cache holding the stripes only to capture the changes.
+
+        The snapshot of the store is written while other threads keep
+        logging, saves wait for each other on the save lock.
+
+        Parameters
+        ----------
+        locks : StripedLock
+            The key stripes
+        prune_count : int
+            Number of records examined for expiry per change
+        """
+        with self._save_lock:
+            started = time.perf_counter()
+            changes, snapshot = self._capture_changes(locks, prune_count)
+            if changes:
+                if snapshot is not None:
+                    self._write_captured(locks, changes, snapshot)
+                self._saved(started)
+
+    def _capture_changes(
+        self,
+        locks: StripedLock,
+        prune_count: int,
+    ) -> Tuple[int, Optional[Snapshot]]:
+        """Prune and snapshot the store holding all stripes.
+
+        Parameters
+        ----------
+        locks : StripedLock
+            The key stripes
+        prune_count : int
+            Number of records examined for expiry per change
+
+        Returns
+        -------
+        Tuple[int, Optional[Snapshot]]
+            Number of captured changes and the snapshot of the store, None
+            when there are no changes or the store saved them already
+        """
+        store = self.store
+        with locks.hold_all():
+            changes = self.dirty
+            if prune_count:
+                store.prune(prune_count * changes)
+            if not changes:
+                return (0, None)
+            self._changes = [0 for _ in self._changes]
+            if store.detached_save:
+                return (changes, store.snapshot())
+            store.save()
+            return (changes, None)
+
+    def _write_captured(
+        self,
+        locks: StripedLock,
+        changes: int,
+        snapshot: Snapshot,
+    ) -> None:
+        """Write a snapshot without holding the stripes and merge the result.
+
+        Parameters
+        ----------
+        locks : StripedLock
+            The key stripes
+        changes : int
+            Number of changes in the snapshot, counted again if it fails
+        snapshot : Snapshot
+            The snapshot of the store
+
+        Raises
+        ------
+        BaseException
+            Any error writing the snapshot, the changes stay unsaved
+        """
+        try:
+            document = self.store.write_snapshot(snapshot)
+        except BaseException:  # noqa: WPS424
+            with locks.hold_all():
+                self._changes[0] += changes
+            raise
+        if document is not None:
+            with locks.hold_all():
+                self.store.merge_saved(document)
+
+    def _mark_dirty(self) -> None:
+        """Record a cache change and save when a flush threshold is reached.
+
+        A failed save keeps its changes counted, the next change retries it.
+        """
+        self._changes[0] += 1
+        if 0 < self._flush_count <= self._changes[0]:
+            self.flush()
+        elif self._flush_interval > 0:
+            if time.monotonic() - self._flushed_at >= self._flush_interval:
+                self.flush()
 
     def _save_cache(self) -> None:
         """Save cache to file."""
-        cache_path = self.cache_path()
-        ensure_directory(cache_path.parent)
-        write_json_file(cache_path, self.cache)
+        started = time.perf_counter()
+        self.store.save()
+        self._changes = [0 for _ in self._changes]
+        self._saved(started)
+
+    def _saved(self, started: float) -> None:
+        """Record a completed save.
+
+        Parameters
+        ----------
+        started : float
+            time.perf_counter() when the save started
+        """
+        metrics = Cache.metrics
+        if metrics is not None:
+            metrics.observe(SAVE_CACHE, time.perf_counter() - started)
+            metrics.count(SAVES)
+        self._flushed_at = time.monotonic()
+
+
+# instances saving in batches, flushed at exit while they are alive
+_BATCHED_CACHES: "weakref.WeakSet[Cache]" = weakref.WeakSet()
+atexit.register(_flush_at_exit)
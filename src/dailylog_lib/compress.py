@@ -0,0 +1,274 @@
+"""Top level module compress for dailylog-lib."""
+
+import importlib
+import os
+import threading
+from contextlib import suppress
+from types import MappingProxyType, ModuleType
+from typing import List, Mapping, Optional, Set, TextIO, Tuple
+
+CODEC_AUTO = "auto"
+CODEC_GZIP = "gzip"
+CODEC_LZMA = "lzma"
+CODEC_ZSTD = "zstd"
+# file suffix and the modules providing a codec, the first importable
+# module is used
+Codec = Tuple[str, Tuple[str, ...]]
+CODECS: Mapping[str, Codec] = MappingProxyType(
+    {
+        CODEC_GZIP: (".gz", ("gzip",)),
+        CODEC_LZMA: (".xz", ("lzma",)),
+        CODEC_ZSTD: (".zst", ("compression.zstd", "zstandard")),
+    },
+)
+# suffixes of compressed files
+COMPRESSED_SUFFIXES = tuple(codec[0] for codec in CODECS.values())
+# codecs tried by "auto" in order of preference
+AUTO_CODECS = (CODEC_ZSTD, CODEC_GZIP)
+CONST_COMPRESS_WORKERS = 1
+# niceness added to compression threads where the platform supports it
+CONST_COMPRESS_NICE = 10
+
+
+def codec_module(codec: str) -> ModuleType:
+    """Return the module implementing a codec, importing it on first use.
+
+    Parameters
+    ----------
+    codec : str
+        Codec name "gzip", "lzma" or "zstd"
+
+    Returns
+    -------
+    ModuleType
+        Module with an open() function like gzip.open()
+
+    Raises
+    ------
+    ValueError
+        When the codec is unknown or none of its modules is installed
+    """
+    known = CODECS.get(codec)
+    if known is None:
+        raise ValueError("Unknown compression codec: {0}".format(codec))
+    for module_name in known[1]:
+        with suppress(ImportError):
+            return importlib.import_module(module_name)
+    raise ValueError("Compression codec not available: {0}".format(codec))
+
+
+def available_codecs() -> List[str]:
+    """Return the codecs that can be used on this interpreter.
+
+    Returns
+    -------
+    List[str]
+        Codec names
+    """
+    available = []
+    for codec in CODECS:
+        try:
+            codec_module(codec)
+        except ValueError:
+            continue
+        available.append(codec)
+    return available
+
+
+def resolve_codec(codec: bool | int | str) -> str:
+    """Return the codec selected by a compress option.
+
+    Parameters
+    ----------
+    codec : bool | int | str
+        A codec name, "auto" or True for zstd when available and gzip
+        otherwise, False or "" for no compression
+
+    Returns
+    -------
+    str
+        The codec name, empty for no compression, codec_module() raises
+        ValueError for an unknown or unavailable codec
+    """
+    if isinstance(codec, bool):
+        codec = CODEC_AUTO if codec else ""
+    codec = str(codec)
+    if codec == CODEC_AUTO:
+        available = available_codecs()
+        return next(name for name in AUTO_CODECS if name in available)
+    if codec:
+        codec_module(codec)
+    return codec
+
+
+def open_log(log_fn: str) -> TextIO:
+    """Open a log file for reading, decompressing it by its suffix.
+
+    Parameters
+    ----------
+    log_fn : str
+        Path name of the log file
+
+    Returns
+    -------
+    TextIO
+        The open file
+    """
+    for codec, known in CODECS.items():
+        if log_fn.endswith(known[0]):
+            opened: TextIO = codec_module(codec).open(log_fn, "rt")
+            return opened
+    return open(log_fn, "r")  # noqa: WPS515
+
+
+def compress_file(log_fn: str, codec: str = CODEC_GZIP) -> str:
+    """Compress a closed log file and remove the original.
+
+    The compressed file is written under a temporary name and renamed, so
+    a partially compressed file is never mistaken for a partition. It keeps
+    the modification time of the original.
+
+    Parameters
+    ----------
+    log_fn : str
+        Path name of the log file
+    codec : str
+        Codec name "gzip", "lzma" or "zstd"
+
+    Returns
+    -------
+    str
+        Path name of the compressed file
+    """
+    import shutil  # noqa: WPS433
+
+    target = "{0}{1}".format(log_fn, CODECS[codec][0])
+    tmp_fn = "{0}.tmp".format(target)
+    stat = os.stat(log_fn)
+    with open(log_fn, "rb") as source:
+        with codec_module(codec).open(tmp_fn, "wb") as sink:
+            shutil.copyfileobj(source, sink)
+    os.utime(tmp_fn, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_fn, target)
+    os.unlink(log_fn)
+    return target
+
+
+def _lower_priority(nice: int) -> None:
+    """Lower the scheduling priority of the calling worker thread.
+
+    On Linux a thread id is accepted by setpriority, elsewhere the call
+    fails and the priority is left unchanged.
+
+    Parameters
+    ----------
+    nice : int
+        Niceness added to the thread
+    """
+    try:
+        thread_id = threading.get_native_id()
+        os.setpriority(
+            os.PRIO_PROCESS,
+            thread_id,
+            os.getpriority(os.PRIO_PROCESS, thread_id) + nice,
+        )
+    except (AttributeError, OSError):
+        return
+
+
+class Compressor:
+    """Class compressing closed log files on low priority worker threads.
+
+    At most workers files are compressed at the same time. The codecs
+    release the GIL while compressing, so the workers run in parallel with
+    the application. A file submitted again while it waits is only
+    compressed once.
+    """
+
+    codec: str
+    workers: int
+
+    def __init__(
+        self,
+        codec: str = CODEC_GZIP,
+        workers: int = CONST_COMPRESS_WORKERS,
+        nice: int = CONST_COMPRESS_NICE,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        codec : str
+            Codec name "gzip", "lzma" or "zstd"
+        workers : int
+            Maximum number of files compressed at the same time
+        nice : int
+            Niceness added to the worker threads
+        """
+        from concurrent.futures import ThreadPoolExecutor  # noqa: WPS433
+
+        self.codec = codec
+        self.workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(
+            self.workers,
+            thread_name_prefix="dailylog-compress",
+            initializer=_lower_priority,
+            initargs=(nice,),
+        )
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._idle = threading.Condition(self._lock)
+
+    def submit(self, log_fn: str) -> bool:
+        """Queue a log file for compression.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of the closed log file
+
+        Returns
+        -------
+        bool
+            False when the file is already queued
+        """
+        with self._lock:
+            if log_fn in self._pending:
+                return False
+            self._pending.add(log_fn)
+        self._pool.submit(self._compress, log_fn)
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait until all queued files are compressed.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Seconds to wait, by default without limit
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def close(self) -> None:
+        """Compress the queued files and stop the workers."""
+        self._pool.shutdown(wait=True)
+
+    def _compress(self, log_fn: str) -> None:
+        """Compress a file on a worker thread.
+
+        A file deleted by retention before its turn is skipped.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of the log file
+        """
+        try:
+            compress_file(log_fn, self.codec)
+        except FileNotFoundError:
+            return
+        finally:
+            with self._idle:
+                self._pending.discard(log_fn)
+                self._idle.notify_all()
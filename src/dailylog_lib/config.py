@@ -1,24 +1,73 @@
 """Top level module config for dailylog-lib."""
 
 import os
+import time
 from pathlib import Path
+from typing import Optional
 
-from wtforglib.dirs import ensure_directory
-from wtforglib.files import load_yaml_file, safe_write_yaml_file
 from wtforglib.kinds import StrAnyDict
 
+from dailylog_lib.configfile import load_config_file, write_config_file
 from dailylog_lib.exceptions import FilePermError
+from dailylog_lib.fileio import ensure_directory
 from dailylog_lib.options import Options
+from dailylog_lib.storage import FileSignature, file_signature
 
 CURRENT_CONFIG_VERSION = 1
-CONST_DEFAULT_LOG = str(Path.home() / "daily.log")
+
+# CONST_DEFAULT_LOG is resolved on each access by __getattr__, so importing
+# the package does not look up the home directory
+CONST_DEFAULT_LOG: str
+
+
+def default_log_path() -> str:
+    """Return the default log file of the current user.
+
+    Returns
+    -------
+    str
+        Path to daily.log in the home directory
+    """
+    return str(Path.home() / "daily.log")
+
+
+def __getattr__(name: str) -> object:  # noqa: WPS413
+    """Resolve CONST_DEFAULT_LOG on access.
+
+    Parameters
+    ----------
+    name : str
+        Attribute name
+
+    Returns
+    -------
+    object
+        The attribute value
+
+    Raises
+    ------
+    AttributeError
+        When name is not a lazy attribute
+    """
+    if name == "CONST_DEFAULT_LOG":
+        return default_log_path()
+    raise AttributeError("module {0} has no attribute {1}".format(__name__, name))
 
 
 # WPS214 Found too many methods
 class Config(Options):  # noqa: WPS214
-    """Class to manage the configuration."""
+    """Class to manage the configuration.
+
+    The config file is read on first use of config and only written by
+    set_default_log(), constructing an instance does no file I/O. With the
+    config_check option the file is checked at most once per interval and
+    only parsed again when its inode, mtime or size changed.
+    """
 
-    config: StrAnyDict
+    _config: Optional[StrAnyDict]
+    _config_check: float
+    _config_checked: float
+    _config_signature: Optional[FileSignature]
 
     def __init__(self, **kwargs: bool | int | str) -> None:
         """
@@ -33,18 +82,29 @@ class Config(Options):  # noqa: WPS214
             - verbose (bool | int): Verbosity level, defaults to 0.
             - cache (str): Cache file path.
             - config (str): Config file path.
+            - config_check (int): Seconds between checks of the config
+              file for changes, defaults to 0 (never reload).
 
-        This constructor initializes the configuration by loading it from
-        a file or creating a new configuration if no file exists.
+        The configuration is loaded from file on first use, a default
+        configuration is used if no file exists.
         """
         super().__init__(**kwargs)
-        if self.config_path().is_file():
-            self.config = self._load_config()
-        else:
-            self.config = {}
-            self.config["version"] = CURRENT_CONFIG_VERSION
-            self.config["default_log"] = CONST_DEFAULT_LOG
-            self._save_config()
+        self._config = None
+        self._config_check = float(kwargs.get("config_check", 0))
+        self._config_checked = 0
+        self._config_signature = None
+
+    @property
+    def config(self) -> StrAnyDict:
+        """Return the configuration, loading it on first use or when changed."""
+        if self._config is None or self._config_changed():
+            self._config = self._read_config()
+        return self._config
+
+    @config.setter
+    def config(self, config: StrAnyDict) -> None:
+        """Replace the configuration."""
+        self._config = config
 
     def set_default_log(self, log_fn: str) -> None:
         """Set the default log file.
@@ -97,7 +157,10 @@ class Config(Options):  # noqa: WPS214
         str
             Path to the default log
         """
-        return str(self.config.get("default_log", CONST_DEFAULT_LOG))
+        default_log = self.config.get("default_log")
+        if default_log is None:
+            return default_log_path()
+        return str(default_log)
 
     @classmethod
     def validate_existing_path(cls, path: Path) -> None:
@@ -115,9 +178,42 @@ class Config(Options):  # noqa: WPS214
         if not os.access(path, os.W_OK):
             raise FilePermError("Not writable: {0}".format(path))
 
+    def _config_changed(self) -> bool:
+        """Return True if the config file changed, checking once per interval.
+
+        Returns
+        -------
+        bool
+            True when the config must be read again
+        """
+        if self._config_check <= 0:
+            return False
+        now = time.monotonic()
+        if now - self._config_checked < self._config_check:
+            return False
+        self._config_checked = now
+        return file_signature(self.config_path()) != self._config_signature
+
+    def _read_config(self) -> StrAnyDict:
+        """Read the config file or return the default config if it is missing.
+
+        Returns
+        -------
+        StrAnyDict
+            The configuration
+        """
+        self._config_checked = time.monotonic()
+        self._config_signature = file_signature(self.config_path())
+        if self._config_signature is None:
+            return {
+                "version": CURRENT_CONFIG_VERSION,
+                "default_log": default_log_path(),
+            }
+        return self._load_config()
+
     def _load_config(self) -> StrAnyDict:
         """Load configuration from file."""
-        config = load_yaml_file(self.config_path())
+        config = load_config_file(self.config_path())
         version = config.get("version", 0)
         if version != CURRENT_CONFIG_VERSION:
             return Config.update_config(config)
@@ -131,4 +227,5 @@ class Config(Options):  # noqa: WPS214
             )
         cfg_path = self.config_path()
         ensure_directory(cfg_path.parent)
-        safe_write_yaml_file(self.config_path(), self.config)
+        write_config_file(cfg_path, self.config)
+        self._config_signature = file_signature(cfg_path)
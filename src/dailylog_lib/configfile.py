@@ -0,0 +1,199 @@
+"""Top level module configfile for dailylog-lib."""
+
+import json
+import marshal
+import os
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import Optional
+
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.fileio import (
+    load_json_file,
+    load_yaml_file,
+    safe_write_yaml_file,
+    write_json_file,
+)
+from dailylog_lib.storage import FileSignature, file_signature
+
+JSON_SUFFIXES = frozenset((".json",))
+TOML_SUFFIXES = frozenset((".toml",))
+CONST_COMPILED_VERSION = 1
+
+
+def compiled_path(path: Path) -> Path:
+    """Return the path of the compiled cache of a YAML config file.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the YAML config file
+
+    Returns
+    -------
+    Path
+        Path of the marshal sidecar
+    """
+    return path.with_name("{0}.marshal".format(path.name))
+
+
+def load_config_file(path: Path) -> StrAnyDict:
+    """Load a config file in the format selected by its suffix.
+
+    ".json" files are JSON and ".toml" files are TOML, anything else is
+    YAML. A parsed YAML file is kept in a marshal sidecar, later loads use
+    it while the inode, mtime and size of the YAML file are unchanged.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the config file
+
+    Returns
+    -------
+    StrAnyDict
+        The configuration
+
+    Raises
+    ------
+    ValueError
+        When a TOML config is loaded by Python older than 3.11
+    """
+    suffix = path.suffix.lower()
+    if suffix in JSON_SUFFIXES:
+        return load_json_file(path)
+    if suffix in TOML_SUFFIXES:
+        if sys.version_info < (3, 11):
+            raise ValueError("TOML config requires Python 3.11: {0}".format(path))
+        import tomllib  # noqa: WPS433
+
+        with open(path, "rb") as toml_file:
+            return tomllib.load(toml_file)
+    return _load_compiled_yaml(path)
+
+
+def write_config_file(path: Path, config: StrAnyDict) -> None:
+    """Write a config file in the format selected by its suffix.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the config file
+    config : StrAnyDict
+        The configuration
+    """
+    suffix = path.suffix.lower()
+    if suffix in JSON_SUFFIXES:
+        write_json_file(path, config)
+    elif suffix in TOML_SUFFIXES:
+        path.write_text(_dump_toml(config))
+    else:
+        safe_write_yaml_file(path, config)
+
+
+def _load_compiled_yaml(path: Path) -> StrAnyDict:
+    """Load a YAML config file through its marshal sidecar.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the YAML config file
+
+    Returns
+    -------
+    StrAnyDict
+        The configuration
+    """
+    signature = file_signature(path)
+    sidecar = compiled_path(path)
+    config = _read_compiled(sidecar, signature)
+    if config is None:
+        config = load_yaml_file(path)
+        _write_compiled(sidecar, signature, config)
+    return config
+
+
+def _read_compiled(
+    sidecar: Path,
+    signature: Optional[FileSignature],
+) -> Optional[StrAnyDict]:
+    """Return the configuration of a sidecar matching the YAML file signature.
+
+    Parameters
+    ----------
+    sidecar : Path
+        Path of the marshal sidecar
+    signature : Optional[FileSignature]
+        Signature of the YAML config file
+
+    Returns
+    -------
+    Optional[StrAnyDict]
+        The configuration or None when the sidecar is missing, stale or not
+        a sidecar of this version
+    """
+    try:
+        payload = marshal.loads(sidecar.read_bytes())
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(payload, tuple) or len(payload) != 3:
+        return None
+    version, saved_signature, config = payload
+    if (version, saved_signature) != (CONST_COMPILED_VERSION, signature):
+        return None
+    return config if isinstance(config, dict) else None
+
+
+def _write_compiled(
+    sidecar: Path,
+    signature: Optional[FileSignature],
+    config: StrAnyDict,
+) -> None:
+    """Write the marshal sidecar of a parsed YAML config file.
+
+    Parameters
+    ----------
+    sidecar : Path
+        Path of the marshal sidecar
+    signature : Optional[FileSignature]
+        Signature of the YAML config file
+    config : StrAnyDict
+        The parsed configuration
+    """
+    try:
+        payload = marshal.dumps((CONST_COMPILED_VERSION, signature, config))
+    except ValueError:  # a value marshal cannot store, such as a date
+        return
+    tmp_path = sidecar.with_name("{0}.tmp".format(sidecar.name))
+    with suppress(OSError):  # the sidecar is only an optimization
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, sidecar)
+
+
+def _dump_toml(config: StrAnyDict) -> str:
+    """Return a flat configuration as TOML.
+
+    Parameters
+    ----------
+    config : StrAnyDict
+        The configuration, values must be strings, integers or booleans
+
+    Returns
+    -------
+    str
+        The TOML document
+
+    Raises
+    ------
+    ValueError
+        When a value is not a string, integer or boolean
+    """
+    lines = []
+    for key, valor in config.items():
+        if not isinstance(valor, (str, int)):
+            raise ValueError("Cannot write {0} to a TOML config".format(key))
+        line = "{0} = {1}\n".format(json.dumps(key), json.dumps(valor))
+        lines.append(line)
+    return "".join(lines)
@@ -2,13 +2,53 @@
 
 import types
 from pathlib import Path
+from typing import Mapping
 
 VERSION = "0.2.4"
 
-HOME = Path.home()
-DEFAULTS = types.MappingProxyType(
-    {
-        "cache": HOME / ".cache" / "dailylog.json",
-        "config": HOME / ".config" / "dailylog.yaml",
-    }
-)
+# HOME and DEFAULTS are resolved on each access by __getattr__, so importing
+# the package does not look up the home directory
+HOME: Path
+DEFAULTS: Mapping[str, Path]
+
+
+def default_paths() -> Mapping[str, Path]:
+    """Return the default cache and config file paths of the current user.
+
+    Returns
+    -------
+    Mapping[str, Path]
+        Paths by option name "cache" and "config"
+    """
+    home = Path.home()
+    return types.MappingProxyType(
+        {
+            "cache": home / ".cache" / "dailylog.json",
+            "config": home / ".config" / "dailylog.yaml",
+        },
+    )
+
+
+def __getattr__(name: str) -> object:  # noqa: WPS413
+    """Resolve HOME and DEFAULTS on access.
+
+    Parameters
+    ----------
+    name : str
+        Attribute name
+
+    Returns
+    -------
+    object
+        The attribute value
+
+    Raises
+    ------
+    AttributeError
+        When name is not a lazy attribute
+    """
+    if name == "HOME":
+        return Path.home()
+    if name == "DEFAULTS":
+        return default_paths()
+    raise AttributeError("module {0} has no attribute {1}".format(__name__, name))
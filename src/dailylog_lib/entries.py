@@ -0,0 +1,242 @@
+"""Top level module entries for dailylog-lib."""
+
+from array import array
+from collections.abc import Callable, Hashable, Iterator
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+from dailylog_lib.record import CacheRecord
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+# WPS214 Found too many methods
+class EntryTable(Generic[KeyT]):  # noqa: WPS214
+    """Class holding cache records in compact columns.
+
+    The shown, suppressed and expires values are kept in parallel array("q")
+    columns and a dict maps each key to its row, so a record costs three
+    machine words plus its key instead of a dict per record.
+
+    When max_entries is set the dict is kept in least recently used order and
+    the least recently used record is evicted to make room for a new key.
+    prune() removes expired records a few rows at a time.
+    """
+
+    max_entries: int
+    on_remove: Optional[Callable[[KeyT], None]]
+
+    def __init__(
+        self,
+        max_entries: int = 0,
+        on_remove: Optional[Callable[[KeyT], None]] = None,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of records, 0 for no limit
+        on_remove : Optional[Callable[[KeyT], None]]
+            Called with the key of every evicted or pruned record
+        """
+        self.max_entries = max_entries
+        self.on_remove = on_remove
+        self._rows: Dict[KeyT, int] = {}
+        self._keys: List[KeyT] = []
+        self._shown = array("q")
+        self._suppressed = array("q")
+        self._expires = array("q")
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if key has a record."""
+        return key in self._rows
+
+    def get(self, key: KeyT) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : KeyT
+            Unique key for the cache record
+
+        Returns
+        -------
+        Optional[CacheRecord]
+            A copy of the record or None when key has no record
+        """
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return CacheRecord.from_values(
+            self._shown[row],
+            self._suppressed[row],
+            self._expires[row],
+        )
+
+    def put(self, key: KeyT, record: CacheRecord) -> None:
+        """Store a copy of record for key.
+
+        Parameters
+        ----------
+        key : KeyT
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+        row = self._row(key)
+        self._shown[row] = record.shown
+        self._suppressed[row] = record.suppressed
+        self._expires[row] = record.expires
+
+    def suppress(self, key: KeyT, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the row of key in place.
+
+        Parameters
+        ----------
+        key : KeyT
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record
+        """
+        row = self._row(key)
+        record = CacheRecord.from_values(
+            self._shown[row],
+            self._suppressed[row],
+            self._expires[row],
+        )
+        record.suppress(stifle)
+        self._shown[row] = record.shown
+        self._suppressed[row] = record.suppressed
+        self._expires[row] = record.expires
+        return record
+
+    def delete(self, key: KeyT) -> bool:
+        """Delete the record for key without calling on_remove.
+
+        Parameters
+        ----------
+        key : KeyT
+            Unique key for the cache record
+
+        Returns
+        -------
+        bool
+            True if key had a record
+        """
+        row = self._rows.get(key)
+        if row is None:
+            return False
+        self._remove_row(row)
+        return True
+
+    def prune(self, now: int, budget: int) -> int:
+        """Remove expired records among the next budget rows.
+
+        Successive calls continue where the previous call stopped, so the
+        whole table is visited without any single call scanning all rows.
+
+        Parameters
+        ----------
+        now : int
+            Current epoch seconds
+        budget : int
+            Number of rows to examine
+
+        Returns
+        -------
+        int
+            Number of removed records
+        """
+        removed = 0
+        for _ in range(min(budget, len(self._keys))):
+            if self._cursor >= len(self._keys):
+                self._cursor = 0
+            if self._expires[self._cursor] < now:
+                self._evict(self._cursor)
+                removed += 1
+            else:
+                self._cursor += 1
+        return removed
+
+    def items(self) -> Iterator[Tuple[KeyT, int, int, int]]:  # noqa: WPS110
+        """Yield the records.
+
+        Yields
+        ------
+        Tuple[KeyT, int, int, int]
+            Tuple of key, shown, suppressed and expires
+        """
+        yield from zip(self._keys, self._shown, self._suppressed, self._expires)
+
+    def _row(self, key: KeyT) -> int:
+        """Return the row of key, appending an empty row when it is new.
+
+        Parameters
+        ----------
+        key : KeyT
+            Unique key for the cache record
+
+        Returns
+        -------
+        int
+            The row
+        """
+        row = self._rows.get(key)
+        if row is not None:
+            if self.max_entries:  # keep the dict in least recently used order
+                self._rows[key] = self._rows.pop(key)
+            return row
+        while self.max_entries and len(self._keys) >= self.max_entries:
+            self._evict(self._rows[next(iter(self._rows))])
+        row = len(self._keys)
+        self._rows[key] = row
+        self._keys.append(key)
+        self._shown.append(0)
+        self._suppressed.append(0)
+        self._expires.append(0)
+        return row
+
+    def _evict(self, row: int) -> None:
+        """Remove a row and report its key to on_remove.
+
+        Parameters
+        ----------
+        row : int
+            The row
+        """
+        key = self._keys[row]
+        self._remove_row(row)
+        if self.on_remove is not None:
+            self.on_remove(key)
+
+    def _remove_row(self, row: int) -> None:
+        """Remove a row by moving the last row into its place.
+
+        Parameters
+        ----------
+        row : int
+            The row
+        """
+        last = len(self._keys) - 1
+        del self._rows[self._keys[row]]  # noqa: WPS420
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._shown[row] = self._shown[last]
+            self._suppressed[row] = self._suppressed[last]
+            self._expires[row] = self._expires[last]
+            self._rows[moved] = row
+        self._keys.pop()
+        self._shown.pop()
+        self._suppressed.pop()
+        self._expires.pop()
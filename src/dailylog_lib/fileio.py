@@ -0,0 +1,105 @@
+"""Top level module fileio for dailylog-lib.
+
+Wrappers of the wtforglib file helpers importing them on first use.
+wtforglib.files pulls in the YAML parser and wtforglib.dirs pulls in
+tempfile, neither is needed to import dailylog_lib or to log a message
+that leaves the cache and config untouched.
+"""
+
+from pathlib import Path
+
+from wtforglib.kinds import StrAnyDict
+
+
+def ensure_directory(path: Path) -> bool:
+    """Create a directory if it does not exist.
+
+    Parameters
+    ----------
+    path : Path
+        The directory
+
+    Returns
+    -------
+    bool
+        True if the directory exists
+    """
+    from wtforglib import dirs  # noqa: WPS433
+
+    return dirs.ensure_directory(path)
+
+
+def load_json_file(path: Path) -> StrAnyDict:
+    """Load a JSON file, an empty dict when it does not exist.
+
+    Parameters
+    ----------
+    path : Path
+        The JSON file
+
+    Returns
+    -------
+    StrAnyDict
+        Contents of the file
+    """
+    from wtforglib import files  # noqa: WPS433
+
+    return files.load_json_file(path)
+
+
+def write_json_file(path: Path, document: StrAnyDict) -> bool:
+    """Write a JSON file.
+
+    Parameters
+    ----------
+    path : Path
+        The JSON file
+    document : StrAnyDict
+        Contents of the file
+
+    Returns
+    -------
+    bool
+        True if the file exists
+    """
+    from wtforglib import files  # noqa: WPS433
+
+    return files.write_json_file(path, document)
+
+
+def load_yaml_file(path: Path) -> StrAnyDict:
+    """Load a YAML file, an empty dict when it does not exist.
+
+    Parameters
+    ----------
+    path : Path
+        The YAML file
+
+    Returns
+    -------
+    StrAnyDict
+        Contents of the file
+    """
+    from wtforglib import files  # noqa: WPS433
+
+    return files.load_yaml_file(path)
+
+
+def safe_write_yaml_file(path: Path, document: StrAnyDict) -> bool:
+    """Write a YAML file.
+
+    Parameters
+    ----------
+    path : Path
+        The YAML file
+    document : StrAnyDict
+        Contents of the file
+
+    Returns
+    -------
+    bool
+        True if the file exists
+    """
+    from wtforglib import files  # noqa: WPS433
+
+    return files.safe_write_yaml_file(path, document)
@@ -0,0 +1,146 @@
+"""Top level module handler for dailylog-lib."""
+
+import logging
+from logging.handlers import QueueHandler
+from typing import Dict, Optional
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.record import CONST_DAY
+
+# record attribute carrying the suppression key through a QueueHandler
+KEY_ATTRIBUTE = "dailylog_key"
+
+
+def suppression_key(record: logging.LogRecord) -> str:
+    """Return the suppression key of a log record.
+
+    The key combines the logger name, the level number and the unformatted
+    message template, so repeats of a message with different arguments are
+    suppressed together and the record is never formatted for the key.
+
+    Parameters
+    ----------
+    record : logging.LogRecord
+        The record
+
+    Returns
+    -------
+    str
+        The key
+    """
+    key = record.__dict__.get(KEY_ATTRIBUTE)
+    if key is None:
+        return "{0}:{1}:{2}".format(record.name, record.levelno, record.msg)
+    return str(key)
+
+
+class DailylogHandler(logging.Handler):
+    """Class handling stdlib logging records with dailylog suppression.
+
+    Every record is appended to the log file. Terminal output of a record
+    is suppressed for suppress seconds after the same key was shown, see
+    suppression_key(). With suppress 0 records are only appended to the
+    log file through Cache.append_daily and the cache is never touched.
+    The record is formatted once, after the suppression check.
+
+    To keep the file I/O and cache saves off application threads attach
+    the handler to a QueueListener and log through a DailylogQueueHandler.
+    """
+
+    cache: Cache
+
+    def __init__(
+        self,
+        cache: Optional[Cache] = None,
+        level: int = logging.NOTSET,
+        suppress: int = CONST_DAY,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        cache : Optional[Cache]
+            Cache tracking the suppressed keys, by default a Cache created
+            with kwargs and closed with the handler
+        level : int
+            Minimum level of handled records
+        suppress : int
+            Seconds to suppress terminal output of repeated records
+        kwargs : dict
+            Keyword arguments of Cache when cache is None, and the options
+            logfn and quiet of Cache.log_message
+        """
+        super().__init__(level)
+        self._owned = cache is None
+        self.cache = Cache(**kwargs) if cache is None else cache
+        self.suppress = suppress
+        self._options: Dict[str, bool | int | str] = {
+            "suppress": suppress,
+            "quiet": bool(kwargs.get("quiet", False)),
+        }
+        logfn = kwargs.get("logfn")
+        if logfn is not None:
+            self._options["logfn"] = str(logfn)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Log a record through the cache.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The record
+        """
+        try:
+            if self.suppress > 0:
+                self.cache.log_message(
+                    suppression_key(record),
+                    lambda: self.format(record),
+                    label=record.levelname,
+                    **self._options,
+                )
+            else:
+                log_fn = self._options.get("logfn")
+                if log_fn is None:
+                    log_fn = self.cache.default_log()
+                Cache.append_daily(record.levelname, self.format(record), str(log_fn))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Save pending cache changes."""
+        self.cache.flush()
+
+    def close(self) -> None:
+        """Close the handler and the cache it created."""
+        if self._owned:
+            self.cache.close()
+        else:
+            self.cache.flush()
+        super().close()
+
+
+class DailylogQueueHandler(QueueHandler):
+    """QueueHandler keeping the suppression key of queued records.
+
+    QueueHandler.prepare() replaces the message template of a record with
+    the formatted message. The key is computed before that, so a
+    DailylogHandler behind a QueueListener suppresses by template.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return the record to queue carrying its suppression key.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The record
+
+        Returns
+        -------
+        logging.LogRecord
+            The prepared record
+        """
+        setattr(record, KEY_ATTRIBUTE, suppression_key(record))  # noqa: B010
+        prepared: logging.LogRecord = super().prepare(record)
+        return prepared
@@ -0,0 +1,128 @@
+"""Top level module handles for dailylog-lib."""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, TextIO, Tuple
+
+CONST_MAX_HANDLES = 16
+
+FileIdentity = Tuple[int, int]
+
+
+def file_identity(log_fn: str) -> Optional[FileIdentity]:
+    """Return the device and inode of a file.
+
+    Parameters
+    ----------
+    log_fn : str
+        Path name of file
+
+    Returns
+    -------
+    Optional[FileIdentity]
+        Tuple of (st_dev, st_ino) or None if the file does not exist
+    """
+    try:
+        stat = os.stat(log_fn)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class HandlePool:
+    """Class to keep append handles open between writes.
+
+    Writes and closes are serialized by a lock, so threads sharing a pool
+    never interleave partial lines.
+    """
+
+    max_handles: int
+
+    def __init__(self, max_handles: int = CONST_MAX_HANDLES) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        max_handles : int
+            Maximum number of open handles, by default CONST_MAX_HANDLES
+        """
+        self.max_handles = max(1, max_handles)
+        self._handles: OrderedDict[str, Tuple[TextIO, FileIdentity]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of open handles."""
+        return len(self._handles)
+
+    def __contains__(self, log_fn: object) -> bool:
+        """Return True if a handle is open for log_fn."""
+        return log_fn in self._handles
+
+    def write(self, log_fn: str, text: str) -> None:
+        """Append text to the specified log file.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of log file
+        text : str
+            Text to append
+        """
+        with self._lock:
+            stream = self._acquire(log_fn)
+            stream.write(text)
+            stream.flush()
+
+    def close(self, log_fn: Optional[str] = None) -> None:
+        """Close one or all open handles.
+
+        Parameters
+        ----------
+        log_fn : str, optional
+            Path name of log file to close, by default all handles are closed
+        """
+        with self._lock:
+            if log_fn is not None:
+                self._discard(log_fn)
+                return
+            while self._handles:
+                self._discard(next(iter(self._handles)))
+
+    def _acquire(self, log_fn: str) -> TextIO:
+        """Return an open handle for log_fn reopening it if rotated or deleted.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of log file
+
+        Returns
+        -------
+        TextIO
+            Handle open for appending
+        """
+        entry = self._handles.get(log_fn)
+        if entry is not None:
+            if file_identity(log_fn) == entry[1]:
+                self._handles.move_to_end(log_fn)
+                return entry[0]
+            self._discard(log_fn)
+        stream = open(log_fn, "a")  # noqa: WPS515
+        stat = os.fstat(stream.fileno())
+        self._handles[log_fn] = (stream, (stat.st_dev, stat.st_ino))
+        while len(self._handles) > self.max_handles:
+            self._discard(next(iter(self._handles)))
+        return stream
+
+    def _discard(self, log_fn: str) -> None:
+        """Close and forget the handle for log_fn.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of log file
+        """
+        entry = self._handles.pop(log_fn, None)
+        if entry is not None:
+            entry[0].close()
@@ -0,0 +1,372 @@
+"""Top level module journal for dailylog-lib."""
+
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.entries import EntryTable
+from dailylog_lib.fileio import ensure_directory
+from dailylog_lib.record import CacheRecord, key_hash
+from dailylog_lib.storage import ENTRIES, CacheStore
+
+CONST_JOURNAL_VERSION = 1
+CONST_COMPACT_RATIO = 4
+CONST_COMPACT_MINIMUM = 1024
+JOURNAL_MAGIC = b"DLJ\x01"
+HEADER_SIZE = len(JOURNAL_MAGIC)
+# key hash, shown, suppressed, expires
+JOURNAL_RECORD = struct.Struct("<Qqqq")
+# shown of a record marking its key as removed
+TOMBSTONE = -1
+
+JournalEntry = Tuple[int, int, int]
+JournalRow = Tuple[int, int, int, int]
+
+
+# WPS214 Found too many methods
+class JournalStore(CacheStore):  # noqa: WPS214
+    """Class storing the cache as an append only journal of fixed size records.
+
+    A save appends one record per changed key and loading replays the journal,
+    the last record of a key wins. Records are keyed by key_hash(key), so the
+    original keys are not stored. Evicted and pruned keys are journaled as
+    tombstones. Once the journal holds more than compact_ratio records per
+    live key it is rewritten in a background thread with a single record per
+    key.
+    """
+
+    entries: EntryTable[int]
+    compact_ratio: int
+    compact_minimum: int
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 0,
+        compact_ratio: int = CONST_COMPACT_RATIO,
+        compact_minimum: int = CONST_COMPACT_MINIMUM,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the journal file
+        max_entries : int
+            Maximum number of records, 0 for no limit
+        compact_ratio : int
+            Compact when journal records exceed live keys times this ratio
+        compact_minimum : int
+            Never compact journals with fewer records than this
+        """
+        super().__init__(path, max_entries)
+        self.compact_ratio = compact_ratio
+        self.compact_minimum = compact_minimum
+        self.entries = self._new_table()
+        self._pending: Dict[int, JournalEntry] = {}
+        self._records = 0
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._compacting: Optional[Dict[int, JournalEntry]] = None
+        self._stream: Optional[BinaryIO] = None
+
+    def __len__(self) -> int:
+        """Return the number of cached records."""
+        return len(self.entries)
+
+    @property
+    def journal_records(self) -> int:
+        """Return the number of records in the journal file."""
+        return self._records
+
+    def load(self) -> None:
+        """Replay the journal, creating an empty one if it does not exist.
+
+        Raises
+        ------
+        ValueError
+            When the file is not a dailylog journal
+        """
+        self.entries = self._new_table()
+        self._records = 0
+        if not self.path.is_file():
+            ensure_directory(self.path.parent)
+            self._rewrite(())
+            return
+        with open(self.path, "rb") as journal:
+            payload = journal.read()
+        if not payload.startswith(JOURNAL_MAGIC):
+            raise ValueError("Not a dailylog journal: {0}".format(self.path))
+        self._replay(memoryview(payload)[HEADER_SIZE:])
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        Optional[CacheRecord]
+            The record or None when key is not cached
+        """
+        return self.entries.get(key_hash(key))
+
+    def put(self, key: str, record: CacheRecord) -> None:
+        """Store the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+        hashed = key_hash(key)
+        self.entries.put(hashed, record)
+        self._pending[hashed] = (record.shown, record.suppressed, record.expires)
+
+    def suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the record for key in place.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record, its suppressed count is 0 when it is shown
+        """
+        hashed = key_hash(key)
+        record = self.entries.suppress(hashed, stifle)
+        self._pending[hashed] = (record.shown, record.suppressed, record.expires)
+        return record
+
+    def prune(self, budget: int) -> int:
+        """Remove expired records, examining at most budget records.
+
+        Parameters
+        ----------
+        budget : int
+            Number of records to examine
+
+        Returns
+        -------
+        int
+            Number of removed records
+        """
+        return self.entries.prune(int(time.time()), budget)
+
+    def changes_layout(self, key: str) -> bool:
+        """Return True if suppressing key adds a row to the table.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        bool
+            True when key has no record yet
+        """
+        return key_hash(key) not in self.entries
+
+    def save(self) -> None:
+        """Append the records changed since the previous save."""
+        if not self._pending:
+            return
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            stream = self._open()
+            stream.write(
+                b"".join(
+                    JOURNAL_RECORD.pack(hashed, *entry)
+                    for hashed, entry in pending.items()
+                ),
+            )
+            stream.flush()
+            self._records += len(pending)
+            self._journal_since_snapshot(pending)
+            self._maybe_compact()
+
+    def close(self) -> None:
+        """Save pending records, wait for compaction and close the journal."""
+        self.save()
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def compact(self) -> None:
+        """Rewrite the journal with a single record per live key."""
+        with self._lock:
+            self._rewrite(list(self.entries.items()))
+            self._compacting = None
+
+    def to_dict(self) -> StrAnyDict:
+        """Return the cache contents in the JSON cache layout.
+
+        Returns
+        -------
+        StrAnyDict
+            The cache document keyed by hexadecimal key hashes
+        """
+        entries = {}
+        for row in self.entries.items():
+            record = CacheRecord.from_values(row[1], row[2], row[3])
+            entries["{0:016x}".format(row[0])] = record.to_dict()
+        return {"version": CONST_JOURNAL_VERSION, ENTRIES: entries}
+
+    def _maybe_compact(self) -> None:
+        """Start a background compaction when the journal is too sparse.
+
+        The rows are copied here, on the thread changing the table, and
+        records saved before the compaction runs are added to the copy by
+        _journal_since_snapshot(). The caller must hold the lock.
+        """
+        threshold = max(self.compact_minimum, self.compact_ratio * len(self.entries))
+        if self._records <= threshold or self._compacting is not None:
+            return
+        snapshot: Dict[int, JournalEntry] = {}
+        for row in self.entries.items():
+            snapshot[row[0]] = row[1:]
+        self._compacting = snapshot
+        self._compactor = threading.Thread(
+            target=self._compact_snapshot,
+            args=(self._compacting,),
+            name="dailylog-journal-compact",
+            daemon=True,
+        )
+        self._compactor.start()
+
+    def _compact_snapshot(self, snapshot: Dict[int, JournalEntry]) -> None:
+        """Rewrite the journal from a copy of the table, run by the compactor.
+
+        Parameters
+        ----------
+        snapshot : Dict[int, JournalEntry]
+            Live records by key hash, updated by saves until the rewrite
+        """
+        with self._lock:
+            if self._compacting is snapshot:
+                rows = [(hashed, *entry) for hashed, entry in snapshot.items()]
+                self._rewrite(rows)
+                self._compacting = None
+
+    def _journal_since_snapshot(self, pending: Dict[int, JournalEntry]) -> None:
+        """Apply records saved after the compaction snapshot to it.
+
+        The caller must hold the lock.
+
+        Parameters
+        ----------
+        pending : Dict[int, JournalEntry]
+            The saved records by key hash
+        """
+        snapshot = self._compacting
+        if snapshot is None:
+            return
+        for hashed, entry in pending.items():
+            if entry[0] == TOMBSTONE:
+                snapshot.pop(hashed, None)
+            else:
+                snapshot[hashed] = entry
+
+    def _open(self) -> BinaryIO:
+        """Return the journal opened for appending.
+
+        Returns
+        -------
+        BinaryIO
+            The journal stream
+        """
+        if self._stream is None:
+            self._stream = open(self.path, "ab")  # noqa: WPS515
+        return self._stream
+
+    def _rewrite(self, rows: Iterable[JournalRow]) -> None:
+        """Atomically replace the journal with one record per entry.
+
+        The caller must hold the lock unless no other thread uses the store.
+
+        Parameters
+        ----------
+        rows : Iterable[JournalRow]
+            Tuples of key hash, shown and suppressed to write
+        """
+        tmp_path = self.path.with_name("{0}.tmp".format(self.path.name))
+        with open(tmp_path, "wb") as journal:
+            journal.write(JOURNAL_MAGIC)
+            packed = b"".join(JOURNAL_RECORD.pack(*row) for row in rows)
+            journal.write(packed)
+        os.replace(tmp_path, self.path)
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._records = len(packed) // JOURNAL_RECORD.size
+
+    def _replay(self, body: memoryview) -> None:
+        """Replay journal records.
+
+        Parameters
+        ----------
+        body : memoryview
+            Journal contents following the header
+        """
+        usable = len(body) - len(body) % JOURNAL_RECORD.size
+        if usable != len(body):  # drop record torn by an interrupted write
+            os.truncate(self.path, HEADER_SIZE + usable)
+        for row in JOURNAL_RECORD.iter_unpack(body[:usable]):
+            self._apply(row)
+        self._records = usable // JOURNAL_RECORD.size
+
+    def _apply(self, row: JournalRow) -> None:
+        """Apply a journal record to the table.
+
+        Parameters
+        ----------
+        row : JournalRow
+            Tuple of key hash, shown, suppressed and expires
+        """
+        hashed, shown, suppressed, expires = row
+        if shown == TOMBSTONE:
+            self.entries.delete(hashed)
+        else:
+            record = CacheRecord.from_values(shown, suppressed, expires)
+            self.entries.put(hashed, record)
+
+    def _new_table(self) -> EntryTable[int]:
+        """Return an empty table journaling removed keys as tombstones.
+
+        Returns
+        -------
+        EntryTable[int]
+            The table
+        """
+        return EntryTable(self.max_entries, self._tombstone)
+
+    def _tombstone(self, hashed: int) -> None:
+        """Queue a tombstone for a removed key.
+
+        Parameters
+        ----------
+        hashed : int
+            Hash of the removed key
+        """
+        self._pending[hashed] = (TOMBSTONE, 0, 0)
@@ -0,0 +1,144 @@
+"""Top level module locks for dailylog-lib."""
+
+import sys
+import threading
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from typing import List, Optional
+
+CONST_LOCK_STRIPES = 64
+
+
+class StripedLock:
+    """Class holding a fixed set of locks selected by key.
+
+    Threads working on keys of different stripes do not wait for each
+    other. hold_all() takes every stripe in index order for changes that
+    affect all keys.
+    """
+
+    def __init__(self, stripes: int = CONST_LOCK_STRIPES) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        stripes : int
+            Number of locks
+        """
+        self._locks: List[threading.Lock] = [
+            threading.Lock() for _ in range(max(1, stripes))
+        ]
+
+    def __len__(self) -> int:
+        """Return the number of stripes."""
+        return len(self._locks)
+
+    def index(self, key: Hashable) -> int:
+        """Return the stripe of key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key
+
+        Returns
+        -------
+        int
+            Stripe index
+        """
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[int]:
+        """Hold the lock of the stripe of key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key
+
+        Yields
+        ------
+        int
+            Stripe index
+        """
+        stripe = self.index(key)
+        with self._locks[stripe]:
+            yield stripe
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """Hold the locks of all stripes.
+
+        Yields
+        ------
+        None
+            Nothing, all stripes are held until the context exits
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for held in reversed(self._locks):
+                held.release()
+
+
+class Flusher:
+    """Class running a flush callback on a dedicated thread.
+
+    request() only wakes the thread. Requests made before the flush starts
+    are served by that single flush, so a burst of changes costs one save.
+    With an interval the thread waits that many seconds after the first
+    request before flushing, coalescing the requests of the whole interval.
+    """
+
+    interval: float
+
+    def __init__(self, callback: Callable[[], None], interval: float = 0) -> None:
+        """Class constructor starting the flusher thread.
+
+        Parameters
+        ----------
+        callback : Callable[[], None]
+            Called on the flusher thread for every flush
+        interval : float
+            Seconds to wait between a request and its flush
+        """
+        self.interval = interval
+        self._callback = callback
+        self._wanted = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._run,
+            name="dailylog-flusher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def request(self) -> None:
+        """Ask for a flush."""
+        self._wanted.set()
+
+    def close(self) -> None:
+        """Stop the flusher thread, pending requests are not flushed."""
+        self._stopped.set()
+        self._wanted.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        """Flush once per batch of requests until stopped."""
+        while not self._stopped.is_set():
+            self._wanted.wait()
+            if self.interval > 0:
+                self._stopped.wait(self.interval)
+            if self._stopped.is_set():
+                return
+            self._wanted.clear()
+            try:
+                self._callback()
+            except OSError as err:
+                sys.stderr.write("dailylog flusher: {0}\n".format(err))
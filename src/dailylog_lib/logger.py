@@ -1,46 +1,76 @@
 """Logging module for wtftools package."""
 
-import logging
 import sys
+import threading
 from types import MappingProxyType
+from typing import Dict, Mapping, Tuple, Union
 
 from dailylog_lib.cache import Cache
+from dailylog_lib.message import Message, prefix_message, render_message
+from dailylog_lib.options import Options
 
 LABEL = "label"
 WARNING = "WARNING"
-LOG_LEVELS = MappingProxyType(
-    {
-        "CRITICAL": logging.CRITICAL,
-        "ERROR": logging.ERROR,
-        WARNING: logging.WARNING,
-        "INFO": logging.INFO,
-        "DEBUG": logging.DEBUG,
-    },
-)
-
-
-def _label_to_level(level: str) -> int:
-    """
-    Convert a log label to its corresponding level.
+# the values of the logging module, which is not imported as it is costly,
+# plus the intermediate TRACE and NOTICE levels
+LEVEL_CRITICAL = 50
+LEVEL_ERROR = 40
+LEVEL_WARNING = 30
+LEVEL_NOTICE = 25
+LEVEL_INFO = 20
+LEVEL_DEBUG = 10
+LEVEL_TRACE = 5
+
+# label mapped to level, extended by add_level()
+_levels: Dict[str, int] = {}
+# level mapped to label
+_labels: Dict[int, str] = {}
+# every accepted spelling of a level, its label, lower case label, number
+# and number as text, mapped to the label and to the level
+_label_table: Dict[str, str] = {}
+_level_table: Dict[Union[int, str], int] = {}
+
+LOG_LEVELS: Mapping[str, int] = MappingProxyType(_levels)
+LEVEL_LABELS: Mapping[int, str] = MappingProxyType(_labels)
+
+
+def add_level(label: str, level: int) -> None:
+    """Add a custom log level.
+
+    A level number already named keeps its first label for log_label().
 
     Parameters
     ----------
-    level : str
-        Log level label, e.g. "WARNING", "INFO", etc.
+    label : str
+        Level name, stored in upper case
+    level : int
+        Level number
 
     Raises
     ------
     ValueError
-        If the log label is a number.
-
-    Returns
-    -------
-    int
-        The corresponding log level, e.g. logging.WARNING, logging.INFO, etc.
+        If the log label is empty or a number.
     """
-    if level.isdigit():
+    if not label or label.isdigit():
         raise ValueError("Log label cannot be a number.")
-    return LOG_LEVELS.get(level.upper(), logging.WARNING)
+    label = label.upper()
+    _levels[label] = level
+    _labels.setdefault(level, label)
+    for spelling in (label, label.lower()):
+        _label_table[spelling] = label
+        _level_table[spelling] = level
+    _label_table[str(level)] = _labels[level]
+    _level_table[str(level)] = level
+    _level_table[level] = level
+
+
+add_level("CRITICAL", LEVEL_CRITICAL)
+add_level("ERROR", LEVEL_ERROR)
+add_level(WARNING, LEVEL_WARNING)
+add_level("NOTICE", LEVEL_NOTICE)
+add_level("INFO", LEVEL_INFO)
+add_level("DEBUG", LEVEL_DEBUG)
+add_level("TRACE", LEVEL_TRACE)
 
 
 def log_label(level: str) -> str:
@@ -54,49 +84,42 @@ def log_label(level: str) -> str:
     Returns
     -------
     str
-        Level name, Default if not matched, by default "ERROR"
+        Level name, Default if not matched, by default "WARNING"
     """
-    if level.isdigit():
-        i_level = int(level)
-        for key, valor in LOG_LEVELS.items():
-            if i_level == valor:
-                return key
-    else:
-        u_level = level.upper()
-        if u_level in LOG_LEVELS:
-            return u_level
-
-    return WARNING
+    label = _label_table.get(level)
+    if label is None:
+        return _label_table.get(level.upper(), WARNING)
+    return label
 
 
 def log_level(level: int | str) -> int:
-    """Return logger level name.
+    """Return logger level number.
 
     Parameters
     ----------
-    level : str
+    level : int | str
         Level number or name
 
     Returns
     -------
     int
-        Level, default logging.WARNING
+        Level, default LEVEL_WARNING
     """
-    if isinstance(level, str):
-        if level.isdigit():
-            level = int(level)
-        else:
-            return _label_to_level(level)
+    found = _level_table.get(level)
+    if found is None:
+        if isinstance(level, str):
+            return _level_table.get(level.upper(), LEVEL_WARNING)
+        return LEVEL_WARNING
+    return found
 
-    for key, valor in LOG_LEVELS.items():
-        if level == valor:
-            return level
 
-    return logging.WARNING
+# WPS214 Found too many methods
+class Logger(Cache):  # noqa: WPS214
+    """Logging class for dailylog-lib package.
 
-
-class Logger(Cache):
-    """Logging class for dailylog-lib package."""
+    The level methods pass their label to the message path as is, only
+    log() resolves the label it is given.
+    """
 
     _level: int
 
@@ -111,7 +134,8 @@ class Logger(Cache):
             - cache (str): Cache file path, optional.
             - config (str): Config file path, optional.
             - debug (bool | int): Debug level, defaults to 0.
-            - level (str | int): Log level, defaults to "WARNING".
+            - level (str | int): Log level, defaults to "WARNING", see
+              LOG_LEVELS and add_level() for the names.
             - test (bool): Test mode flag, defaults to False.
             - verbose (bool | int): Verbosity level, defaults to 0.
 
@@ -121,13 +145,16 @@ class Logger(Cache):
         super().__init__(**kwargs)
         self._level = log_level(kwargs.get("level", WARNING))
 
-    def log(self, message: str, **kwargs: bool | int | str) -> None:
+    def log(self, message: Message, *args: object, **kwargs: bool | int | str) -> None:
         """Log a message with specified parameters, handling suppression and caching.
 
         Parameters
         ----------
-        message : str
-            The message to log.
+        message : Message
+            The message to log, a %-style template rendered with args or a
+            callable returning the message, rendered once when it is output.
+        args : object
+            Arguments of the template.
         kwargs : dict
             Keyword arguments that can include:
             - caller (str): Caller name, optional.
@@ -138,46 +165,221 @@ class Logger(Cache):
             - suppress (int): Number of seconds to suppress repeated messages,
             defaults to CONST_DAY.
         """
-        valor = kwargs.get("caller", "")
-        if valor:
-            message = "{0} - {1}".format(valor, message)
         if "key" in kwargs:
-            self.log_message(str(kwargs.pop("key")), message, **kwargs)
+            label = str(kwargs.get(LABEL, "ERROR"))
         else:
             label = log_label(str(kwargs.get(LABEL, WARNING)))
-            log_fn = str(kwargs.get("logfn", ""))
-            if log_fn:
-                Cache.append_daily(label, message, log_fn)
-            if not kwargs.get("quiet", False):
-                stamp = Cache.t_stamp()
-                sys.stderr.write("{0} {1}: {2}\n".format(stamp, label, message))
-
-    def debug(self, message: str, **kwargs: bool | int | str) -> None:
+        self._log(label, message, args, kwargs)
+
+    def trace(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a trace message."""
+        if self._level <= LEVEL_TRACE:
+            self._log("TRACE", message, args, kwargs)
+
+    def debug(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
         """Log a debug message."""
-        if self._level <= logging.DEBUG:
-            kwargs[LABEL] = "DEBUG"
-            self.log(message, **kwargs)
-
-    def info(self, message: str, **kwargs: bool | int | str) -> None:  # noqa: WPS110
+        if self._level <= LEVEL_DEBUG:
+            self._log("DEBUG", message, args, kwargs)
+
+    def info(  # noqa: WPS110
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
         """Log a info message."""
-        if self._level <= logging.INFO:
-            kwargs[LABEL] = "INFO"
-            self.log(message, **kwargs)
-
-    def warning(self, message: str, **kwargs: bool | int | str) -> None:
+        if self._level <= LEVEL_INFO:
+            self._log("INFO", message, args, kwargs)
+
+    def notice(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
+        """Log a notice message."""
+        if self._level <= LEVEL_NOTICE:
+            self._log("NOTICE", message, args, kwargs)
+
+    def warning(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
         """Log a warning message."""
-        if self._level <= logging.WARNING:
-            kwargs[LABEL] = WARNING
-            self.log(message, **kwargs)
-
-    def error(self, message: str, **kwargs: bool | int | str) -> None:
+        if self._level <= LEVEL_WARNING:
+            self._log(WARNING, message, args, kwargs)
+
+    def error(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
         """Log a error message."""
-        if self._level <= logging.ERROR:
-            kwargs[LABEL] = "ERROR"
-            self.log(message, **kwargs)
-
-    def critical(self, message: str, **kwargs: bool | int | str) -> None:
+        if self._level <= LEVEL_ERROR:
+            self._log("ERROR", message, args, kwargs)
+
+    def critical(
+        self,
+        message: Message,
+        *args: object,
+        **kwargs: bool | int | str,
+    ) -> None:
         """Log a critical message."""
-        if self._level <= logging.CRITICAL:
-            kwargs[LABEL] = "CRITICAL"
-            self.log(message, **kwargs)
+        if self._level <= LEVEL_CRITICAL:
+            self._log("CRITICAL", message, args, kwargs)
+
+    def _log(
+        self,
+        label: str,
+        message: Message,
+        args: Tuple[object, ...],
+        kwargs: Dict[str, bool | int | str],
+    ) -> None:
+        """Log a message whose label needs no parsing.
+
+        Parameters
+        ----------
+        label : str
+            The resolved label, passed to log_message() as is with a key.
+        message : Message
+            The message to log.
+        args : Tuple[object, ...]
+            Arguments of the message template.
+        kwargs : Dict[str, bool | int | str]
+            Keyword arguments of log()
+        """
+        valor = kwargs.get("caller", "")
+        if valor:
+            message = prefix_message(str(valor), message, args)
+            args = ()
+        if "key" in kwargs:
+            kwargs[LABEL] = label
+            key = str(kwargs.pop("key"))
+            self.log_message(key, message, *args, **kwargs)
+        else:
+            self._write(label, render_message(message, args), kwargs)
+
+    def _write(
+        self,
+        label: str,
+        text: str,
+        kwargs: Dict[str, bool | int | str],
+    ) -> None:
+        """Write a rendered message without a key to the log file and terminal.
+
+        Parameters
+        ----------
+        label : str
+            The resolved label
+        text : str
+            The rendered message
+        kwargs : Dict[str, bool | int | str]
+            Keyword arguments of log()
+        """
+        if Cache.metrics is not None:
+            Cache.metrics.logged(label)
+        log_fn = str(kwargs.get("logfn", ""))
+        if log_fn:
+            Cache.append_daily(label, text, log_fn)
+        if not kwargs.get("quiet", False):
+            stamp = Cache.t_stamp()
+            sys.stderr.write("{0} {1}: {2}\n".format(stamp, label, text))
+
+
+# path arguments of Logger resolved to absolute paths in the registry key
+REGISTRY_PATHS = ("config", "cache")
+# config path, cache path and the sorted other arguments of a shared Logger
+RegistryOption = Tuple[str, bool | int | str]
+RegistryKey = Tuple[str, str, Tuple[RegistryOption, ...]]
+# Logger arguments mapped to the shared Logger and its reference count
+_registry: Dict[RegistryKey, Tuple[Logger, int]] = {}
+_registry_lock = threading.Lock()
+
+
+def _registry_key(**kwargs: bool | int | str) -> RegistryKey:
+    """Return the registry key of logger arguments.
+
+    Parameters
+    ----------
+    kwargs : dict
+        Keyword arguments of Logger
+
+    Returns
+    -------
+    RegistryKey
+        Tuple of config path, cache path and the other arguments
+    """
+    config_fn = Options.validate_fn_absolute("config", str(kwargs.get("config", "")))
+    cache_fn = Options.validate_fn_absolute("cache", str(kwargs.get("cache", "")))
+    options = sorted(
+        (name, option_value)
+        for name, option_value in kwargs.items()
+        if name not in REGISTRY_PATHS
+    )
+    return (config_fn, cache_fn, tuple(options))
+
+
+def get_logger(**kwargs: bool | int | str) -> Logger:
+    """Return the Logger shared by all callers passing the same arguments.
+
+    The first call with a set of arguments creates the Logger, later calls
+    return it. Callers passing other options, such as another level, get a
+    Logger of their own. Every call must be matched by a release_logger()
+    call.
+
+    Parameters
+    ----------
+    kwargs : dict
+        Keyword arguments of Logger
+
+    Returns
+    -------
+    Logger
+        The shared Logger
+    """
+    key = _registry_key(**kwargs)
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is None:
+            entry = (Logger(**kwargs), 0)
+        _registry[key] = (entry[0], entry[1] + 1)
+    return entry[0]
+
+
+def release_logger(logger: Logger) -> None:
+    """Release a Logger returned by get_logger(), closing it with the last release.
+
+    Parameters
+    ----------
+    logger : Logger
+        The shared Logger
+
+    Raises
+    ------
+    ValueError
+        When logger is not a shared Logger
+    """
+    with _registry_lock:
+        shared = {entry[0]: key for key, entry in _registry.items()}
+        key = shared.get(logger)
+        if key is None:
+            raise ValueError("Not a shared logger")
+        references = _registry[key][1]
+        if references > 1:
+            _registry[key] = (logger, references - 1)
+            return
+        del _registry[key]  # noqa: WPS420
+    logger.close()
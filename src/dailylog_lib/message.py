@@ -0,0 +1,60 @@
+"""Top level module message for dailylog-lib."""
+
+from typing import Callable, Tuple, Union
+
+# a message text, a %-style template rendered with the call arguments or a
+# callable returning the text
+Message = Union[str, Callable[[], str]]
+
+
+def render_message(message: Message, args: Tuple[object, ...] = ()) -> str:
+    """Return the text of a deferred message.
+
+    Logging calls keep the message and its arguments as given and only
+    render them once the level and suppression checks pass, so a filtered
+    message never builds its text.
+
+    Parameters
+    ----------
+    message : Message
+        The text, a %-style template or a callable returning the text
+    args : Tuple[object, ...]
+        Arguments of a %-style template, a single mapping is used for
+        named placeholders like in the logging module
+
+    Returns
+    -------
+    str
+        The rendered text
+    """
+    if callable(message):
+        message = message()
+    if not args:
+        return message
+    if len(args) == 1 and isinstance(args[0], dict):
+        return message % args[0]  # noqa: WPS323
+    return message % args  # noqa: WPS323
+
+
+def prefix_message(
+    prefix: str,
+    message: Message,
+    args: Tuple[object, ...] = (),
+) -> Message:
+    """Return a deferred message rendered as "prefix - text".
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of the text, for example the name of the caller
+    message : Message
+        The text, a %-style template or a callable returning the text
+    args : Tuple[object, ...]
+        Arguments of a %-style template
+
+    Returns
+    -------
+    Message
+        Callable rendering the prefixed text
+    """
+    return lambda: "{0} - {1}".format(prefix, render_message(message, args))
@@ -0,0 +1,345 @@
+"""Top level module metrics for dailylog-lib."""
+
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from wtforglib.kinds import StrAnyDict
+
+# seconds, upper bounds of the latency histogram buckets
+CONST_LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+PROMETHEUS_PREFIX = "dailylog"
+
+SUPPRESSED = "suppressed"
+DROPPED = "dropped"
+SAVES = "saves"
+BYTES_WRITTEN = "bytes_written"
+APPEND_DAILY = "append_daily"
+SAVE_CACHE = "save_cache"
+
+# counter name mapped to its Prometheus name and help text
+COUNTERS: Mapping[str, Tuple[str, str]] = MappingProxyType(
+    {
+        SUPPRESSED: ("suppressed_total", "Messages suppressed from the terminal."),
+        DROPPED: ("dropped_total", "Log lines dropped by the background writer."),
+        SAVES: ("cache_saves_total", "Cache file saves."),
+        BYTES_WRITTEN: ("written_bytes_total", "Bytes of log lines written."),
+    },
+)
+# histogram name mapped to its Prometheus name and help text
+HISTOGRAMS: Mapping[str, Tuple[str, str]] = MappingProxyType(
+    {
+        APPEND_DAILY: ("append_daily_seconds", "Latency of Cache.append_daily."),
+        SAVE_CACHE: ("save_cache_seconds", "Latency of cache file saves."),
+    },
+)
+
+
+class Histogram:
+    """Class counting observations in fixed latency buckets.
+
+    observe() is a binary search and an increment, the counts are only
+    made cumulative when a snapshot is taken.
+    """
+
+    bounds: Tuple[float, ...]
+    counts: List[int]
+    total: float
+
+    def __init__(self, bounds: Sequence[float] = CONST_LATENCY_BUCKETS) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        bounds : Sequence[float]
+            Ascending upper bounds of the buckets in seconds
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0 for _ in range(len(self.bounds) + 1)]
+        self.total = 0
+
+    def observe(self, seconds: float) -> None:
+        """Count an observation.
+
+        Parameters
+        ----------
+        seconds : float
+            The observed latency
+        """
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+
+    def snapshot(self) -> StrAnyDict:
+        """Return the count, sum and cumulative bucket counts.
+
+        Returns
+        -------
+        StrAnyDict
+            Keys "count", "sum" and "buckets", the buckets map the upper
+            bound to the number of observations at or below it
+        """
+        buckets = {}
+        running = 0
+        for bound, counted in zip(self.bounds, self.counts):
+            running += counted
+            buckets[bound] = running
+        return {"count": sum(self.counts), "sum": self.total, "buckets": buckets}
+
+
+# WPS214 Found too many methods
+class Metrics:  # noqa: WPS214
+    """Class collecting counters and latency histograms of logging calls.
+
+    All updates take one lock, so threads sharing a Cache or the background
+    writer never lose counts.
+    """
+
+    messages: Dict[str, int]
+    counters: Dict[str, int]
+    histograms: Dict[str, Histogram]
+
+    def __init__(self, bounds: Sequence[float] = CONST_LATENCY_BUCKETS) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        bounds : Sequence[float]
+            Ascending upper bounds of the latency buckets in seconds
+        """
+        self._lock = threading.Lock()
+        self.messages = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram(bounds) for name in HISTOGRAMS}
+
+    def logged(self, label: str, suppressed: bool = False) -> None:
+        """Count a logged message.
+
+        Parameters
+        ----------
+        label : str
+            Log level label of the message
+        suppressed : bool
+            True when the message was suppressed from the terminal
+        """
+        with self._lock:
+            self.messages[label] = self.messages.get(label, 0) + 1
+            if suppressed:
+                self.counters[SUPPRESSED] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter.
+
+        Parameters
+        ----------
+        name : str
+            Counter name
+        amount : int
+            Value to add
+        """
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Add an observation to a latency histogram.
+
+        Parameters
+        ----------
+        name : str
+            Histogram name
+        seconds : float
+            The observed latency
+        """
+        with self._lock:
+            self.histograms[name].observe(seconds)
+
+    def wrote(self, size: int, seconds: float) -> None:
+        """Count a log line written by append_daily.
+
+        Parameters
+        ----------
+        size : int
+            Bytes of the line
+        seconds : float
+            Latency of the write
+        """
+        with self._lock:
+            self.counters[BYTES_WRITTEN] += size
+            self.histograms[APPEND_DAILY].observe(seconds)
+
+    def stats(self) -> StrAnyDict:
+        """Return a snapshot of all metrics.
+
+        Returns
+        -------
+        StrAnyDict
+            "messages" maps labels to counts, every counter name maps to its
+            value and every histogram name to its snapshot
+        """
+        with self._lock:
+            snapshot: StrAnyDict = {"messages": dict(self.messages)}
+            snapshot.update(self.counters)
+            for name, histogram in self.histograms.items():
+                snapshot[name] = histogram.snapshot()
+        return snapshot
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Return all metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix of the metric names
+
+        Returns
+        -------
+        str
+            The exposition text
+        """
+        snapshot = self.stats()
+        lines = _prometheus_messages(prefix, snapshot["messages"])
+        for name, family in COUNTERS.items():
+            lines.extend(_prometheus_counter(prefix, family, snapshot[name]))
+        for name, family in HISTOGRAMS.items():  # noqa: WPS440
+            lines.extend(_prometheus_histogram(prefix, family, snapshot[name]))
+        lines.append("")
+        return "\n".join(lines)
+
+    def write_prometheus(self, path: Path, prefix: str = PROMETHEUS_PREFIX) -> None:
+        """Write all metrics to a file in the Prometheus text format.
+
+        The file is replaced atomically, so a collector such as the textfile
+        collector of node_exporter never reads a partial file.
+
+        Parameters
+        ----------
+        path : Path
+            The metrics file
+        prefix : str
+            Prefix of the metric names
+        """
+        tmp_path = path.with_name("{0}.tmp".format(path.name))
+        tmp_path.write_text(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+def _prometheus_header(metric: str, help_text: str, kind: str) -> List[str]:
+    """Return the HELP and TYPE lines of a metric.
+
+    Parameters
+    ----------
+    metric : str
+        Metric name
+    help_text : str
+        Description of the metric
+    kind : str
+        Metric type
+
+    Returns
+    -------
+    List[str]
+        The lines
+    """
+    return [
+        "# HELP {0} {1}".format(metric, help_text),
+        "# TYPE {0} {1}".format(metric, kind),
+    ]
+
+
+def _prometheus_messages(prefix: str, messages: Dict[str, int]) -> List[str]:
+    """Return the lines of the message counts by level.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of the metric names
+    messages : Dict[str, int]
+        Message counts by label
+
+    Returns
+    -------
+    List[str]
+        The lines
+    """
+    metric = "{0}_messages_total".format(prefix)
+    lines = _prometheus_header(metric, "Messages logged by level.", "counter")
+    lines.extend(
+        '{0}{{level="{1}"}} {2}'.format(metric, label, counted)
+        for label, counted in sorted(messages.items())
+    )
+    return lines
+
+
+def _prometheus_counter(prefix: str, family: Tuple[str, str], valor: int) -> List[str]:
+    """Return the lines of a counter.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of the metric names
+    family : Tuple[str, str]
+        Metric name without prefix and help text
+    valor : int
+        Counter value
+
+    Returns
+    -------
+    List[str]
+        The lines
+    """
+    metric = "{0}_{1}".format(prefix, family[0])
+    lines = _prometheus_header(metric, family[1], "counter")
+    lines.append("{0} {1}".format(metric, valor))
+    return lines
+
+
+def _prometheus_histogram(
+    prefix: str,
+    family: Tuple[str, str],
+    snapshot: StrAnyDict,
+) -> List[str]:
+    """Return the lines of a histogram.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of the metric names
+    family : Tuple[str, str]
+        Metric name without prefix and help text
+    snapshot : StrAnyDict
+        Histogram snapshot
+
+    Returns
+    -------
+    List[str]
+        The lines
+    """
+    metric = "{0}_{1}".format(prefix, family[0])
+    lines = _prometheus_header(metric, family[1], "histogram")
+    lines.extend(
+        '{0}_bucket{{le="{1}"}} {2}'.format(metric, bound, counted)
+        for bound, counted in snapshot["buckets"].items()
+    )
+    lines.append('{0}_bucket{{le="+Inf"}} {1}'.format(metric, snapshot["count"]))
+    lines.append("{0}_sum {1}".format(metric, snapshot["sum"]))
+    lines.append("{0}_count {1}".format(metric, snapshot["count"]))
+    return lines
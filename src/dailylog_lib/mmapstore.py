@@ -0,0 +1,423 @@
+"""Top level module mmapstore for dailylog-lib."""
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.fileio import ensure_directory
+from dailylog_lib.record import CacheRecord, key_hash
+from dailylog_lib.storage import CONST_FILE_MODE, ENTRIES, CacheStore
+
+CONST_MMAP_VERSION = 1
+CONST_STRIPES = 1024
+CONST_STRIPE_SLOTS = 64
+MMAP_MAGIC = b"DLM\x01"
+# magic, slots per stripe, stripes
+MMAP_HEADER = struct.Struct("<4sII")
+# key hash (0 marks a free slot), shown, suppressed, expires
+MMAP_SLOT = struct.Struct("<Qqqq")
+
+SlotEntry = Tuple[int, int, int, int]
+
+
+def _slot_hash(key: str) -> int:
+    """Return the slot hash of key, never 0 as that marks a free slot.
+
+    Parameters
+    ----------
+    key : str
+        Unique key for the cache record
+
+    Returns
+    -------
+    int
+        Non zero 64 bit hash
+    """
+    return key_hash(key) or 1
+
+
+def _to_record(entry: SlotEntry) -> CacheRecord:
+    """Return the cache record of a slot.
+
+    Parameters
+    ----------
+    entry : SlotEntry
+        Tuple of key hash, shown, suppressed and expires
+
+    Returns
+    -------
+    CacheRecord
+        The record
+    """
+    return CacheRecord.from_values(entry[1], entry[2], entry[3])
+
+
+def _reuse_rank(entry: SlotEntry, now: int) -> int:
+    """Return the rank of a slot for reuse, the lowest rank is reused first.
+
+    Parameters
+    ----------
+    entry : SlotEntry
+        Tuple of key hash, shown, suppressed and expires
+    now : int
+        Current epoch seconds
+
+    Returns
+    -------
+    int
+        -1 for free and expired slots, otherwise the time last shown
+    """
+    if not entry[0] or entry[3] < now:
+        return -1
+    return int(entry[1])
+
+
+# WPS214 Found too many methods
+class MmapStore(CacheStore):  # noqa: WPS214
+    """Class storing the cache in a memory mapped table shared between processes.
+
+    The file holds a fixed number of stripes, each a run of fixed size slots.
+    A key lives in the stripe selected by its hash and all updates of a stripe
+    are made under an exclusive fcntl lock of its byte range, so processes
+    mapping the same file see each other's updates immediately. A new key takes
+    a free or expired slot of its stripe, or else the slot shown longest ago,
+    so the table size is bounded and needs no separate pruning.
+    """
+
+    stripes: int
+    stripe_slots: int
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 0,
+        stripes: int = CONST_STRIPES,
+        stripe_slots: int = CONST_STRIPE_SLOTS,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the table file
+        max_entries : int
+            Ignored, the table size is fixed by stripes and stripe_slots
+        stripes : int
+            Number of stripes of a new table
+        stripe_slots : int
+            Number of slots per stripe of a new table
+        """
+        super().__init__(path, max_entries)
+        self.stripes = stripes
+        self.stripe_slots = stripe_slots
+        self._fd = -1
+        self._map: Optional[mmap.mmap] = None
+        self._mutexes: List[threading.Lock] = []
+
+    def __len__(self) -> int:
+        """Return the number of cached records."""
+        return sum(1 for _ in self._entries())
+
+    def load(self) -> None:
+        """Map the table, creating and sizing the file if it is new."""
+        self.close()
+        self._map = self._open_map()
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        Optional[CacheRecord]
+            The record or None when key is not cached
+        """
+        hashed = _slot_hash(key)
+        with self._locked(hashed, fcntl.LOCK_SH) as table:
+            offset = self._find(table, hashed)
+            if offset is None:
+                return None
+            entry = MMAP_SLOT.unpack_from(table, offset)
+        return _to_record(entry)
+
+    def put(self, key: str, record: CacheRecord) -> None:
+        """Store the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+        hashed = _slot_hash(key)
+        with self._locked(hashed, fcntl.LOCK_EX) as table:
+            offset = self._claim(table, hashed)
+            self._pack(table, offset, hashed, record)
+
+    def suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the record for key under the stripe lock.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record, its suppressed count is 0 when it is shown
+        """
+        hashed = _slot_hash(key)
+        with self._locked(hashed, fcntl.LOCK_EX) as table:
+            offset = self._claim(table, hashed)
+            entry = MMAP_SLOT.unpack_from(table, offset)
+            record = _to_record(entry) if entry[0] == hashed else CacheRecord()
+            record.suppress(stifle)
+            self._pack(table, offset, hashed, record)
+        return record
+
+    def save(self) -> None:
+        """Do nothing, updates are visible through the shared mapping."""
+
+    def close(self) -> None:
+        """Unmap and close the table."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def to_dict(self) -> StrAnyDict:
+        """Return the cache contents in the JSON cache layout.
+
+        Returns
+        -------
+        StrAnyDict
+            The cache document keyed by hexadecimal key hashes
+        """
+        entries = {
+            "{0:016x}".format(entry[0]): _to_record(entry).to_dict()
+            for entry in self._entries()
+        }
+        return {"version": CONST_MMAP_VERSION, ENTRIES: entries}
+
+    def _open_map(self) -> mmap.mmap:
+        """Open and map the table, creating and sizing the file if it is new.
+
+        Returns
+        -------
+        mmap.mmap
+            The mapping
+
+        Raises
+        ------
+        ValueError
+            When the file is not a dailylog table
+        """
+        ensure_directory(self.path.parent)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, CONST_FILE_MODE)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, MMAP_HEADER.size)
+        header = self._read_header()
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, MMAP_HEADER.size)
+        if len(header) != MMAP_HEADER.size or not header.startswith(MMAP_MAGIC):
+            self.close()
+            raise ValueError("Not a dailylog table: {0}".format(self.path))
+        _, stripe_slots, stripes = MMAP_HEADER.unpack(header)
+        self.stripe_slots = stripe_slots
+        self.stripes = stripes
+        self._mutexes = [threading.Lock() for _ in range(self.stripes)]
+        return mmap.mmap(self._fd, self._size())
+
+    def _read_header(self) -> bytes:
+        """Return the table header, initializing an empty file.
+
+        Returns
+        -------
+        bytes
+            The packed header
+        """
+        if os.fstat(self._fd).st_size == 0:
+            header = MMAP_HEADER.pack(MMAP_MAGIC, self.stripe_slots, self.stripes)
+            os.write(self._fd, header)
+            os.ftruncate(self._fd, self._size())
+            return header
+        return os.pread(self._fd, MMAP_HEADER.size, 0)
+
+    def _size(self) -> int:
+        """Return the size of the table file.
+
+        Returns
+        -------
+        int
+            Size in bytes
+        """
+        return MMAP_HEADER.size + self.stripes * self._stripe_size()
+
+    def _stripe_size(self) -> int:
+        """Return the size of a stripe.
+
+        Returns
+        -------
+        int
+            Size in bytes
+        """
+        return self.stripe_slots * MMAP_SLOT.size
+
+    def _mapped(self) -> mmap.mmap:
+        """Return the mapping, loading the table when needed.
+
+        Returns
+        -------
+        mmap.mmap
+            The mapping
+        """
+        if self._map is None:
+            self._map = self._open_map()
+        return self._map
+
+    @contextmanager
+    def _locked(self, hashed: int, operation: int) -> Iterator[mmap.mmap]:
+        """Lock the stripe of hashed against other threads and processes.
+
+        Parameters
+        ----------
+        hashed : int
+            Slot hash of the key
+        operation : int
+            fcntl.LOCK_SH or fcntl.LOCK_EX
+
+        Yields
+        ------
+        mmap.mmap
+            The mapping
+        """
+        table = self._mapped()
+        stripe = hashed % self.stripes
+        start = MMAP_HEADER.size + stripe * self._stripe_size()
+        with self._mutexes[stripe]:
+            fcntl.lockf(self._fd, operation, self._stripe_size(), start)
+            try:
+                yield table
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._stripe_size(), start)
+
+    def _slots(self, hashed: int) -> range:
+        """Return the slot offsets of the stripe of hashed.
+
+        Parameters
+        ----------
+        hashed : int
+            Slot hash of the key
+
+        Returns
+        -------
+        range
+            Slot offsets
+        """
+        start = MMAP_HEADER.size + (hashed % self.stripes) * self._stripe_size()
+        return range(start, start + self._stripe_size(), MMAP_SLOT.size)
+
+    def _find(self, table: mmap.mmap, hashed: int) -> Optional[int]:
+        """Return the offset of the slot holding hashed.
+
+        Parameters
+        ----------
+        table : mmap.mmap
+            The mapping
+        hashed : int
+            Slot hash of the key
+
+        Returns
+        -------
+        Optional[int]
+            Slot offset or None when the key is not in its stripe
+        """
+        for offset in self._slots(hashed):
+            if MMAP_SLOT.unpack_from(table, offset)[0] == hashed:
+                return offset
+        return None
+
+    def _pack(
+        self,
+        table: mmap.mmap,
+        offset: int,
+        hashed: int,
+        record: CacheRecord,
+    ) -> None:
+        """Write a record to a slot.
+
+        Parameters
+        ----------
+        table : mmap.mmap
+            The mapping
+        offset : int
+            Slot offset
+        hashed : int
+            Slot hash of the key
+        record : CacheRecord
+            The record
+        """
+        MMAP_SLOT.pack_into(
+            table,
+            offset,
+            hashed,
+            record.shown,
+            record.suppressed,
+            record.expires,
+        )
+
+    def _claim(self, table: mmap.mmap, hashed: int) -> int:
+        """Return the slot for hashed, a free or expired slot or the oldest.
+
+        Parameters
+        ----------
+        table : mmap.mmap
+            The mapping
+        hashed : int
+            Slot hash of the key
+
+        Returns
+        -------
+        int
+            Slot offset
+        """
+        now = int(time.time())
+        best = (0, -1)
+        for offset in self._slots(hashed):
+            entry = MMAP_SLOT.unpack_from(table, offset)
+            if entry[0] == hashed:
+                return offset
+            rank = (_reuse_rank(entry, now), offset)
+            if best[1] < 0 or rank < best:
+                best = rank
+        return best[1]
+
+    def _entries(self) -> Iterator[SlotEntry]:
+        """Yield the used slots.
+
+        Yields
+        ------
+        SlotEntry
+            Tuple of key hash, shown, suppressed and expires
+        """
+        table = self._mapped()
+        for offset in range(MMAP_HEADER.size, self._size(), MMAP_SLOT.size):
+            entry = MMAP_SLOT.unpack_from(table, offset)
+            if entry[0]:
+                yield entry
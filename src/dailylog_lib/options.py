@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from dailylog_lib.constants import DEFAULTS
+from dailylog_lib.constants import default_paths
 
 
 class Options:
@@ -85,7 +85,7 @@ class Options:
             str: validate file name/path as a string
         """
         if file_name == "":
-            file_name = str(DEFAULTS.get(file_key, ""))
+            file_name = str(default_paths().get(file_key, ""))
             if file_name == "":
                 raise ValueError("{0} path name cannot be empty".format(file_key))
         path = Path(file_name)
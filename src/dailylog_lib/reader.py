@@ -0,0 +1,460 @@
+"""Top level module reader for dailylog-lib."""
+
+import mmap
+import os
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from dailylog_lib.compress import COMPRESSED_SUFFIXES, open_log
+from dailylog_lib.rotation import partition_paths
+
+# WPS323 Found `%` string formatting
+# the local stamp without its timezone name, which strptime cannot parse
+LOCAL_PARSE_FORMAT = "%a %b %d %H:%M:%S %p %Y"  # noqa: WPS323
+# number of distinct stamps whose epoch seconds are remembered, a stamp
+# only changes once per second so repeated lines parse it once
+CONST_STAMP_CACHE = 4096
+
+
+@lru_cache(maxsize=CONST_STAMP_CACHE)
+def parse_stamp(stamp: str) -> Optional[float]:
+    """Return the epoch seconds of a log line stamp.
+
+    Stamps of all formats written by the stampers are accepted, local
+    stamps are read in the local timezone.
+
+    Parameters
+    ----------
+    stamp : str
+        The stamp, for example "Sat Oct 17 14:03:09 PM CEST 2026",
+        "2026-10-17T14:03:09+02:00" or "1792245789"
+
+    Returns
+    -------
+    Optional[float]
+        The epoch seconds or None if stamp is not a stamp
+    """
+    if stamp.isdigit():
+        return float(stamp)
+    tokens = stamp.split(" ")
+    if len(tokens) == 7:
+        del tokens[5]  # noqa: WPS420
+    try:
+        parsed = (
+            datetime.fromisoformat(stamp)
+            if len(tokens) == 1
+            else datetime.strptime(" ".join(tokens), LOCAL_PARSE_FORMAT)
+        )
+    except ValueError:
+        return None
+    return parsed.timestamp()
+
+
+class LogEntry:
+    """Class representing a parsed log line."""
+
+    __slots__ = ("time", "stamp", "label", "message", "count")
+
+    time: float
+    stamp: str
+    label: str
+    message: str
+    count: Optional[int]
+
+    def __init__(
+        self,
+        time: float,
+        stamp: str,
+        label: str,
+        message: str,
+        count: Optional[int] = None,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        time : float
+            Epoch seconds of the stamp
+        stamp : str
+            The stamp as written
+        label : str
+            Log level label
+        message : str
+            The message, lines following it without a stamp are appended
+        count : Optional[int]
+            Suppressed count of a suppressed message
+        """
+        self.time = time
+        self.stamp = stamp
+        self.label = label
+        self.message = message
+        self.count = count
+
+    @classmethod
+    def from_text(
+        cls,
+        time: float,
+        stamp: str,
+        label: str,
+        text: str,
+    ) -> "LogEntry":
+        """Create an entry splitting the suppressed count off the text.
+
+        Parameters
+        ----------
+        time : float
+            Epoch seconds of the stamp
+        stamp : str
+            The stamp as written
+        label : str
+            Log level label
+        text : str
+            The text after the label
+
+        Returns
+        -------
+        LogEntry
+            The entry
+        """
+        text = text.rstrip("\n")
+        body, bracket, tail = text.rpartition(" [")
+        if bracket and tail.endswith("]") and tail[:-1].isdigit():
+            return cls(time, stamp, label, body, int(tail[:-1]))
+        return cls(time, stamp, label, text)
+
+    def __str__(self) -> str:
+        """Return the entry as a log line without the line break."""
+        line = "{0} {1}: {2}".format(self.stamp, self.label, self.message)
+        if self.count is None:
+            return line
+        return "{0} [{1}]".format(line, self.count)
+
+
+def parse_line(line: str) -> Optional[LogEntry]:
+    """Parse a line in the "{stamp} {label}: {message} [{count}]" format.
+
+    Parameters
+    ----------
+    line : str
+        The line
+
+    Returns
+    -------
+    Optional[LogEntry]
+        The entry or None if the line does not start with a stamp and label
+    """
+    parts = line.partition(": ")
+    stamp, _, label = parts[0].rpartition(" ")
+    stamp_time = parse_stamp(stamp) if parts[1] else None
+    if stamp_time is None:
+        return None
+    return LogEntry.from_text(stamp_time, stamp, label, parts[2])
+
+
+def parse_entries(lines: Iterable[str]) -> Iterator[LogEntry]:
+    """Parse lines into entries.
+
+    Lines without a stamp, like the traceback of an exception, are appended
+    to the message of the entry before them.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines
+
+    Yields
+    ------
+    LogEntry
+        The entries
+    """
+    entry: Optional[LogEntry] = None
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed is None:
+            if entry is not None:
+                entry.message = "{0}\n{1}".format(entry.message, line.rstrip("\n"))
+            continue
+        if entry is not None:
+            yield entry
+        entry = parsed
+    if entry is not None:
+        yield entry
+
+
+class LogBuffer:
+    """Class reading a memory mapped log file.
+
+    Only the pages that are touched are read, so seeking into a large file
+    costs a few page reads instead of a scan from byte zero.
+    """
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        buffer : mmap.mmap
+            The memory mapped log file
+        """
+        self.buffer = buffer
+
+    def seek(self, since: float) -> int:
+        """Return the offset of the first line stamped since a time.
+
+        The lines must be in time order, the buffer is bisected on line
+        boundaries so only about log2(size) lines are parsed. Lines without
+        a stamp are skipped while bisecting.
+
+        Parameters
+        ----------
+        since : float
+            Epoch seconds
+
+        Returns
+        -------
+        int
+            Offset of a line start, no line before it is stamped since
+        """
+        low = 0
+        high = len(self.buffer)
+        while low < high:
+            middle = (low + high) // 2
+            found = self._first_stamped(self._line_start(middle), high)
+            if found is not None and found[0] < since:
+                low = found[1]
+            else:
+                high = middle
+        return low
+
+    def lines(self, offset: int = 0) -> Iterator[str]:
+        """Return the lines from an offset.
+
+        Parameters
+        ----------
+        offset : int
+            Offset of a line start
+
+        Yields
+        ------
+        str
+            The lines without line breaks
+        """
+        size = len(self.buffer)
+        while offset < size:
+            end = self._line_end(offset)
+            yield self.buffer[offset:end].decode(errors="replace")
+            offset = end + 1
+
+    def _line_end(self, offset: int) -> int:
+        """Return the offset of the line break ending the line at offset.
+
+        Parameters
+        ----------
+        offset : int
+            Offset of a line start
+
+        Returns
+        -------
+        int
+            The line break, the size of the buffer for an unterminated line
+        """
+        end = self.buffer.find(b"\n", offset)
+        return len(self.buffer) if end < 0 else end
+
+    def _line_start(self, offset: int) -> int:
+        """Return the offset of the first line starting at or after offset.
+
+        Parameters
+        ----------
+        offset : int
+            Any offset
+
+        Returns
+        -------
+        int
+            The line start, past the buffer if there is none
+        """
+        if offset == 0:
+            return 0
+        return self._line_end(offset - 1) + 1
+
+    def _first_stamped(self, offset: int, high: int) -> Optional[Tuple[float, int]]:
+        """Return the time and end of the first stamped line starting before high.
+
+        Parameters
+        ----------
+        offset : int
+            Offset of a line start
+        high : int
+            Offset where the search ends
+
+        Returns
+        -------
+        Optional[Tuple[float, int]]
+            Epoch seconds of the line and the offset of the next line, None
+            if no line starting before high is stamped
+        """
+        while offset < high:
+            end = self._line_end(offset)
+            entry = parse_line(self.buffer[offset:end].decode(errors="replace"))
+            if entry is not None:
+                return entry.time, end + 1
+            offset = end + 1
+        return None
+
+
+class LogQuery:
+    """Class querying log files written by Cache.append_daily.
+
+    The query is a generator pipeline, entries are parsed while they are
+    consumed. Plain files are memory mapped and bisected to the first line
+    stamped since, compressed partitions are decompressed as a stream.
+    Reading stops at the first entry stamped after until, so later
+    partitions are never opened.
+
+    The key of a keyed message is not written to the log, search for it
+    with contains.
+    """
+
+    since: Optional[float]
+    until: Optional[float]
+    labels: Tuple[str, ...]
+    contains: str
+
+    def __init__(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        labels: Sequence[str] = (),
+        contains: str = "",
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        since : Optional[float]
+            Epoch seconds of the oldest entry, by default no limit
+        until : Optional[float]
+            Epoch seconds of the newest entry, by default no limit
+        labels : Sequence[str]
+            Labels of the entries, by default all labels
+        contains : str
+            Text the message contains, by default any message
+        """
+        self.since = since
+        self.until = until
+        self.labels = tuple(label.upper() for label in labels)
+        self.contains = contains
+
+    def matches(self, entry: LogEntry) -> bool:
+        """Return True if an entry matches the label, text and since filters.
+
+        Parameters
+        ----------
+        entry : LogEntry
+            The entry
+
+        Returns
+        -------
+        bool
+            True when the entry matches
+        """
+        if self.since is not None and entry.time < self.since:
+            return False
+        if self.labels and entry.label not in self.labels:
+            return False
+        return self.contains in entry.message
+
+    def read(self, log_fn: str) -> Iterator[LogEntry]:
+        """Return the matching entries of a log file.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of the log file, plain or compressed
+
+        Returns
+        -------
+        Iterator[LogEntry]
+            The entries in file order
+        """
+        return self._select(self._scan(log_fn))
+
+    def search(self, template: str) -> Iterator[LogEntry]:
+        """Return the matching entries of all partitions of a log.
+
+        Partitions last modified before since are skipped without reading.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log, see Rotation
+
+        Returns
+        -------
+        Iterator[LogEntry]
+            The entries from oldest to newest
+        """
+        paths = [path for path in partition_paths(template) if not self._older(path)]
+        return self._select(chain.from_iterable(map(self._scan, paths)))
+
+    def _select(self, entries: Iterable[LogEntry]) -> Iterator[LogEntry]:
+        """Filter entries, stopping at the first entry after until.
+
+        Parameters
+        ----------
+        entries : Iterable[LogEntry]
+            The entries in time order
+
+        Yields
+        ------
+        LogEntry
+            The matching entries
+        """
+        for entry in entries:
+            if self.until is not None and entry.time > self.until:
+                return
+            if self.matches(entry):
+                yield entry
+
+    def _scan(self, log_fn: str) -> Iterator[LogEntry]:
+        """Parse the entries of a log file starting near since.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of the log file
+
+        Yields
+        ------
+        LogEntry
+            The entries
+        """
+        if log_fn.endswith(COMPRESSED_SUFFIXES):
+            with open_log(log_fn) as stream:
+                yield from parse_entries(stream)
+            return
+        with open(log_fn, "rb") as source:
+            if os.fstat(source.fileno()).st_size == 0:
+                return
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                log_buffer = LogBuffer(buffer)
+                offset = 0 if self.since is None else log_buffer.seek(self.since)
+                yield from parse_entries(log_buffer.lines(offset))
+
+    def _older(self, log_fn: str) -> bool:
+        """Return True if a file was last modified before since.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of the log file
+
+        Returns
+        -------
+        bool
+            True when no entry of the file can match
+        """
+        return self.since is not None and os.stat(log_fn).st_mtime < self.since
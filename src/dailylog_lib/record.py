@@ -0,0 +1,127 @@
+"""Top level module record for dailylog-lib."""
+
+import time
+from typing import Dict, Optional
+
+CONST_DAY = 86400
+
+
+def key_hash(key: str) -> int:
+    """Return a stable 64 bit hash of a cache key.
+
+    Unlike the builtin hash() the value is the same in every process.
+
+    Parameters
+    ----------
+    key : str
+        Unique key for the cache record
+
+    Returns
+    -------
+    int
+        Unsigned 64 bit hash
+    """
+    # hashlib loads OpenSSL, only the journal and mmap backends need it
+    import hashlib  # noqa: WPS433
+
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CacheRecord:
+    """Class representing a cache record."""
+
+    __slots__ = ("shown", "suppressed", "expires")
+
+    shown: int
+    suppressed: int
+    expires: int
+
+    def __init__(self, d_obj: Optional[Dict[str, int]] = None) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        d_obj : Dict[str, int], optional
+            Cache record object, by default None
+        """
+        if d_obj is None:
+            self.shown = 0
+            self.suppressed = 0
+            self.expires = 0
+            return
+        self._from_dict(d_obj)
+
+    @classmethod
+    def from_values(cls, shown: int, suppressed: int, expires: int) -> "CacheRecord":
+        """Create a record without an intermediate dict.
+
+        Parameters
+        ----------
+        shown : int
+            Epoch seconds the record was last shown
+        suppressed : int
+            Number of times suppressed since last shown
+        expires : int
+            Epoch seconds the suppression window ends
+
+        Returns
+        -------
+        CacheRecord
+            The record
+        """
+        record = cls()
+        record.shown = shown
+        record.suppressed = suppressed
+        record.expires = expires
+        return record
+
+    def suppress(self, stifle: int) -> bool:
+        """Suppress display of cache record.
+
+        Parameters
+        ----------
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        bool
+            True if suppressed
+        """
+        now = int(time.time())
+        if now - self.shown > stifle:
+            self.shown = now
+            self.suppressed = 0
+            self.expires = now + stifle
+            return False
+        self.suppressed += 1
+        return True
+
+    def to_dict(self) -> Dict[str, int]:
+        """Convert instance to dict.
+
+        Returns
+        -------
+        Dict[str, int]
+            Instance data as dict
+        """
+        return {
+            "shown": self.shown,
+            "suppressed": self.suppressed,
+            "expires": self.expires,
+        }
+
+    def _from_dict(self, d_obj: Dict[str, int]) -> None:
+        """Assign instance data from dict.
+
+        Records saved before expires was recorded expire a day after shown.
+
+        Parameters
+        ----------
+        d_obj : Dict[str, int]
+            Record data
+        """
+        self.shown = d_obj.get("shown", 0)
+        self.suppressed = d_obj.get("suppressed", 0)
+        self.expires = d_obj.get("expires", self.shown + CONST_DAY)
@@ -0,0 +1,484 @@
+"""Top level module rotation for dailylog-lib."""
+
+import os
+import re
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Match, Optional, Pattern, Tuple
+
+from dailylog_lib.compress import (
+    COMPRESSED_SUFFIXES,
+    CONST_COMPRESS_WORKERS,
+    Compressor,
+    open_log,
+    resolve_codec,
+)
+
+ROTATE_DAY = "day"
+ROTATE_HOUR = "hour"
+# date format of a plain {date} field by period
+DATE_FORMATS: Mapping[str, str] = MappingProxyType(
+    {
+        ROTATE_DAY: "%Y-%m-%d",
+        ROTATE_HOUR: "%Y-%m-%d-%H",
+    },
+)
+# a {date} field, optionally with a strftime format like {date:%Y%m%d}
+DATE_FIELD = re.compile(r"(\{date(?::[^}]*)?\})")
+
+PartitionKey = Tuple[Tuple[str, ...], int]
+
+
+def split_suffix(name: str) -> Tuple[str, str]:
+    """Split a file name template into stem and suffix.
+
+    The suffix is the last extension of the name unless it is part of a
+    {date} field.
+
+    Parameters
+    ----------
+    name : str
+        The file name template
+
+    Returns
+    -------
+    Tuple[str, str]
+        The stem and the suffix, the suffix is empty if there is none
+    """
+    index = name.rfind(".")
+    if index <= 0 or "}" in name[index:]:
+        return name, ""
+    return name[:index], name[index:]
+
+
+def partition_pattern(template: str) -> Pattern[str]:
+    """Return the pattern of the partition file names of a log template.
+
+    The groups of the pattern are the {date} fields, the size rollover
+    sequence and the compression suffix.
+
+    Parameters
+    ----------
+    template : str
+        Path name template of the log
+
+    Returns
+    -------
+    Pattern[str]
+        The compiled pattern
+    """
+    stem, suffix = split_suffix(os.path.basename(template))
+    parts = [
+        "(.+?)" if DATE_FIELD.fullmatch(part) else re.escape(part)
+        for part in DATE_FIELD.split(stem)
+    ]
+    compressed = "|".join(re.escape(known) for known in COMPRESSED_SUFFIXES)
+    return re.compile(
+        r"^{0}(?:\.(\d+))?{1}({2})?$".format(
+            "".join(parts),
+            re.escape(suffix),
+            compressed,
+        ),
+    )
+
+
+def partition_key(match: Match[str]) -> PartitionKey:
+    """Return the sort key of a partition file name.
+
+    Parameters
+    ----------
+    match : Match[str]
+        Match of the file name by partition_pattern()
+
+    Returns
+    -------
+    PartitionKey
+        The {date} fields and the size rollover sequence
+    """
+    groups = match.groups()
+    sequence = groups[-2] or 0
+    return (groups[:-2], int(sequence))
+
+
+def partition_paths(template: str) -> List[str]:
+    """Return the existing partitions of a log template from oldest to newest.
+
+    Partitions are ordered by their rendered {date} fields and then by their
+    size rollover sequence, which is chronological for the default date
+    formats.
+
+    Parameters
+    ----------
+    template : str
+        Path name template of the log
+
+    Returns
+    -------
+    List[str]
+        Path names of the partitions
+    """
+    directory = os.path.dirname(template) or "."
+    pattern = partition_pattern(template)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    found = sorted(
+        (partition_key(match), os.path.join(directory, match.string))
+        for match in map(pattern.match, names)
+        if match is not None
+    )
+    return [path for _, path in found]
+
+
+class Partition:
+    """Class resolving the current partition of one log template.
+
+    The path is rendered when a period starts and reused until it ends,
+    the clock is compared with the end of the period for every line.
+    """
+
+    template: str
+    static: bool
+    path: str
+    _until: float
+
+    def __init__(self, template: str, period: str, max_bytes: int) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log
+        period : str
+            Partition period "day" or "hour"
+        max_bytes : int
+            Size of a partition before it rolls over, 0 for no limit
+        """
+        self.template = template
+        self.static = max_bytes <= 0 and DATE_FIELD.search(template) is None
+        self.path = template
+        self._period = period
+        self._max_bytes = max_bytes
+        directory, name = os.path.split(template)
+        stem, suffix = split_suffix(name)
+        self._suffix = suffix
+        plain = "{{date:{0}}}".format(DATE_FORMATS[period])
+        self._stem = os.path.join(directory, stem.replace("{date}", plain))
+        self._base = ""
+        self._until = 0
+        self._sequence = 0
+        self._size = 0
+
+    def resolve(self, now: float, size: int) -> bool:
+        """Update path for a line written at now.
+
+        Parameters
+        ----------
+        now : float
+            Epoch seconds of the line
+        size : int
+            Bytes of the encoded line
+
+        Returns
+        -------
+        bool
+            True when a new partition was started
+        """
+        rolled = False
+        if now >= self._until:
+            self._start_period(now)
+            rolled = True
+        if self._max_bytes > 0:
+            if self._size > 0 and self._size + size > self._max_bytes:
+                self._sequence += 1
+                self._size = 0
+                self.path = self._sequenced(self._sequence)
+                rolled = True
+            self._size += size
+        return rolled
+
+    def _start_period(self, now: float) -> None:
+        """Render the partition of the period containing now.
+
+        An existing partition of the period is continued, including the
+        last size rollover sequence written by a previous process.
+
+        Parameters
+        ----------
+        now : float
+            Epoch seconds
+        """
+        start = datetime.fromtimestamp(now).replace(minute=0, second=0, microsecond=0)
+        if self._period == ROTATE_HOUR:
+            end = start + timedelta(hours=1)
+        else:
+            start = start.replace(hour=0)
+            end = start + timedelta(days=1)
+        self._until = end.timestamp()
+        self._base = self._stem.format(date=start)
+        self._sequence = 0
+        if self._max_bytes > 0:
+            self._sequence = self._last_sequence()
+        self.path = self._sequenced(self._sequence)
+        try:
+            self._size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            self._size = 0
+
+    def _last_sequence(self) -> int:
+        """Return the highest rollover sequence on disk of the current period.
+
+        Returns
+        -------
+        int
+            The sequence, 0 if the period has no rolled over partitions
+        """
+        template = self._base + self._suffix
+        pattern = partition_pattern(template)
+        sequences = [0]
+        for path in partition_paths(template):
+            match = pattern.match(os.path.basename(path))
+            if match is not None:
+                sequences.append(partition_key(match)[1])
+        return max(sequences)
+
+    def _sequenced(self, sequence: int) -> str:
+        """Return the path of a rollover sequence of the current period.
+
+        Parameters
+        ----------
+        sequence : int
+            The sequence, 0 for the first partition of the period
+
+        Returns
+        -------
+        str
+            The path
+        """
+        if sequence == 0:
+            return self._base + self._suffix
+        return "{0}.{1}{2}".format(self._base, sequence, self._suffix)
+
+
+# WPS214 Found too many methods
+class Rotation:  # noqa: WPS214
+    """Class partitioning log files by date and size.
+
+    A {date} field in a log path name, for example "daily-{date}.log",
+    selects a file per day or hour, a strftime format like {date:%Y%m%d}
+    overrides the default format of the period. The field must be part of
+    the file name. With max_bytes a partition rolls over to
+    "daily-2026-10-17.1.log", "daily-2026-10-17.2.log" and so on.
+
+    When a partition rolls over, partitions beyond retain are deleted by a
+    background thread and with compress closed partitions are queued for
+    a Compressor. The partition closed last is only compressed at the next
+    rollover, so lines still queued for it are never lost.
+    """
+
+    period: str
+    max_bytes: int
+    retain: int
+    compress: str
+    workers: int
+
+    def __init__(
+        self,
+        period: str = ROTATE_DAY,
+        max_bytes: int = 0,
+        retain: int = 0,
+        compress: bool | int | str = "",
+        workers: int = CONST_COMPRESS_WORKERS,
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        period : str
+            Partition period "day" or "hour"
+        max_bytes : int
+            Size of a partition in bytes before it rolls over, 0 for
+            no limit
+        retain : int
+            Number of partitions kept per template, 0 keeps all
+        compress : bool | int | str
+            Codec compressing closed partitions "gzip", "lzma", "zstd" or
+            "auto", see resolve_codec(), by default no compression
+        workers : int
+            Maximum number of partitions compressed at the same time
+
+        Raises
+        ------
+        ValueError
+            When period is not a known period or the codec is not available
+        """
+        if period not in DATE_FORMATS:
+            raise ValueError("Unknown rotation period: {0}".format(period))
+        self.period = period
+        self.max_bytes = max_bytes
+        self.retain = retain
+        self.compress = resolve_codec(compress)
+        self.workers = workers
+        self._compressor: Optional[Compressor] = None
+        self._partitions: Dict[str, Partition] = {}
+        self._lock = threading.Lock()
+        self._retain_lock = threading.Lock()
+        self._retainers: List[threading.Thread] = []
+
+    def path(self, template: str, size: int = 0) -> str:
+        """Return the current partition of a log template.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log
+        size : int
+            Bytes of the encoded line to write
+
+        Returns
+        -------
+        str
+            Path name of the partition
+        """
+        partition = self._partitions.get(template)
+        if partition is None:
+            partition = self._add(template)
+        if partition.static:
+            return template
+        with self._lock:
+            rolled = partition.resolve(time.time(), size)
+            log_fn = partition.path
+        if rolled and (self.retain > 0 or self.compress):
+            self._start_retention(template, log_fn)
+        return log_fn
+
+    def retain_partitions(self, template: str, current: str) -> None:
+        """Delete partitions beyond retain and compress closed partitions.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log
+        current : str
+            Path name of the partition written now
+        """
+        with self._retain_lock:
+            closed = [path for path in partition_paths(template) if path != current]
+            if self.retain > 0:
+                closed = self._delete_excess(closed)
+            if self.compress:
+                self._compress_closed(closed[:-1])
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for running retention threads and queued compressions.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Seconds to wait for each thread, by default without limit
+        """
+        with self._lock:
+            retainers = self._retainers
+            self._retainers = []
+        for retainer in retainers:
+            retainer.join(timeout)
+        if self._compressor is not None:
+            self._compressor.join(timeout)
+
+    def _delete_excess(self, closed: List[str]) -> List[str]:
+        """Delete the oldest closed partitions beyond retain.
+
+        Parameters
+        ----------
+        closed : List[str]
+            Closed partitions from oldest to newest
+
+        Returns
+        -------
+        List[str]
+            The closed partitions kept
+        """
+        excess = max(0, len(closed) - self.retain + 1)
+        for path in closed[:excess]:
+            with suppress(FileNotFoundError):  # removed by the compressor
+                os.unlink(path)
+        return closed[excess:]
+
+    def _compress_closed(self, closed: List[str]) -> None:
+        """Queue closed partitions that are not compressed yet.
+
+        Parameters
+        ----------
+        closed : List[str]
+            Closed partitions
+        """
+        if self._compressor is None:
+            self._compressor = Compressor(self.compress, self.workers)
+        for path in closed:
+            if not path.endswith(COMPRESSED_SUFFIXES):
+                self._compressor.submit(path)
+
+    def _add(self, template: str) -> Partition:
+        """Return the partition of a new template.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log
+
+        Returns
+        -------
+        Partition
+            The partition
+        """
+        with self._lock:
+            return self._partitions.setdefault(
+                template,
+                Partition(template, self.period, self.max_bytes),
+            )
+
+    def _start_retention(self, template: str, current: str) -> None:
+        """Apply retention in a background thread.
+
+        Parameters
+        ----------
+        template : str
+            Path name template of the log
+        current : str
+            Path name of the partition written now
+        """
+        retainer = threading.Thread(
+            target=self.retain_partitions,
+            args=(template, current),
+            name="dailylog-retention",
+            daemon=True,
+        )
+        with self._lock:
+            self._retainers = [alive for alive in self._retainers if alive.is_alive()]
+            self._retainers.append(retainer)
+        retainer.start()
+
+
+def read_partitions(template: str) -> Iterator[str]:
+    """Return the lines of all partitions of a log template.
+
+    Partitions are read from oldest to newest, compressed partitions are
+    decompressed while they are read.
+
+    Parameters
+    ----------
+    template : str
+        Path name template of the log
+
+    Yields
+    ------
+    str
+        The lines
+    """
+    for path in partition_paths(template):
+        with open_log(path) as stream:
+            yield from stream
@@ -0,0 +1,331 @@
+"""Top level module sqlstore for dailylog-lib."""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.fileio import ensure_directory
+from dailylog_lib.record import CacheRecord
+from dailylog_lib.storage import CONST_CACHE_VERSION, ENTRIES, CacheStore
+
+CONST_BUSY_TIMEOUT = 30
+
+SQL_TABLE = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    shown INTEGER NOT NULL,
+    suppressed INTEGER NOT NULL,
+    expires INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+SQL_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS entries_shown ON entries (shown)",
+    "CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)",
+)
+SQL_SELECT = "SELECT shown, suppressed, expires FROM entries WHERE key = ?"
+SQL_UPSERT = """
+INSERT INTO entries (key, shown, suppressed, expires) VALUES (?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    shown = excluded.shown,
+    suppressed = excluded.suppressed,
+    expires = excluded.expires
+"""
+SQL_PRUNE = """
+DELETE FROM entries WHERE key IN (
+    SELECT key FROM entries WHERE expires < ? LIMIT ?
+)
+"""
+SQL_EVICT = """
+DELETE FROM entries WHERE key IN (
+    SELECT key FROM entries ORDER BY shown LIMIT ?
+)
+"""
+
+SqlEntry = Tuple[int, int, int]
+
+
+# WPS214 Found too many methods
+class SqliteStore(CacheStore):  # noqa: WPS214
+    """Class storing the cache in a SQLite database in WAL mode.
+
+    Every save is one transaction of single row upserts, so concurrent
+    processes sharing the database only overwrite the keys they changed.
+    suppress() reads, updates and writes its row in one immediate
+    transaction, so processes suppressing the same key never lose a count.
+    Pruning is deferred to that transaction, a logged message costs one
+    write transaction. Expired rows are found through an index on expires.
+    When max_entries is set the row count is checked after every
+    max_entries / 8 upserts and the rows shown longest ago are deleted.
+    Threads sharing the store take turns on its connection.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 0) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the database file
+        max_entries : int
+            Maximum number of records, 0 for no limit
+        """
+        super().__init__(path, max_entries)
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, SqlEntry] = {}
+        self._upserts = 0
+        self._prune_budget = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Return the number of cached records."""
+        row = self._connection().execute("SELECT count(*) FROM entries").fetchone()
+        return int(row[0])
+
+    def load(self) -> None:
+        """Open the database, creating the schema if needed."""
+        self.close()
+        self._db = self._connect()
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        Optional[CacheRecord]
+            The record or None when key is not cached
+        """
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._connection().execute(SQL_SELECT, (key,)).fetchone()
+        if entry is None:
+            return None
+        return CacheRecord.from_values(entry[0], entry[1], entry[2])
+
+    def put(self, key: str, record: CacheRecord) -> None:
+        """Store the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+        self._pending[key] = (record.shown, record.suppressed, record.expires)
+
+    def suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the row for key in one transaction.
+
+        Pending records and deferred pruning are written in the same
+        transaction.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record, its suppressed count is 0 when it is shown
+        """
+        with self._transaction(upserts=1) as db:
+            entry = db.execute(SQL_SELECT, (key,)).fetchone()
+            record = CacheRecord() if entry is None else CacheRecord.from_values(*entry)
+            record.suppress(stifle)
+            db.execute(
+                SQL_UPSERT,
+                (key, record.shown, record.suppressed, record.expires),
+            )
+        return record
+
+    def save(self) -> None:
+        """Upsert the records changed since the previous save."""
+        if not self._pending:
+            return
+        with self._transaction():  # noqa: WPS328 it only writes the pending records
+            pass  # noqa: WPS420
+
+    def prune(self, budget: int) -> int:
+        """Delete at most budget expired records in the next write transaction.
+
+        Parameters
+        ----------
+        budget : int
+            Maximum number of records to delete
+
+        Returns
+        -------
+        int
+            0, the records are deleted by the next suppress() or save()
+        """
+        self._prune_budget += budget
+        return 0
+
+    def close(self) -> None:
+        """Save pending changes and close the database."""
+        if self._db is None:
+            return
+        self.save()
+        self._db.close()
+        self._db = None
+
+    def delete_shown_before(self, timestamp: int) -> int:
+        """Delete records last shown before timestamp.
+
+        Parameters
+        ----------
+        timestamp : int
+            Epoch seconds
+
+        Returns
+        -------
+        int
+            Number of deleted records
+        """
+        with self._transaction() as db:
+            cursor = db.execute("DELETE FROM entries WHERE shown < ?", (timestamp,))
+        return cursor.rowcount
+
+    def to_dict(self) -> StrAnyDict:
+        """Return the cache contents in the JSON cache layout.
+
+        Returns
+        -------
+        StrAnyDict
+            The cache document
+        """
+        self.save()
+        rows = self._connection().execute(
+            "SELECT key, shown, suppressed, expires FROM entries",
+        )
+        entries = {}
+        for row in rows:
+            record = CacheRecord.from_values(row[1], row[2], row[3])
+            entries[row[0]] = record.to_dict()
+        return {"version": CONST_CACHE_VERSION, ENTRIES: entries}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the open database connection, opening it when needed.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection
+        """
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database in WAL mode and create the schema.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection
+        """
+        ensure_directory(self.path.parent)
+        db = sqlite3.connect(
+            str(self.path),
+            timeout=CONST_BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(SQL_TABLE)
+        for statement in SQL_INDEXES:
+            db.execute(statement)
+        return db
+
+    @contextmanager
+    def _transaction(self, upserts: int = 0) -> Iterator[sqlite3.Connection]:
+        """Run an immediate write transaction starting with the pending writes.
+
+        The pending writes are forgotten only once COMMIT succeeds, a failed
+        transaction keeps them for the next one.
+
+        Parameters
+        ----------
+        upserts : int
+            Number of rows the block upserts besides the pending records
+
+        Yields
+        ------
+        sqlite3.Connection
+            The connection
+
+        Raises
+        ------
+        BaseException
+            Any error of the block or of COMMIT after rolling the transaction
+            back
+        """
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._write_pending(db)
+                db.execute("COMMIT")
+            except BaseException:  # noqa: WPS424
+                db.execute("ROLLBACK")
+                raise
+            self._committed(upserts)
+
+    def _write_pending(self, db: sqlite3.Connection) -> sqlite3.Connection:
+        """Upsert pending records and delete deferred expired records.
+
+        Must be called inside a write transaction.
+
+        Parameters
+        ----------
+        db : sqlite3.Connection
+            The connection
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection
+        """
+        if self._pending:
+            db.executemany(
+                SQL_UPSERT,
+                [(key, *entry) for key, entry in self._pending.items()],
+            )
+        if self._prune_budget:
+            db.execute(SQL_PRUNE, (int(time.time()), self._prune_budget))
+        return db
+
+    def _committed(self, upserts: int) -> None:
+        """Forget the written changes and evict the oldest records if needed.
+
+        Parameters
+        ----------
+        upserts : int
+            Number of rows upserted besides the pending records
+        """
+        self._upserts += upserts + len(self._pending)
+        self._pending = {}
+        self._prune_budget = 0
+        if self.max_entries and self._upserts > self.max_entries // 8:
+            self._upserts = 0
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete the records shown longest ago beyond max_entries."""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._connection().execute(SQL_EVICT, (excess,))
@@ -0,0 +1,183 @@
+"""Top level module stamps for dailylog-lib."""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Mapping, Tuple, Type
+
+# WPS323 Found `%` string formatting
+LOCAL_FORMAT = "%a %b %d %H:%M:%S %p %Z %Y"  # noqa: WPS323
+# local UTC offsets only change on quarter hours
+CONST_ZONE_PERIOD = 900
+
+
+class Stamper(ABC):
+    """Base class for log line time stamps.
+
+    The rendered stamp of the current second is cached, render() is only
+    called when the wall clock second changes. The cache is a single tuple
+    replaced in one assignment, so threads sharing a stamper never see a
+    stamp paired with the wrong second.
+    """
+
+    _cached: Tuple[int, str]
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self._cached = (-1, "")
+
+    def stamp(self) -> str:
+        """Return the stamp of the current second.
+
+        Returns
+        -------
+        str
+            The stamp
+        """
+        second = int(time.time())
+        cached = self._cached
+        if cached[0] != second:
+            cached = (second, self.render(second))
+            self._cached = cached
+        return cached[1]
+
+    @abstractmethod
+    def render(self, second: int) -> str:
+        """Return the stamp of an epoch second.
+
+        Parameters
+        ----------
+        second : int
+            Epoch seconds
+        """
+
+
+class ZonedStamper(Stamper):
+    """Base class for stamps in local time.
+
+    The local timezone is looked up once per CONST_ZONE_PERIOD seconds
+    instead of for every stamp.
+    """
+
+    _zone: Tuple[int, timezone]
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        super().__init__()
+        self._zone = (-1, timezone.utc)
+
+    def local_time(self, second: int) -> datetime:
+        """Return an epoch second as an aware local datetime.
+
+        Parameters
+        ----------
+        second : int
+            Epoch seconds
+
+        Returns
+        -------
+        datetime
+            The local time
+        """
+        period = second // CONST_ZONE_PERIOD
+        zone = self._zone
+        if zone[0] != period:
+            local = time.localtime(second)
+            offset = timedelta(seconds=local.tm_gmtoff)
+            zone = (period, timezone(offset, local.tm_zone))
+            self._zone = zone
+        return datetime.fromtimestamp(second, zone[1])
+
+
+class LocalStamper(ZonedStamper):
+    """Class rendering the traditional dailylog stamp.
+
+    For example "Sat Oct 17 14:03:09 PM CEST 2026".
+    """
+
+    def render(self, second: int) -> str:
+        """Return the stamp of an epoch second.
+
+        Parameters
+        ----------
+        second : int
+            Epoch seconds
+
+        Returns
+        -------
+        str
+            The stamp
+        """
+        return self.local_time(second).strftime(LOCAL_FORMAT)
+
+
+class IsoStamper(ZonedStamper):
+    """Class rendering ISO-8601 stamps, for example "2026-10-17T14:03:09+02:00"."""
+
+    def render(self, second: int) -> str:
+        """Return the stamp of an epoch second.
+
+        Parameters
+        ----------
+        second : int
+            Epoch seconds
+
+        Returns
+        -------
+        str
+            The stamp
+        """
+        return self.local_time(second).isoformat(timespec="seconds")
+
+
+class EpochStamper(Stamper):
+    """Class rendering stamps as epoch seconds, for example "1792245789"."""
+
+    def render(self, second: int) -> str:
+        """Return the stamp of an epoch second.
+
+        Parameters
+        ----------
+        second : int
+            Epoch seconds
+
+        Returns
+        -------
+        str
+            The stamp
+        """
+        return str(second)
+
+
+STAMPERS: Mapping[str, Type[Stamper]] = MappingProxyType(
+    {
+        "epoch": EpochStamper,
+        "iso": IsoStamper,
+        "local": LocalStamper,
+    },
+)
+
+
+def make_stamper(name: str) -> Stamper:
+    """Return a new stamper by format name.
+
+    Parameters
+    ----------
+    name : str
+        One of "local", "iso" or "epoch"
+
+    Returns
+    -------
+    Stamper
+        The stamper
+
+    Raises
+    ------
+    ValueError
+        When name is not a known format
+    """
+    stamper_class = STAMPERS.get(name)
+    if stamper_class is None:
+        raise ValueError("Unknown stamp format: {0}".format(name))
+    return stamper_class()
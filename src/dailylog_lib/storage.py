@@ -0,0 +1,569 @@
+"""Top level module storage for dailylog-lib."""
+
+import fcntl
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Tuple
+
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.entries import EntryTable
+from dailylog_lib.fileio import ensure_directory, load_json_file, write_json_file
+from dailylog_lib.record import CacheRecord
+
+CONST_CACHE_VERSION = 1
+CONST_PRUNE_BUDGET = 8
+CONST_FILE_MODE = 0o644
+ENTRIES = "entries"
+_NOT_DETACHED = "{0} saves while the cache locks are held"
+
+# st_ino, st_mtime_ns and st_size of the cache file
+FileSignature = Tuple[int, int, int]
+# shown and suppressed of a record before its first change since the last save
+BaseEntry = Tuple[int, int]
+
+
+class Snapshot(NamedTuple):
+    """Changes captured by CacheStore.snapshot() for write_snapshot()."""
+
+    document: StrAnyDict
+    base: Dict[str, Optional[BaseEntry]]
+    removed: Set[str]
+
+
+def file_signature(path: Path) -> Optional[FileSignature]:
+    """Return values that change whenever the file is rewritten.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the file
+
+    Returns
+    -------
+    Optional[FileSignature]
+        Tuple of inode, modification time and size or None if missing
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def merge_record(
+    disk: CacheRecord,
+    local: CacheRecord,
+    base: Optional[BaseEntry],
+) -> CacheRecord:
+    """Merge a record changed by this process with the saved one.
+
+    The record shown last wins. When both were shown at the same time the
+    suppressions this process added since base are added to the saved count.
+
+    Parameters
+    ----------
+    disk : CacheRecord
+        The record in the cache file
+    local : CacheRecord
+        The record of this process
+    base : Optional[BaseEntry]
+        Shown and suppressed of local before its first change, None if new
+
+    Returns
+    -------
+    CacheRecord
+        The merged record
+    """
+    if local.shown != disk.shown:
+        return local if local.shown > disk.shown else disk
+    base_suppressed = 0
+    if base is not None and base[0] == local.shown:
+        base_suppressed = base[1]
+    return CacheRecord.from_values(
+        disk.shown,
+        disk.suppressed + max(0, local.suppressed - base_suppressed),
+        max(disk.expires, local.expires),
+    )
+
+
+def merge_document(document: StrAnyDict, snapshot: Snapshot) -> StrAnyDict:
+    """Merge a snapshot into a cache document saved by another process.
+
+    Parameters
+    ----------
+    document : StrAnyDict
+        The cache document read from file
+    snapshot : Snapshot
+        Changes of this process
+
+    Returns
+    -------
+    StrAnyDict
+        The document of the snapshot, updated in place
+    """
+    entries = snapshot.document[ENTRIES]
+    for key, d_obj in document.get(ENTRIES, {}).items():
+        if key in snapshot.removed:
+            continue
+        disk = CacheRecord(d_obj)
+        local = entries.get(key)
+        if local is not None and key in snapshot.base:
+            disk = merge_record(disk, CacheRecord(local), snapshot.base[key])
+        entries[key] = disk.to_dict()
+    return snapshot.document
+
+
+# WPS214 Found too many methods
+class CacheStore(ABC):  # noqa: WPS214
+    """Base class for suppression cache storage backends.
+
+    Backends with detached_save split a save into snapshot(), taken while
+    the cache locks are held, and write_snapshot(), run without them.
+    """
+
+    path: Path
+    max_entries: int
+    detached_save: bool = False
+
+    def __init__(self, path: Path, max_entries: int = 0) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the cache file
+        max_entries : int
+            Maximum number of records, 0 for no limit
+        """
+        self.path = path
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of cached records."""
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the cache from file, creating the file if it does not exist."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        """
+
+    @abstractmethod
+    def put(self, key: str, record: CacheRecord) -> None:
+        """Store the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+
+    @abstractmethod
+    def save(self) -> None:
+        """Persist records changed since the previous save."""
+
+    @abstractmethod
+    def to_dict(self) -> StrAnyDict:
+        """Return the cache contents in the JSON cache layout."""
+
+    def suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the record for key and store it.
+
+        Backends shared between processes override this to make the read,
+        modify and write of the record atomic.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record, its suppressed count is 0 when it is shown
+        """
+        record = self.get(key)
+        if record is None:
+            record = CacheRecord()
+        record.suppress(stifle)
+        self.put(key, record)
+        return record
+
+    def prune(self, budget: int) -> int:
+        """Remove expired records, examining at most budget records.
+
+        Parameters
+        ----------
+        budget : int
+            Number of records to examine
+
+        Returns
+        -------
+        int
+            Number of removed records, backends without pruning return 0
+        """
+        return 0
+
+    def snapshot(self) -> Snapshot:
+        """Capture the changes since the previous save for write_snapshot().
+
+        Only called on backends with detached_save.
+
+        Raises
+        ------
+        NotImplementedError
+            When the backend saves while the cache locks are held
+        """
+        raise NotImplementedError(_NOT_DETACHED.format(type(self).__name__))
+
+    def write_snapshot(self, snapshot: Snapshot) -> Optional[StrAnyDict]:
+        """Persist a snapshot, other threads may change the store meanwhile.
+
+        Parameters
+        ----------
+        snapshot : Snapshot
+            Changes returned by snapshot()
+
+        Raises
+        ------
+        NotImplementedError
+            When the backend saves while the cache locks are held
+        """
+        raise NotImplementedError(_NOT_DETACHED.format(type(self).__name__))
+
+    def merge_saved(self, document: StrAnyDict) -> None:
+        """Merge a document returned by write_snapshot() into the store.
+
+        Parameters
+        ----------
+        document : StrAnyDict
+            The cache document
+
+        Raises
+        ------
+        NotImplementedError
+            When the backend saves while the cache locks are held
+        """
+        raise NotImplementedError(_NOT_DETACHED.format(type(self).__name__))
+
+    def changes_layout(self, key: str) -> bool:
+        """Return True if suppressing key may move or remove other records.
+
+        Threads may suppress different keys at the same time unless this
+        returns True, see Cache option thread_safe.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        bool
+            False for backends whose records never move
+        """
+        return False
+
+    def close(self) -> None:
+        """Persist pending changes and release resources."""
+        self.save()
+
+
+# WPS214 Found too many methods
+class JsonStore(CacheStore):  # noqa: WPS214
+    """Class storing the cache as a single JSON document.
+
+    Records are held in an EntryTable while loaded, the document is only
+    built when the file is written.
+
+    Processes may share the file. A save holds an exclusive fcntl lock on
+    a ".lock" file next to it, re-reads the file if its inode, mtime or
+    size changed since this process last read or wrote it, merges the
+    records changed by this process into it with merge_record() and
+    atomically replaces it. write_snapshot() only reads a snapshot() of
+    the table, so other threads may change the table while it writes.
+    """
+
+    table: EntryTable[str]
+    version: int
+    detached_save = True
+
+    def __init__(self, path: Path, max_entries: int = 0) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the cache file
+        max_entries : int
+            Maximum number of records, 0 for no limit
+        """
+        super().__init__(path, max_entries)
+        self.table = self._new_table()
+        self.version = CONST_CACHE_VERSION
+        self._signature: Optional[FileSignature] = None
+        self._base: Dict[str, Optional[BaseEntry]] = {}
+        self._removed: Set[str] = set()
+
+    def __len__(self) -> int:
+        """Return the number of cached records."""
+        return len(self.table)
+
+    def load(self) -> None:
+        """Load the cache from file, creating the file if it does not exist."""
+        self.table = self._new_table()
+        self._base = {}
+        self._removed = set()
+        self._signature = file_signature(self.path)
+        if self._signature is None:
+            self.version = CONST_CACHE_VERSION
+            self.save()
+            return
+        document = load_json_file(self.path)
+        self.version = document.get("version", CONST_CACHE_VERSION)
+        for key, d_obj in document.get(ENTRIES, {}).items():
+            self.table.put(key, CacheRecord(d_obj))
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Return the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        Optional[CacheRecord]
+            The record or None when key is not cached
+        """
+        return self.table.get(key)
+
+    def put(self, key: str, record: CacheRecord) -> None:
+        """Store the record for key.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        record : CacheRecord
+            The record
+        """
+        self._keep_base(key)
+        self.table.put(key, record)
+
+    def suppress(self, key: str, stifle: int) -> CacheRecord:
+        """Apply CacheRecord.suppress to the record for key in place.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        stifle : int
+            Suppress if last display is > stifle seconds
+
+        Returns
+        -------
+        CacheRecord
+            The updated record, its suppressed count is 0 when it is shown
+        """
+        self._keep_base(key)
+        return self.table.suppress(key, stifle)
+
+    def prune(self, budget: int) -> int:
+        """Remove expired records, examining at most budget records.
+
+        Parameters
+        ----------
+        budget : int
+            Number of records to examine
+
+        Returns
+        -------
+        int
+            Number of removed records
+        """
+        return self.table.prune(int(time.time()), budget)
+
+    def changes_layout(self, key: str) -> bool:
+        """Return True if suppressing key adds a row to the table.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+
+        Returns
+        -------
+        bool
+            True when key has no record yet
+        """
+        return key not in self.table
+
+    def save(self) -> None:
+        """Merge changes of other processes and rewrite the cache file."""
+        document = self.write_snapshot(self.snapshot())
+        if document is not None:
+            self.merge_saved(document)
+
+    def snapshot(self) -> Snapshot:
+        """Capture the cache document and the merge state of changed keys.
+
+        Returns
+        -------
+        Snapshot
+            The captured changes
+        """
+        snapshot = Snapshot(self.to_dict(), self._base, self._removed)
+        self._base = {}
+        self._removed = set()
+        return snapshot
+
+    def write_snapshot(self, snapshot: Snapshot) -> Optional[StrAnyDict]:
+        """Merge a snapshot with the cache file and rewrite it.
+
+        Only the snapshot is read, so the table may change meanwhile.
+
+        Parameters
+        ----------
+        snapshot : Snapshot
+            Changes returned by snapshot()
+
+        Returns
+        -------
+        Optional[StrAnyDict]
+            The written document when the file was saved by another
+            process since this process last read or wrote it, else None
+        """
+        ensure_directory(self.path.parent)
+        tmp_path = self.path.with_name("{0}.tmp".format(self.path.name))
+        merged = None
+        with self._file_lock():
+            if file_signature(self.path) != self._signature:
+                merged = merge_document(load_json_file(self.path), snapshot)
+            write_json_file(tmp_path, snapshot.document)
+            os.replace(tmp_path, self.path)
+            self._signature = file_signature(self.path)
+        return merged
+
+    def merge_saved(self, document: StrAnyDict) -> None:
+        """Merge a document returned by write_snapshot() into the table.
+
+        Keys changed since the snapshot keep their later changes, the
+        written record becomes the base of those changes.
+
+        Parameters
+        ----------
+        document : StrAnyDict
+            The cache document
+        """
+        for key, d_obj in document.get(ENTRIES, {}).items():
+            if key not in self._removed:
+                self._merge_saved_record(key, CacheRecord(d_obj))
+
+    def to_dict(self) -> StrAnyDict:
+        """Return the cache contents.
+
+        Returns
+        -------
+        StrAnyDict
+            The cache document
+        """
+        entries = {
+            key: CacheRecord.from_values(shown, suppressed, expires).to_dict()
+            for key, shown, suppressed, expires in self.table.items()
+        }
+        return {"version": self.version, ENTRIES: entries}
+
+    def _new_table(self) -> EntryTable[str]:
+        """Return an empty table remembering removed keys.
+
+        Returns
+        -------
+        EntryTable[str]
+            The table
+        """
+        return EntryTable(self.max_entries, self._removed_key)
+
+    def _removed_key(self, key: str) -> None:
+        """Remember an evicted or pruned key so the merge drops it.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        """
+        self._removed.add(key)
+        self._base.pop(key, None)
+
+    def _merge_saved_record(self, key: str, disk: CacheRecord) -> None:
+        """Merge a written record into the table.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        disk : CacheRecord
+            The written record
+        """
+        local = self.table.get(key)
+        if local is None:
+            self.table.put(key, disk)
+            return
+        merged = disk
+        changed = key in self._base  # its base may be None for a new key
+        if changed:
+            merged = merge_record(disk, local, self._base[key])
+            self._base[key] = (disk.shown, disk.suppressed)
+        if merged.to_dict() != local.to_dict():
+            self.table.put(key, merged)
+
+    def _keep_base(self, key: str) -> None:
+        """Remember the values of key before its first change since the save.
+
+        Parameters
+        ----------
+        key : str
+            Unique key for the cache record
+        """
+        if key in self._base:
+            return
+        record = self.table.get(key)
+        if record is None:
+            self._base[key] = None
+        else:
+            self._base[key] = (record.shown, record.suppressed)
+        self._removed.discard(key)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock shared with other processes saving the file.
+
+        Yields
+        ------
+        None
+            Nothing, the lock is held until the context exits
+        """
+        lock_path = self.path.with_name("{0}.lock".format(self.path.name))
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, CONST_FILE_MODE)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
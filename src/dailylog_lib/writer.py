@@ -0,0 +1,216 @@
+"""Top level module writer for dailylog-lib."""
+
+import sys
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from dailylog_lib.handles import HandlePool
+from dailylog_lib.metrics import DROPPED, Metrics
+
+CONST_QUEUE_SIZE = 8192
+CONST_BATCH_SIZE = 512
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_DROP_NEW = "drop-new"
+OVERFLOW_POLICIES = frozenset((OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEW))
+
+QueuedLine = Tuple[str, str]
+
+
+# WPS214 Found too many methods
+class BackgroundWriter:  # noqa: WPS214
+    """Class appending log lines to files from a dedicated thread.
+
+    write() only queues a formatted line. The writer thread takes up to
+    CONST_BATCH_SIZE queued lines at a time, joins them per file and appends
+    them with a single write per file. When the queue holds queue_size lines
+    the overflow policy decides: "block" waits for room, "drop-oldest"
+    discards the oldest queued line and "drop-new" discards the new line.
+    Discarded lines are counted in dropped and in metrics when set.
+    """
+
+    queue_size: int
+    overflow: str
+    dropped: int
+    metrics: Optional[Metrics]
+
+    def __init__(
+        self,
+        queue_size: int = CONST_QUEUE_SIZE,
+        overflow: str = OVERFLOW_BLOCK,
+        handles: Optional[HandlePool] = None,
+    ) -> None:
+        """Class constructor starting the writer thread.
+
+        Parameters
+        ----------
+        queue_size : int
+            Maximum number of queued lines
+        overflow : str
+            Overflow policy "block", "drop-oldest" or "drop-new"
+        handles : Optional[HandlePool]
+            Pool keeping the log files open, by default a new pool
+
+        Raises
+        ------
+        ValueError
+            When overflow is not a known policy
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: {0}".format(overflow))
+        self.queue_size = max(1, queue_size)
+        self.overflow = overflow
+        self.dropped = 0
+        self.metrics = None
+        self._handles = HandlePool() if handles is None else handles
+        self._queue: Deque[QueuedLine] = deque()
+        self._ready = threading.Condition()
+        self._queued = 0
+        self._done = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name="dailylog-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __len__(self) -> int:
+        """Return the number of queued lines."""
+        return len(self._queue)
+
+    @property
+    def closed(self) -> bool:
+        """Return True once close() has been called."""
+        return self._closed
+
+    def write(self, log_fn: str, text: str) -> bool:
+        """Queue text to be appended to the specified log file.
+
+        Parameters
+        ----------
+        log_fn : str
+            Path name of log file
+        text : str
+            Text to append
+
+        Returns
+        -------
+        bool
+            False when text was dropped by the "drop-new" policy
+
+        Raises
+        ------
+        ValueError
+            When the writer is closed
+        """
+        with self._ready:
+            if len(self._queue) >= self.queue_size and not self._make_room():
+                return False
+            if self._closed:
+                raise ValueError("Write to closed writer")
+            self._queue.append((log_fn, text))
+            self._queued += 1
+            self._ready.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every line queued before the call is written.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum number of seconds to wait, by default no limit
+
+        Returns
+        -------
+        bool
+            False when the timeout expired first
+        """
+        with self._ready:
+            target = self._queued
+            return self._ready.wait_for(lambda: self._done >= target, timeout)
+
+    def close(self) -> None:
+        """Write the queued lines, stop the writer thread and close the files."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._handles.close()
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue, the caller holds the lock.
+
+        Returns
+        -------
+        bool
+            False when the new line must be dropped
+        """
+        if self.overflow == OVERFLOW_DROP_NEW:
+            self._drop()
+            return False
+        if self.overflow == OVERFLOW_DROP_OLDEST:
+            self._queue.popleft()
+            self._drop()
+            self._done += 1
+            return True
+        self._ready.wait_for(
+            lambda: len(self._queue) < self.queue_size or self._closed,
+        )
+        return True
+
+    def _drop(self) -> None:
+        """Count a dropped line, the caller holds the lock."""
+        self.dropped += 1
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.count(DROPPED)
+
+    def _run(self) -> None:
+        """Write batches of queued lines until closed and drained."""
+        while True:  # noqa: WPS457
+            with self._ready:
+                self._ready.wait_for(self._has_work)
+                if not self._queue:
+                    return
+                batch = self._take()
+                self._ready.notify_all()
+            self._write_batch(batch)
+            with self._ready:
+                self._done += len(batch)
+                self._ready.notify_all()
+
+    def _has_work(self) -> bool:
+        """Return True when lines are queued or the writer is closed."""
+        return bool(self._queue) or self._closed
+
+    def _take(self) -> List[QueuedLine]:
+        """Remove and return the next batch, the caller holds the lock.
+
+        Returns
+        -------
+        List[QueuedLine]
+            Tuples of log file and text
+        """
+        count = min(len(self._queue), CONST_BATCH_SIZE)
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _write_batch(self, batch: List[QueuedLine]) -> None:
+        """Append a batch with one write per file.
+
+        Parameters
+        ----------
+        batch : List[QueuedLine]
+            Tuples of log file and text
+        """
+        by_file: Dict[str, List[str]] = {}
+        for log_fn, text in batch:
+            by_file.setdefault(log_fn, []).append(text)
+        for log_fn, lines in by_file.items():
+            try:
+                self._handles.write(log_fn, "".join(lines))
+            except OSError as err:
+                sys.stderr.write("dailylog writer: {0}\n".format(err))
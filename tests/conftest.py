@@ -1,5 +1,25 @@
 """Test level module test_cli for dailylog."""
 
+from typing import Iterator
+
+import pytest
+
+from dailylog_lib.cache import Cache
+
+
+@pytest.fixture(autouse=True)
+def _close_handles() -> Iterator[None]:
+    """Close pooled log handles so they do not leak between filesystems."""
+    stamper = Cache.stamper
+    rotation = Cache.rotation
+    yield
+    Cache.rotation.join()
+    Cache.rotation = rotation
+    Cache.stop_writer()
+    Cache.disable_metrics()
+    Cache.handles.close()
+    Cache.stamper = stamper
+
 
 def _occ_str(needle: str, haystack: str) -> int:
     """Count the number of times needle occurs in haystack."""
@@ -0,0 +1,66 @@
+"""Test level module test_asynclogger for dailylog-lib."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from wtforglib.files import load_json_file
+
+from dailylog_lib.asynclogger import AsyncLogger
+
+MESSAGE = "Do not eat yellow snow."
+
+
+def _kwargs(tmp_path: Path) -> dict[str, bool | int | str]:
+    """Return logger keyword arguments for files below tmp_path."""
+    return {
+        "cache": str(tmp_path / "dailylog.json"),
+        "config": str(tmp_path / "dailylog.yaml"),
+        "level": "INFO",
+    }
+
+
+async def _log_twice(logger: AsyncLogger, log_fn: str) -> None:
+    """Log a keyed message twice."""
+    await logger.log_message("key", MESSAGE, logfn=log_fn)
+    await logger.log_message("key", MESSAGE, logfn=log_fn)
+
+
+async def _log_lines(tmp_path: Path) -> None:
+    """Log through an async logger."""
+    log_fn = str(tmp_path / "daily.log")
+    async with AsyncLogger(**_kwargs(tmp_path)) as logger:
+        await logger.debug("hidden", logfn=log_fn, quiet=True)
+        await logger.info("first", logfn=log_fn, quiet=True)
+        await logger.error("second", logfn=log_fn, quiet=True)
+        await _log_twice(logger, log_fn)
+
+
+def test_async_logger(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test calls are written in order and the cache is saved on close."""
+    asyncio.run(_log_lines(tmp_path))
+    lines = (tmp_path / "daily.log").read_text().splitlines()
+    assert [line.split(": ", 1)[1] for line in lines] == [
+        "first",
+        "second",
+        "{0} [0]".format(MESSAGE),
+        "{0} [1]".format(MESSAGE),
+    ]
+    assert capsys.readouterr().err.count(MESSAGE) == 1
+    assert "key" in load_json_file(tmp_path / "dailylog.json")["entries"]
+
+
+async def _flush_cache(tmp_path: Path) -> None:
+    """Log a keyed message with batched saves and flush it."""
+    kwargs = _kwargs(tmp_path)
+    kwargs["flush_count"] = 100
+    logger = AsyncLogger(**kwargs)
+    await logger.log_message("key", MESSAGE, logfn=str(tmp_path / "daily.log"))
+    await logger.aflush()
+    assert "key" in load_json_file(tmp_path / "dailylog.json")["entries"]
+    await logger.aclose()
+
+
+def test_async_logger_flush(tmp_path: Path) -> None:
+    """Test aflush saves pending cache changes."""
+    asyncio.run(_flush_cache(tmp_path))
@@ -1,12 +1,16 @@
 """Test level module test_cli for dailylog."""
 
+import gc
+from functools import partialmethod
 from pathlib import Path
+from typing import List
 
 import pytest
 from pyfakefs.fake_filesystem import FakeFilesystem
 from wtforglib.files import load_json_file, load_yaml_file
+from wtforglib.kinds import StrAnyDict
 
-from dailylog_lib.cache import CONST_CACHE_VERSION, Cache
+from dailylog_lib.cache import _BATCHED_CACHES, CONST_CACHE_VERSION, Cache
 from dailylog_lib.config import CURRENT_CONFIG_VERSION  # CONST_DEFAULT_LOG
 from dailylog_lib.constants import DEFAULTS
 from tests.conftest import _occ_file, _occ_str
@@ -19,6 +23,7 @@ MESSAGE = "Do not eat yellow snow."
 TD = Path(__file__).parent.resolve() / "data"
 T_CACHE = TD / "dailylog.json"
 LOG_ALT = "/usr/local/var/log/daily.log"
+READ_CONFIG = Cache._read_config  # noqa: WPS437
 CONFIG_DATA = """default_log: /usr/local/var/log/daily.log
 version: 1
 """
@@ -103,3 +108,93 @@ def test_caching_quietly(
     out, err = capsys.readouterr()
     assert _occ_str(MESSAGE, err) == 0
     assert _occ_file(LOG_FN, MESSAGE) == 3
+
+
+def test_batched_save(fs: FakeFilesystem) -> None:
+    """Test cache is saved after flush_count changes."""
+    fs.create_dir(Path(LOG_FN).parent)
+    logger = Cache(cache=CACHE_FN, config=CONFIG_FN, flush_count=3)
+    logger.log_message("one", MESSAGE, logfn=LOG_FN)
+    logger.log_message("two", MESSAGE, logfn=LOG_FN)
+    assert logger.dirty == 2
+    assert not load_json_file(CACHE_FN).get("entries")
+    logger.log_message("three", MESSAGE, logfn=LOG_FN)
+    assert logger.dirty == 0
+    assert len(load_json_file(CACHE_FN).get("entries", {})) == 3
+
+
+def _failing_save() -> None:
+    """Fail like a save to a full disk."""
+    raise OSError("No space left on device")
+
+
+def test_batched_save_retried(
+    fs: FakeFilesystem,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the change after a failed save saves the cache again."""
+    fs.create_dir(Path(LOG_FN).parent)
+    logger = Cache(cache=CACHE_FN, config=CONFIG_FN, flush_count=2)
+    logger.log_message("one", MESSAGE, logfn=LOG_FN)
+    monkeypatch.setattr(logger.store, "save", _failing_save)
+    with pytest.raises(OSError, match="No space"):
+        logger.log_message("two", MESSAGE, logfn=LOG_FN)
+    monkeypatch.undo()
+    logger.log_message("three", MESSAGE, logfn=LOG_FN)
+    assert logger.dirty == 0
+    assert len(load_json_file(CACHE_FN).get("entries", {})) == 3
+
+
+def test_batched_save_on_close(fs: FakeFilesystem) -> None:
+    """Test pending changes are saved by close."""
+    fs.create_dir(Path(LOG_FN).parent)
+    with Cache(cache=CACHE_FN, config=CONFIG_FN, flush_interval=3600) as logger:
+        logger.log_message(CACHE_KEY, MESSAGE, logfn=LOG_FN)
+        assert logger.dirty == 1
+    assert logger.dirty == 0
+    assert CACHE_KEY in load_json_file(CACHE_FN).get("entries", {})
+
+
+def test_batched_caches_released(fs: FakeFilesystem) -> None:
+    """Test short lived batched caches leave nothing behind for exit."""
+    fs.create_dir(Path(LOG_FN).parent)
+    gc.collect()
+    alive = len(_BATCHED_CACHES)
+    for _ in range(100):
+        with Cache(cache=CACHE_FN, config=CONFIG_FN, flush_count=10) as logger:
+            logger.log_message(CACHE_KEY, MESSAGE, logfn=LOG_FN)
+    del logger  # noqa: WPS420
+    gc.collect()
+    assert len(_BATCHED_CACHES) == alive
+
+
+def _counted_read(cache: Cache, reads: List[int]) -> StrAnyDict:
+    """Record a config read, then read the config."""
+    reads.append(1)
+    return READ_CONFIG(cache)
+
+
+def test_explicit_logfn_skips_config(
+    fs: FakeFilesystem,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the config is not read when the log file is given."""
+    fs.create_dir(Path(LOG_FN).parent)
+    fs.create_dir(Path.home())
+    reads: List[int] = []
+    monkeypatch.setattr(Cache, "_read_config", partialmethod(_counted_read, reads))
+    with Cache(cache=CACHE_FN, config=CONFIG_FN) as logger:
+        logger.log_message(CACHE_KEY, MESSAGE, logfn=LOG_FN)
+        logger.log_message(CACHE_KEY, MESSAGE, quiet=True, logfn=LOG_FN)
+        assert not reads
+        logger.log_message(CACHE_KEY, MESSAGE, quiet=True)
+        assert reads == [1]
+
+
+def test_max_entries(fs: FakeFilesystem) -> None:
+    """Test the cache keeps at most max_entries records."""
+    fs.create_dir(Path(LOG_FN).parent)
+    with Cache(cache=CACHE_FN, config=CONFIG_FN, max_entries=2) as logger:
+        for key in ("one", "two", "three"):
+            logger.log_message(key, MESSAGE, logfn=LOG_FN)
+    assert set(load_json_file(CACHE_FN).get("entries", {})) == {"two", "three"}
@@ -0,0 +1,70 @@
+"""Test level module test_compress for dailylog-lib."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib.compress import (
+    CODEC_GZIP,
+    CODEC_LZMA,
+    CODEC_ZSTD,
+    Compressor,
+    available_codecs,
+    compress_file,
+    open_log,
+    resolve_codec,
+)
+
+LINES = "Sat Oct 17 14:03:09 PM CEST 2026 ERROR: failed\n" * 100
+
+
+@pytest.mark.parametrize("codec", [CODEC_GZIP, CODEC_LZMA])
+def test_compress_file(tmp_path: Path, codec: str) -> None:
+    """Test a compressed file reads back and keeps its modification time."""
+    log_fn = tmp_path / "daily.log"
+    log_fn.write_text(LINES)
+    os.utime(log_fn, (1792245789, 1792245789))
+    target = compress_file(str(log_fn), codec)
+    assert not log_fn.exists()
+    assert os.stat(target).st_mtime == 1792245789
+    with open_log(target) as stream:
+        assert stream.read() == LINES
+
+
+def test_resolve_codec() -> None:
+    """Test compress options select an available codec."""
+    assert resolve_codec(False) == ""
+    assert resolve_codec(True) in available_codecs()
+    assert resolve_codec(CODEC_LZMA) == CODEC_LZMA
+    with pytest.raises(ValueError, match="Unknown compression codec"):
+        resolve_codec("rar")
+
+
+def test_zstd_unavailable() -> None:
+    """Test a codec without an installed module is rejected."""
+    if CODEC_ZSTD in available_codecs():
+        pytest.skip("zstd is installed")
+    assert resolve_codec(True) == CODEC_GZIP
+    with pytest.raises(ValueError, match="not available"):
+        resolve_codec(CODEC_ZSTD)
+
+
+def test_compressor(tmp_path: Path) -> None:
+    """Test queued files are compressed once and missing files skipped."""
+    log_fns = [tmp_path / "daily-{0}.log".format(index) for index in range(4)]
+    for log_fn in log_fns:
+        log_fn.write_text(LINES)
+    compressor = Compressor(CODEC_GZIP, workers=2)
+    assert compressor.submit(str(log_fns[0]))
+    for log_fn in log_fns:  # noqa: WPS440
+        compressor.submit(str(log_fn))
+    compressor.submit(str(tmp_path / "deleted.log"))
+    compressor.join()
+    compressor.close()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "daily-0.log.gz",
+        "daily-1.log.gz",
+        "daily-2.log.gz",
+        "daily-3.log.gz",
+    ]
@@ -0,0 +1,41 @@
+"""Test level module test_config for dailylog-lib."""
+
+import itertools
+import time
+from pathlib import Path
+
+import pytest
+from wtforglib.files import load_yaml_file
+
+from dailylog_lib import config, configfile
+
+
+def test_config_reload(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the config file is parsed again only after it changed."""
+    cfg_path = tmp_path / "dailylog.yaml"
+    cfg_path.write_text("default_log: /var/log/first.log\nversion: 1\n")
+    parsed = []
+
+    def counting_load(path: Path) -> dict[str, object]:  # noqa: WPS430
+        parsed.append(path)
+        return load_yaml_file(path)
+
+    monkeypatch.setattr(configfile, "load_yaml_file", counting_load)
+    monkeypatch.setattr(time, "monotonic", itertools.count(step=10).__next__)
+    cfg = config.Config(config=str(cfg_path), config_check=5)
+    assert cfg.default_log() == "/var/log/first.log"
+    assert cfg.default_log() == "/var/log/first.log"
+    assert len(parsed) == 1
+    cfg_path.write_text("default_log: /var/log/second.log\nversion: 1\n")
+    assert cfg.default_log() == "/var/log/second.log"
+    assert len(parsed) == 2
+
+
+def test_config_no_reload_by_default(tmp_path: Path) -> None:
+    """Test edits are ignored without config_check."""
+    cfg_path = tmp_path / "dailylog.yaml"
+    cfg_path.write_text("default_log: /var/log/first.log\nversion: 1\n")
+    cfg = config.Config(config=str(cfg_path))
+    assert cfg.default_log() == "/var/log/first.log"
+    cfg_path.write_text("default_log: /var/log/second.log\nversion: 1\n")
+    assert cfg.default_log() == "/var/log/first.log"
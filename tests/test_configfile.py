@@ -0,0 +1,75 @@
+"""Test level module test_configfile for dailylog-lib."""
+
+import marshal
+import sys
+from pathlib import Path
+from typing import Tuple, Union
+
+import pytest
+from wtforglib.files import load_yaml_file
+
+from dailylog_lib import config, configfile
+
+# marshal payloads that are not a (version, signature, config) tuple
+INVALID_SIDECARS = (None, 1, (1,), (1, None, "config", 0))
+SidecarValue = Union[None, int, str]
+SidecarPayload = Union[SidecarValue, Tuple[SidecarValue, ...]]
+
+
+def test_json_config(tmp_path: Path) -> None:
+    """Test a JSON config is written and read back as JSON."""
+    cfg_path = tmp_path / "dailylog.json"
+    cfg_path.write_text('{"default_log": "/var/log/first.log", "version": 1}')
+    cfg = config.Config(config=str(cfg_path))
+    assert cfg.default_log() == "/var/log/first.log"
+    cfg.set_default_log(str(tmp_path / "second.log"))
+    assert cfg_path.read_text().lstrip().startswith("{")
+    reread = config.Config(config=str(cfg_path))
+    assert reread.default_log() == str(tmp_path / "second.log")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="requires tomllib")
+def test_toml_config(tmp_path: Path) -> None:
+    """Test a TOML config is written and read back as TOML."""
+    cfg_path = tmp_path / "dailylog.toml"
+    cfg_path.write_text('default_log = "/var/log/first.log"\nversion = 1\n')
+    cfg = config.Config(config=str(cfg_path))
+    assert cfg.default_log() == "/var/log/first.log"
+    cfg.set_default_log(str(tmp_path / "second.log"))
+    reread = config.Config(config=str(cfg_path))
+    assert reread.default_log() == str(tmp_path / "second.log")
+    with pytest.raises(ValueError, match="TOML"):
+        configfile.write_config_file(cfg_path, {"nested": {"a": 1}})
+
+
+def test_compiled_yaml(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a YAML config is parsed once while it is unchanged."""
+    cfg_path = tmp_path / "dailylog.yaml"
+    cfg_path.write_text("default_log: /var/log/first.log\nversion: 1\n")
+    parsed = []
+
+    def counting_load(path: Path) -> dict[str, object]:  # noqa: WPS430
+        parsed.append(path)
+        return load_yaml_file(path)
+
+    monkeypatch.setattr(configfile, "load_yaml_file", counting_load)
+    first = configfile.load_config_file(cfg_path)
+    assert configfile.compiled_path(cfg_path).is_file()
+    assert configfile.load_config_file(cfg_path) == first
+    assert len(parsed) == 1
+    cfg_path.write_text("default_log: /var/log/second.log\nversion: 1\n")
+    second = configfile.load_config_file(cfg_path)
+    assert second["default_log"] == "/var/log/second.log"
+    assert len(parsed) == 2
+
+
+@pytest.mark.parametrize("payload", INVALID_SIDECARS)
+def test_compiled_yaml_invalid(tmp_path: Path, payload: SidecarPayload) -> None:
+    """Test a sidecar holding something else is treated as stale."""
+    cfg_path = tmp_path / "dailylog.yaml"
+    cfg_path.write_text("default_log: /var/log/first.log\nversion: 1\n")
+    sidecar = configfile.compiled_path(cfg_path)
+    sidecar.write_bytes(marshal.dumps(payload))
+    loaded = configfile.load_config_file(cfg_path)
+    assert loaded["default_log"] == "/var/log/first.log"
+    assert marshal.loads(sidecar.read_bytes())[2] == loaded
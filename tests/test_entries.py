@@ -0,0 +1,68 @@
+"""Test level module test_entries for dailylog-lib."""
+
+from typing import List
+
+import pytest
+
+from dailylog_lib.entries import EntryTable
+from dailylog_lib.record import CacheRecord
+
+CACHE_KEY = "test"
+
+
+def test_record_slots() -> None:
+    """Test records have no instance dict."""
+    record = CacheRecord.from_values(1, 2, 3)
+    assert not hasattr(record, "__dict__")
+    assert record.to_dict() == {"shown": 1, "suppressed": 2, "expires": 3}
+    with pytest.raises(AttributeError):
+        record.extra = 1  # type: ignore[attr-defined]
+
+
+def test_table_suppress_in_place() -> None:  # noqa: WPS218
+    """Test suppression updates the stored row."""
+    table: EntryTable[str] = EntryTable()
+    assert table.suppress(CACHE_KEY, 3600).suppressed == 0
+    assert table.suppress(CACHE_KEY, 3600).suppressed == 1
+    record = table.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == 1
+    assert CACHE_KEY in table
+    assert table.get("missing") is None
+
+
+def test_table_items() -> None:
+    """Test rows are yielded in insertion order."""
+    table: EntryTable[int] = EntryTable()
+    table.put(2, CacheRecord.from_values(20, 0, 30))
+    table.put(1, CacheRecord.from_values(10, 3, 40))
+    table.put(2, CacheRecord.from_values(21, 1, 31))
+    expected = [(2, 21, 1, 31), (1, 10, 3, 40)]
+    assert list(table.items()) == expected
+    assert len(table) == 2
+
+
+def test_table_evicts_least_recently_used() -> None:
+    """Test a bounded table evicts the least recently used key."""
+    removed: List[str] = []
+    table: EntryTable[str] = EntryTable(2, removed.append)
+    table.suppress("first", 3600)
+    table.suppress("second", 3600)
+    table.suppress("first", 3600)
+    table.suppress("third", 3600)
+    assert len(table) == 2
+    assert "second" not in table
+    assert removed == ["second"]
+
+
+def test_table_prune() -> None:
+    """Test prune removes expired rows a budget at a time."""
+    table: EntryTable[int] = EntryTable()
+    for key in range(6):
+        expires = key % 2 * 100
+        table.put(key, CacheRecord.from_values(0, 0, expires))
+    assert table.prune(50, 3) + table.prune(50, 3) == 3
+    assert len(table) == 3
+    assert table.prune(50, 10) == 0
+    assert table.delete(1)
+    assert not table.delete(1)
@@ -0,0 +1,89 @@
+"""Test level module test_handler for dailylog-lib."""
+
+import logging
+import queue
+from logging.handlers import QueueListener
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.handler import (
+    DailylogHandler,
+    DailylogQueueHandler,
+    suppression_key,
+)
+from tests.conftest import _occ_file
+
+
+def _daily_handler(tmp_path: Path, suppress: int = 3600) -> DailylogHandler:
+    """Return a DailylogHandler logging to tmp_path."""
+    return DailylogHandler(
+        Cache(cache=str(tmp_path / "dailylog.json")),
+        suppress=suppress,
+        logfn=str(tmp_path / "daily.log"),
+    )
+
+
+def _third_party(sink: logging.Handler) -> logging.Logger:
+    """Return a stdlib logger using only sink."""
+    third_party = logging.getLogger("third.party")
+    third_party.propagate = False
+    third_party.handlers = [sink]
+    third_party.setLevel(logging.INFO)
+    return third_party
+
+
+def test_suppression_key() -> None:
+    """Test the key ignores the arguments of the message template."""
+    first = logging.LogRecord("lib", logging.INFO, "", 0, "got %s", (1,), None)
+    second = logging.LogRecord("lib", logging.INFO, "", 0, "got %s", (2,), None)
+    assert suppression_key(first) == suppression_key(second) == "lib:20:got %s"
+
+
+def test_handler_suppresses(
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+) -> None:
+    """Test repeats of a third party message only reach the log file."""
+    daily_handler = _daily_handler(tmp_path)
+    third_party = _third_party(daily_handler)
+    third_party.warning("retry %d", 1)
+    third_party.warning("retry %d", 2)
+    daily_handler.close()
+    assert capsys.readouterr().err == "WARNING: retry 1\n"
+    log_fn = str(tmp_path / "daily.log")
+    assert _occ_file(log_fn, "WARNING: retry 1") == 1
+    assert _occ_file(log_fn, "WARNING: retry 2") == 1
+
+
+def test_handler_no_suppress(
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+) -> None:
+    """Test suppress 0 appends records without the terminal or cache."""
+    daily_handler = _daily_handler(tmp_path, suppress=0)
+    _third_party(daily_handler).info("plain %s", "line")
+    daily_handler.close()
+    assert daily_handler.cache._config is None  # noqa: WPS437
+    assert not capsys.readouterr().err
+    assert _occ_file(str(tmp_path / "daily.log"), "INFO: plain line") == 1
+    assert not daily_handler.cache.cache["entries"]
+
+
+def test_queue_listener(
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+) -> None:
+    """Test records keep their key through a QueueHandler and listener."""
+    records: queue.Queue[logging.LogRecord] = queue.Queue()
+    daily_handler = _daily_handler(tmp_path)
+    listener = QueueListener(records, daily_handler)
+    listener.start()
+    third_party = _third_party(DailylogQueueHandler(records))
+    for attempt in range(3):
+        third_party.error("failed attempt %d", attempt)
+    listener.stop()
+    daily_handler.close()
+    assert capsys.readouterr().err == "ERROR: failed attempt 0\n"
+    assert _occ_file(str(tmp_path / "daily.log"), "failed attempt") == 3
@@ -0,0 +1,64 @@
+"""Test level module test_handles for dailylog-lib."""
+
+import os
+from pathlib import Path
+
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.handles import HandlePool
+from tests.conftest import _occ_file
+
+LOG_FN = "/var/log/daily.log"
+LOG_ALT = "/var/log/other.log"
+MESSAGE = "Do not eat yellow snow."
+
+
+def test_handle_reused(fs: FakeFilesystem) -> None:
+    """Test handle stays open between writes."""
+    fs.create_dir(Path(LOG_FN).parent)
+    pool = HandlePool()
+    pool.write(LOG_FN, "one\n")
+    stream = pool._handles[LOG_FN][0]
+    pool.write(LOG_FN, "two\n")
+    assert pool._handles[LOG_FN][0] is stream
+    assert Path(LOG_FN).read_text() == "one\ntwo\n"
+    pool.close()
+    assert not pool
+
+
+def test_handle_reopened_after_rotation(fs: FakeFilesystem) -> None:
+    """Test handle is reopened when the file is moved or deleted."""
+    fs.create_dir(Path(LOG_FN).parent)
+    pool = HandlePool()
+    pool.write(LOG_FN, "one\n")
+    os.rename(LOG_FN, "{0}.1".format(LOG_FN))
+    pool.write(LOG_FN, "two\n")
+    assert Path(LOG_FN).read_text() == "two\n"
+    os.remove(LOG_FN)
+    pool.write(LOG_FN, "three\n")
+    assert Path(LOG_FN).read_text() == "three\n"
+    pool.close()
+
+
+def test_handle_lru_eviction(fs: FakeFilesystem) -> None:
+    """Test least recently used handle is closed when the cap is reached."""
+    fs.create_dir(Path(LOG_FN).parent)
+    pool = HandlePool(max_handles=1)
+    pool.write(LOG_FN, "one\n")
+    pool.write(LOG_ALT, "two\n")
+    assert LOG_FN not in pool
+    assert LOG_ALT in pool
+    assert len(pool) == 1
+    pool.close(LOG_ALT)
+    assert not pool
+
+
+def test_cache_context_manager(fs: FakeFilesystem) -> None:
+    """Test leaving the context closes the pooled handles."""
+    fs.create_dir(Path(LOG_FN).parent)
+    with Cache() as cache:
+        cache.log_message("test", MESSAGE, logfn=LOG_FN, quiet=True)
+        assert LOG_FN in Cache.handles
+    assert LOG_FN not in Cache.handles
+    assert _occ_file(LOG_FN, MESSAGE) == 1
@@ -0,0 +1,104 @@
+"""Test level module test_importtime for dailylog-lib."""
+
+import os
+import subprocess  # noqa: S404
+import sys
+from typing import Dict
+
+# microseconds, importing dailylog_lib.logger took about 120 ms before the
+# heavy imports were deferred and about 55 ms after on the same machine, the
+# best of RUNS imports absorbs a cold disk cache or a busy CI runner
+CONST_IMPORT_BUDGET = 100000
+RUNS = 5
+# counts Path.home() calls made while importing the logger
+COUNT_HOME = """
+import pathlib
+calls = []
+home = pathlib.Path.home
+pathlib.Path.home = classmethod(lambda cls: calls.append(1) or home())
+import dailylog_lib.logger
+print(len(calls))
+"""
+DEFERRED = (
+    "concurrent.futures",
+    "gzip",
+    "logging",
+    "lzma",
+    "mmap",
+    "sqlite3",
+    "tempfile",
+    "tomllib",
+    "wtforglib.dirs",
+    "wtforglib.files",
+    "yaml",
+)
+
+
+def _environment() -> Dict[str, str]:
+    """Return the environment without the coverage plugin variables.
+
+    Returns
+    -------
+    Dict[str, str]
+        The environment of the child interpreter
+    """
+    return {
+        name: valor
+        for name, valor in os.environ.items()
+        if not name.startswith("COV_CORE")
+    }
+
+
+def _import_times(module: str) -> Dict[str, int]:
+    """Return the cumulative import time of every module imported by module.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module to import in a fresh interpreter
+
+    Returns
+    -------
+    Dict[str, int]
+        Cumulative microseconds by module name
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", "import {0}".format(module)],
+        capture_output=True,
+        check=True,
+        env=_environment(),
+        text=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def test_heavy_imports_deferred() -> None:
+    """Test importing the logger does not load the deferred modules."""
+    times = _import_times("dailylog_lib.logger")
+    assert "dailylog_lib.logger" in times
+    assert not set(DEFERRED).intersection(times)
+
+
+def test_home_not_resolved() -> None:
+    """Test importing the logger does not look up the home directory."""
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", COUNT_HOME],
+        capture_output=True,
+        check=True,
+        env=_environment(),
+        text=True,
+    )
+    assert completed.stdout.strip() == "0"
+
+
+def test_import_budget() -> None:
+    """Test the best of a few imports of the logger stays within budget."""
+    best = min(
+        _import_times("dailylog_lib.logger")["dailylog_lib.logger"] for _ in range(RUNS)
+    )
+    assert best < CONST_IMPORT_BUDGET
@@ -0,0 +1,165 @@
+"""Test level module test_journal for dailylog-lib."""
+
+import threading
+import time
+from functools import partialmethod
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.journal import (
+    HEADER_SIZE,
+    JOURNAL_RECORD,
+    JournalEntry,
+    JournalStore,
+)
+from dailylog_lib.record import CONST_DAY, CacheRecord
+
+CACHE_KEY = "test"
+MESSAGE = "Do not eat yellow snow."
+COMPACT_SNAPSHOT = JournalStore._compact_snapshot  # noqa: WPS437
+
+
+def _record(shown: int, suppressed: int, expires: int = 0) -> CacheRecord:
+    """Return a cache record."""
+    return CacheRecord.from_values(shown, suppressed, expires or shown + CONST_DAY)
+
+
+def test_journal_replay(tmp_path: Path) -> None:
+    """Test the last record of a key wins on replay."""
+    path = tmp_path / "dailylog.journal"
+    store = JournalStore(path)
+    store.load()
+    store.put(CACHE_KEY, _record(1, 0))
+    store.save()
+    store.put(CACHE_KEY, _record(1, 5))
+    store.put("other", _record(2, 0))
+    store.close()
+    assert path.stat().st_size == HEADER_SIZE + 3 * JOURNAL_RECORD.size
+    replayed = JournalStore(path)
+    replayed.load()
+    assert len(replayed) == 2
+    record = replayed.get(CACHE_KEY)
+    assert record is not None
+    assert record.to_dict() == {
+        "shown": 1,
+        "suppressed": 5,
+        "expires": 1 + CONST_DAY,
+    }
+    assert replayed.get("missing") is None
+
+
+def test_journal_torn_record(tmp_path: Path) -> None:
+    """Test a partially written record is dropped."""
+    path = tmp_path / "dailylog.journal"
+    store = JournalStore(path)
+    store.load()
+    store.put(CACHE_KEY, _record(1, 0))
+    store.close()
+    with open(path, "ab") as journal:
+        journal.write(b"\x01\x02\x03")
+    store.load()
+    assert len(store) == 1
+    assert path.stat().st_size == HEADER_SIZE + JOURNAL_RECORD.size
+
+
+def test_journal_compaction(tmp_path: Path) -> None:
+    """Test the journal is compacted when it exceeds the ratio."""
+    path = tmp_path / "dailylog.journal"
+    store = JournalStore(path, compact_ratio=2, compact_minimum=4)
+    store.load()
+    for suppressed in range(5):
+        store.put(CACHE_KEY, _record(1, suppressed))
+        store.save()
+    store.close()
+    assert store.journal_records == 1
+    store.load()
+    record = store.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == 4
+
+
+def _delayed_compaction(
+    store: JournalStore,
+    release: threading.Event,
+    snapshot: Dict[int, JournalEntry],
+) -> None:
+    """Run JournalStore._compact_snapshot once release is set."""
+    release.wait()
+    COMPACT_SNAPSHOT(store, snapshot)
+
+
+def _save_during_compaction(path: Path, release: threading.Event) -> None:
+    """Save records, the last one after the compaction snapshot was taken."""
+    store = JournalStore(path, max_entries=3, compact_ratio=1, compact_minimum=4)
+    store.load()
+    for shown in range(1, 6):
+        store.put("key{0}".format(shown % 3), _record(shown, shown))
+        store.save()
+    store.put("first", _record(10, 10))  # evicts and moves a row
+    store.save()
+    release.set()
+    store.close()
+
+
+def test_journal_compaction_snapshot(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test changes made while a compaction is delayed survive it."""
+    path = tmp_path / "dailylog.journal"
+    release = threading.Event()
+    delayed = partialmethod(_delayed_compaction, release)
+    monkeypatch.setattr(JournalStore, "_compact_snapshot", delayed)
+    _save_during_compaction(path, release)
+    store = JournalStore(path)
+    store.load()
+    assert store.get("key0") is None
+    for key, shown in (("key1", 4), ("key2", 5), ("first", 10)):
+        record = store.get(key)
+        assert record is not None
+        assert (record.shown, record.suppressed) == (shown, shown)
+
+
+def test_journal_tombstones(tmp_path: Path) -> None:
+    """Test evicted and pruned keys stay removed after replay."""
+    path = tmp_path / "dailylog.journal"
+    later = int(time.time()) + 60
+    store = JournalStore(path, max_entries=2)
+    store.load()
+    store.put("first", _record(1, 0, later))
+    store.put("second", _record(1, 0, 2))
+    store.put(CACHE_KEY, _record(1, 0, later))
+    assert store.prune(2) == 1
+    store.close()
+    replayed = JournalStore(path, max_entries=2)
+    replayed.load()
+    assert replayed.get("first") is None
+    assert replayed.get("second") is None
+    assert len(replayed) == 1
+
+
+def test_journal_invalid(tmp_path: Path) -> None:
+    """Test a file that is not a journal is rejected."""
+    path = tmp_path / "dailylog.journal"
+    path.write_text("{}")
+    with pytest.raises(ValueError, match="Not a dailylog journal"):
+        JournalStore(path).load()
+
+
+def test_cache_journal_backend(tmp_path: Path) -> None:
+    """Test the journal backend is selected by the cache suffix."""
+    log_fn = str(tmp_path / "daily.log")
+    cache_fn = str(tmp_path / "dailylog.journal")
+    config_fn = str(tmp_path / "dailylog.yaml")
+    with Cache(cache=cache_fn, config=config_fn) as cache:
+        assert isinstance(cache.store, JournalStore)
+        cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn, quiet=False)
+        cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn, quiet=False)
+    reloaded = Cache(cache=cache_fn, config=config_fn)
+    record = reloaded.store.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == 1
+    reloaded.close()
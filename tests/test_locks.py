@@ -0,0 +1,166 @@
+"""Test level module test_locks for dailylog-lib."""
+
+import functools
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+from wtforglib.kinds import StrAnyDict
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.locks import Flusher, StripedLock
+from dailylog_lib.record import CONST_DAY
+from dailylog_lib.storage import Snapshot
+
+THREADS = 8
+ROUNDS = 250
+KEYS = 10
+MESSAGE = "Do not eat yellow snow."
+
+
+def test_striped_lock() -> None:
+    """Test a key always maps to the same held stripe."""
+    locks = StripedLock(4)
+    assert len(locks) == 4
+    with locks.hold("key") as stripe:
+        assert stripe == locks.index("key")
+    held = locks._locks  # noqa: WPS437
+    with locks.hold_all():
+        assert not any(lock.acquire(blocking=False) for lock in held)
+
+
+def test_flusher_coalesces() -> None:
+    """Test requests made before a flush starts share that flush."""
+    flushes: List[int] = []
+    flushed = threading.Event()
+
+    def callback() -> None:  # noqa: WPS430
+        flushes.append(len(flushes))
+        flushed.set()
+
+    flusher = Flusher(callback, interval=0.05)
+    for _ in range(100):
+        flusher.request()
+    assert flushed.wait(5)
+    flusher.close()
+    assert flushes == [0]
+
+
+def _hammer(cache: Cache, log_fn: str, offset: int) -> None:
+    """Suppress every key ROUNDS times starting at offset."""
+    for index in range(ROUNDS):
+        key = "key{0}".format((index + offset) % KEYS)
+        cache.log_message(key, MESSAGE, logfn=log_fn, suppress=CONST_DAY)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".journal", ".sqlite"])
+def test_thread_safe_totals(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    suffix: str,
+) -> None:
+    """Test threads sharing a cache never lose a suppressed count."""
+    cache_fn = str(tmp_path / "dailylog{0}".format(suffix))
+    log_fn = str(tmp_path / "daily.log")
+    cache = Cache(
+        cache=cache_fn,
+        config=str(tmp_path / "dailylog.yaml"),
+        thread_safe=True,
+        lock_stripes=4,
+    )
+    workers = [
+        threading.Thread(target=_hammer, args=(cache, log_fn, offset))
+        for offset in range(THREADS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    cache.close()
+    assert cache.dirty == 0
+    assert capsys.readouterr().err.count(MESSAGE) == KEYS
+    assert len(Path(log_fn).read_text().splitlines()) == THREADS * ROUNDS
+    reloaded = Cache(cache=cache_fn, config=str(tmp_path / "dailylog.yaml"))
+    calls = THREADS * ROUNDS // KEYS
+    for key in range(KEYS):
+        record = reloaded.store.get("key{0}".format(key))
+        assert record is not None
+        assert record.suppressed == calls - 1
+    reloaded.close()
+
+
+def _slow_write(
+    write_snapshot: Callable[[Snapshot], Optional[StrAnyDict]],
+    writing: threading.Event,
+    release: threading.Event,
+    snapshot: Snapshot,
+) -> Optional[StrAnyDict]:
+    """Signal writing and wait for release before writing the snapshot."""
+    writing.set()
+    release.wait(5)
+    return write_snapshot(snapshot)
+
+
+def _slow_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    release: threading.Event,
+) -> Cache:
+    """Return a thread safe cache whose flusher is writing until release."""
+    writing = threading.Event()
+    cache = Cache(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+        thread_safe=True,
+        lock_stripes=4,
+    )
+    store = cache.store
+    slow = functools.partial(_slow_write, store.write_snapshot, writing, release)
+    monkeypatch.setattr(store, "write_snapshot", slow)
+    cache.log_message("first", MESSAGE, logfn=str(tmp_path / "daily.log"))
+    assert writing.wait(5)
+    return cache
+
+
+def test_logging_during_slow_save(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test threads keep logging while a save writes the cache file."""
+    release = threading.Event()
+    cache = _slow_cache(tmp_path, monkeypatch, release)
+    logger = threading.Thread(
+        target=_hammer,
+        args=(cache, str(tmp_path / "daily.log"), 0),
+    )
+    logger.start()
+    logger.join(5)
+    still_logging = logger.is_alive()
+    release.set()
+    logger.join()
+    cache.close()
+    assert not still_logging
+
+
+def test_slow_save_totals(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test changes made while a save writes the cache file are saved."""
+    release = threading.Event()
+    cache = _slow_cache(tmp_path, monkeypatch, release)
+    _hammer(cache, str(tmp_path / "daily.log"), 0)
+    release.set()
+    cache.close()
+    assert capsys.readouterr().err.count(MESSAGE) == KEYS + 1
+    reloaded = Cache(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+    )
+    record = reloaded.store.get("key0")
+    reloaded.close()
+    assert record is not None
+    assert record.suppressed == ROUNDS // KEYS - 1
@@ -1,8 +1,24 @@
 """Tests level module test_log_levels for dailylog-lib."""
 
 import logging
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
 
-from dailylog_lib.logger import LOG_LEVELS, log_label, log_level
+import pytest
+
+from dailylog_lib import logger as logger_module
+from dailylog_lib.logger import (
+    LEVEL_LABELS,
+    LEVEL_NOTICE,
+    LEVEL_TRACE,
+    LOG_LEVELS,
+    Logger,
+    add_level,
+    log_label,
+    log_level,
+)
 
 
 def test_creation_default_config() -> None:
@@ -12,3 +28,59 @@ def test_creation_default_config() -> None:
         assert log_label(str(LOG_LEVELS[key])) == key
     assert log_level("42") == logging.WARNING
     assert log_label("wtf") == "WARNING"
+
+
+def test_intermediate_levels() -> None:
+    """Test the TRACE and NOTICE levels and lookups by any spelling."""
+    assert log_level("trace") == LEVEL_TRACE
+    assert log_level(LEVEL_NOTICE) == LEVEL_NOTICE
+    assert log_level("Notice") == LEVEL_NOTICE
+    assert log_level(42) == logging.WARNING
+
+
+def test_intermediate_labels() -> None:
+    """Test the TRACE and NOTICE labels are found by number and name."""
+    assert log_label("25") == "NOTICE"
+    assert log_label("Trace") == "TRACE"
+
+
+@pytest.fixture
+def _level_tables() -> Iterator[None]:
+    """Restore the level tables changed by add_level()."""
+    with ExitStack() as stack:
+        stack.enter_context(patch.dict(logger_module._levels))  # noqa: WPS437
+        stack.enter_context(patch.dict(logger_module._labels))  # noqa: WPS437
+        stack.enter_context(patch.dict(logger_module._label_table))  # noqa: WPS437
+        stack.enter_context(patch.dict(logger_module._level_table))  # noqa: WPS437
+        yield
+
+
+@pytest.mark.usefixtures("_level_tables")
+def test_add_level() -> None:
+    """Test custom levels are resolved like the builtin ones."""
+    add_level("verbose", 15)
+    assert log_level("VERBOSE") == 15
+    assert log_label("15") == "VERBOSE"
+    assert LEVEL_LABELS[15] == "VERBOSE"
+    with pytest.raises(ValueError, match="number"):
+        add_level("15", 15)
+
+
+def test_level_methods(capsys: pytest.CaptureFixture[str], tmp_path: Path) -> None:
+    """Test the level methods log with their own label."""
+    logger = Logger(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+        level="trace",
+    )
+    logger.trace("traced")
+    logger.notice("noticed")
+    stderr = capsys.readouterr().err
+    assert "TRACE: traced" in stderr
+    assert "NOTICE: noticed" in stderr
+
+
+def test_add_level_restored() -> None:
+    """Test the level added by test_add_level is gone again."""
+    assert 15 not in LEVEL_LABELS
+    assert log_level("verbose") == logging.WARNING
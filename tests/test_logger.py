@@ -5,7 +5,7 @@ from pathlib import Path
 import pytest
 from pyfakefs.fake_filesystem import FakeFilesystem
 
-from dailylog_lib.logger import Logger
+from dailylog_lib.logger import LEVEL_ERROR, Logger, get_logger, release_logger
 from tests.conftest import _occ_file, _occ_str
 
 LOG_FN = "/var/log/daily.log"
@@ -119,3 +119,50 @@ def test_logger_level_critical(
     match = MATCH_FMT.format("CRITICAL", "testing")
     assert _occ_str(match, err) == 1
     assert _occ_file(LOG_FN, match) == 1
+
+
+def test_logger_lazy_files(fs: FakeFilesystem) -> None:
+    """Test construction and logging without a key touch no config or cache."""
+    fs.create_dir(Path(LOG_FN).parent)
+    logger = Logger(level="INFO")
+    logger.info(MESSAGE, logfn=LOG_FN, quiet=True)
+    logger.close()
+    assert not Path(logger.config_fn).exists()
+    assert not Path(logger.cache_fn).exists()
+    logger.log(MESSAGE, logfn=LOG_FN, key=CACHE_KEY)
+    assert Path(logger.cache_fn).is_file()
+    assert not Path(logger.config_fn).exists()
+
+
+def test_shared_logger(fs: FakeFilesystem) -> None:
+    """Test get_logger shares one instance per set of arguments."""
+    fs.create_dir(Path(LOG_FN).parent)
+    first = get_logger(level="DEBUG")
+    second = get_logger(level="DEBUG")
+    other = get_logger(cache="/tmp/other.json")
+    assert first is second
+    assert first is not other
+    first.log(MESSAGE, logfn=LOG_FN, key=CACHE_KEY)
+    record = second.store.get(CACHE_KEY)
+    assert record is not None
+    release_logger(first)
+    release_logger(second)
+    release_logger(other)
+    fresh = get_logger(level="ERROR")
+    assert fresh is not first
+    with pytest.raises(ValueError, match="Not a shared logger"):
+        release_logger(first)
+    release_logger(fresh)
+
+
+def test_shared_logger_options(fs: FakeFilesystem) -> None:
+    """Test get_logger shares no instance between other options."""
+    fs.create_dir(Path(LOG_FN).parent)
+    verbose = get_logger(level="DEBUG")
+    quiet = get_logger(level="ERROR")
+    assert quiet is not verbose
+    assert quiet._level == LEVEL_ERROR  # noqa: WPS437
+    release_logger(verbose)
+    assert get_logger(level="ERROR") is quiet
+    release_logger(quiet)
+    release_logger(quiet)
@@ -0,0 +1,60 @@
+"""Test level module test_message for dailylog-lib."""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from dailylog_lib.logger import Logger
+from dailylog_lib.message import prefix_message, render_message
+
+
+class Counted:
+    """Object counting how often it is rendered."""
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self.calls: List[int] = []
+
+    def __str__(self) -> str:
+        """Return the text counting the call."""
+        self.calls.append(1)
+        return "counted"
+
+
+def _logger(tmp_path: Path) -> Logger:
+    """Return a Logger of the INFO level in tmp_path."""
+    return Logger(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+        level="INFO",
+    )
+
+
+def test_render_message() -> None:
+    """Test templates, mappings and callables are rendered."""
+    assert render_message("x=%s y=%d", (1, 2)) == "x=1 y=2"
+    assert render_message("%(name)s", ({"name": "snow"},)) == "snow"
+    assert render_message(lambda: "built") == "built"
+    assert render_message("100%") == "100%"
+    assert render_message(prefix_message("main", "x=%s", (1,))) == "main - x=1"
+
+
+def test_filtered_not_rendered(tmp_path: Path) -> None:
+    """Test a message below the level is never rendered."""
+    counted = Counted()
+    logger = _logger(tmp_path)
+    logger.debug("value %s", counted)
+    logger.debug(lambda: str(counted))
+    assert not counted.calls
+
+
+def test_rendered_once(capsys: pytest.CaptureFixture[str], tmp_path: Path) -> None:
+    """Test a keyed message is rendered once for the terminal and file."""
+    counted = Counted()
+    log_fn = tmp_path / "daily.log"
+    logger = _logger(tmp_path)
+    logger.error("value %s", counted, key="key", logfn=str(log_fn), caller="main")
+    assert len(counted.calls) == 1
+    assert "ERROR: main - value counted" in capsys.readouterr().err
+    assert "main - value counted" in log_fn.read_text()
@@ -0,0 +1,69 @@
+"""Test level module test_metrics for dailylog-lib."""
+
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.logger import Logger
+from dailylog_lib.metrics import Histogram
+
+MESSAGE = "Do not eat yellow snow."
+
+
+def _log_messages(tmp_path: Path) -> Path:
+    """Log two messages with the same key and one without a key."""
+    log_fn = tmp_path / "daily.log"
+    Cache.enable_metrics()
+    logger = Logger(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+    )
+    logger.log_message("key", MESSAGE, logfn=str(log_fn))
+    logger.log_message("key", MESSAGE, logfn=str(log_fn))
+    logger.log(MESSAGE, label="INFO", quiet=True)
+    logger.close()
+    return log_fn
+
+
+def test_metrics_disabled() -> None:
+    """Test nothing is collected unless metrics are enabled."""
+    with pytest.raises(ValueError, match="set them with Cache.enable_metrics()"):
+        Logger(cache="/tmp/dailylog.json", metrics=True)
+    assert Cache.metrics is None
+    assert not Cache.stats()
+    with pytest.raises(ValueError, match="not enabled"):
+        Cache.export_metrics("/tmp/dailylog.prom")
+
+
+def test_histogram_buckets() -> None:
+    """Test histogram snapshots count observations cumulatively."""
+    histogram = Histogram((0.001, 0.01))
+    for seconds in (0.0005, 0.001, 0.005, 2.0):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(2.0065)
+    assert list(snapshot["buckets"].values()) == [2, 3]
+
+
+def test_logger_stats(tmp_path: Path) -> None:
+    """Test logging counts messages, suppressions, saves and bytes."""
+    log_fn = _log_messages(tmp_path)
+    stats = Cache.stats()
+    assert stats["messages"] == {"ERROR": 2, "INFO": 1}
+    assert stats["suppressed"] == 1
+    assert stats["saves"] == stats["save_cache"]["count"] == 2
+    assert stats["append_daily"]["count"] == 2
+    assert stats["bytes_written"] == log_fn.stat().st_size
+
+
+def test_export_metrics(tmp_path: Path) -> None:
+    """Test metrics are exported in the Prometheus text format."""
+    _log_messages(tmp_path)
+    prom_fn = tmp_path / "dailylog.prom"
+    Cache.export_metrics(str(prom_fn))
+    exported = prom_fn.read_text()
+    assert 'dailylog_messages_total{level="ERROR"} 2' in exported
+    assert "dailylog_suppressed_total 1" in exported
+    assert 'dailylog_append_daily_seconds_bucket{le="+Inf"} 2' in exported
@@ -0,0 +1,96 @@
+"""Test level module test_mmapstore for dailylog-lib."""
+
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.mmapstore import MMAP_HEADER, MMAP_SLOT, MmapStore
+from dailylog_lib.record import CacheRecord
+
+CACHE_KEY = "test"
+MESSAGE = "Do not eat yellow snow."
+WORKERS = 4
+ROUNDS = 50
+
+
+def _record(shown: int, expires: int) -> CacheRecord:
+    """Return a cache record shown at shown and expiring at expires."""
+    return CacheRecord.from_values(shown, 0, expires)
+
+
+def _suppress_many(path: str) -> None:
+    """Suppress the test key ROUNDS times through a private mapping."""
+    store = MmapStore(Path(path))
+    for _ in range(ROUNDS):
+        store.suppress(CACHE_KEY, 3600)
+    store.close()
+
+
+def test_mmap_shared_between_processes(tmp_path: Path) -> None:
+    """Test processes mapping one table never lose a suppressed count."""
+    path = tmp_path / "dailylog.mmap"
+    store = MmapStore(path, stripes=8, stripe_slots=4)
+    store.load()
+    ctx = multiprocessing.get_context("fork")
+    workers = [
+        ctx.Process(target=_suppress_many, args=(str(path),)) for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    record = store.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == WORKERS * ROUNDS - 1
+    assert path.stat().st_size == MMAP_HEADER.size + 32 * MMAP_SLOT.size
+    store.close()
+
+
+def test_mmap_full_stripe_reuses_oldest(tmp_path: Path) -> None:
+    """Test a full stripe reuses the slot shown longest ago."""
+    now = int(time.time())
+    store = MmapStore(tmp_path / "dailylog.mmap", stripes=1, stripe_slots=2)
+    store.load()
+    store.put("first", _record(now - 2, now + 60))
+    store.put("second", _record(now - 1, now + 60))
+    store.put("third", _record(now, now + 60))
+    assert len(store) == 2
+    assert store.get("first") is None
+    assert store.get("second") is not None
+    store.close()
+
+
+def test_mmap_reuses_expired_slot(tmp_path: Path) -> None:
+    """Test a new key takes an expired slot before the oldest live one."""
+    now = int(time.time())
+    store = MmapStore(tmp_path / "dailylog.mmap", stripes=1, stripe_slots=2)
+    store.load()
+    store.put("first", _record(now - 2, now + 60))
+    store.put("second", _record(now - 1, now - 1))
+    store.put("third", _record(now, now + 60))
+    assert store.get("first") is not None
+    assert store.get("second") is None
+    store.close()
+
+
+def test_mmap_invalid(tmp_path: Path) -> None:
+    """Test a file that is not a table is rejected."""
+    path = tmp_path / "dailylog.mmap"
+    path.write_text("{}")
+    with pytest.raises(ValueError, match="Not a dailylog table"):
+        MmapStore(path).load()
+
+
+def test_cache_mmap_backend(tmp_path: Path) -> None:
+    """Test the mmap backend is selected by the cache suffix."""
+    log_fn = str(tmp_path / "daily.log")
+    cache_fn = str(tmp_path / "dailylog.mmap")
+    config_fn = str(tmp_path / "dailylog.yaml")
+    with Cache(cache=cache_fn, config=config_fn) as cache:
+        assert isinstance(cache.store, MmapStore)
+        assert cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn)
+        assert not cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn)
+        assert len(cache.cache["entries"]) == 1
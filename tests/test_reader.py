@@ -0,0 +1,109 @@
+"""Test level module test_reader for dailylog-lib."""
+
+import mmap
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.compress import compress_file
+from dailylog_lib.reader import (
+    LogBuffer,
+    LogEntry,
+    LogQuery,
+    parse_entries,
+    parse_line,
+)
+
+START = 1792245789
+MIDDLE = START + 500
+UTC_STAMP = datetime(2026, 10, 17, 14, 3, 9, tzinfo=timezone.utc)
+LABELS = ("INFO", "WARNING", "ERROR")
+
+
+def _write_log(log_fn: Path, first: int, count: int) -> List[str]:
+    """Write count epoch stamped lines, one per second, and return them."""
+    lines = [
+        "{0} {1}: message {2}".format(second, LABELS[second % 3], second)
+        for second in range(first, first + count)
+    ]
+    log_fn.write_text("".join("{0}\n".format(line) for line in lines))
+    return lines
+
+
+def test_parse_local_line() -> None:
+    """Test a line with a local stamp and suppressed count is parsed."""
+    local = parse_line("Sat Oct 17 14:03:09 PM CEST 2026 ERROR: a: b [3]\n")
+    assert isinstance(local, LogEntry)
+    assert local.time == datetime(2026, 10, 17, 14, 3, 9).timestamp()
+    assert (local.label, local.message, local.count) == ("ERROR", "a: b", 3)
+    assert parse_line("ValueError: not a log line") is None
+
+
+def test_parse_stamp_formats() -> None:
+    """Test lines with ISO-8601 and epoch stamps are parsed."""
+    iso = parse_line("2026-10-17T14:03:09+00:00 INFO: text")
+    assert iso is not None
+    assert iso.time == UTC_STAMP.timestamp()
+    epoch = parse_line("1792245789 WARNING: text [x]")
+    assert epoch is not None
+    assert str(epoch) == "1792245789 WARNING: text [x]"
+
+
+def test_parse_entries() -> None:
+    """Test lines without a stamp are appended to the previous entry."""
+    lines = ["orphan\n", "1 ERROR: failed\n", "Traceback: x\n", "2 INFO: done\n"]
+    entries = list(parse_entries(lines))
+    assert [entry.message for entry in entries] == ["failed\nTraceback: x", "done"]
+
+
+def test_seek(tmp_path: Path) -> None:
+    """Test bisecting finds the first line stamped since a time."""
+    log_fn = tmp_path / "daily.log"
+    lines = _write_log(log_fn, START, 1000)
+    with open(log_fn, "rb") as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            log_buffer = LogBuffer(buffer)
+            offset = log_buffer.seek(MIDDLE)
+            assert next(log_buffer.lines(offset)) == lines[500]
+            assert log_buffer.seek(0) == 0
+            assert log_buffer.seek(START + 5000) >= len(buffer)
+
+
+def test_read(tmp_path: Path) -> None:
+    """Test time, label and text filters of a plain log file."""
+    log_fn = tmp_path / "daily.log"
+    _write_log(log_fn, START, 1000)
+    since = START + 100
+    query = LogQuery(since=since, until=since + 99, labels=["error"])
+    entries = list(query.read(str(log_fn)))
+    assert len(entries) == 33
+    assert all(entry.label == "ERROR" for entry in entries)
+    needle = "message {0}".format(START + 42)
+    found = LogQuery(contains=needle).read(str(log_fn))
+    assert [entry.message for entry in found] == [needle]
+
+
+def test_search_partitions(tmp_path: Path) -> None:
+    """Test partitions are searched in order, compressed ones included."""
+    for day, first in enumerate((START, START + 100, START + 200)):
+        _write_log(tmp_path / "daily-2026-10-{0}.log".format(day + 10), first, 100)
+    compress_file(str(tmp_path / "daily-2026-10-11.log"))
+    oldest = tmp_path / "daily-2026-10-10.log"
+    os.utime(oldest, (START - 10, START - 10))
+    template = str(tmp_path / "daily-{date}.log")
+    found = LogQuery(since=START + 50).search(template)
+    times = [int(entry.time) for entry in found]
+    assert times == list(range(START + 100, START + 300))
+    assert len(list(LogQuery().search(template))) == 300
+
+
+def test_read_appended(tmp_path: Path) -> None:
+    """Test lines written by Cache.append_daily are read back."""
+    Cache.use_stamper("epoch")
+    log_fn = str(tmp_path / "daily.log")
+    Cache.append_daily("ERROR", "disk full", log_fn, 4)
+    Cache.append_daily("INFO", "started", log_fn)
+    entries = list(LogQuery(labels=["ERROR"]).read(log_fn))
+    assert [(entry.message, entry.count) for entry in entries] == [("disk full", 4)]
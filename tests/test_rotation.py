@@ -0,0 +1,131 @@
+"""Test level module test_rotation for dailylog-lib."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.rotation import (
+    ROTATE_DAY,
+    ROTATE_HOUR,
+    Partition,
+    Rotation,
+    partition_paths,
+    read_partitions,
+)
+
+NOON = datetime(2026, 10, 17, 12, 30).timestamp()
+EVENING = datetime(2026, 10, 17, 23, 59, 59).timestamp()
+MIDNIGHT = datetime(2026, 10, 18).timestamp()
+
+
+def test_day_partition(tmp_path: Path) -> None:
+    """Test the path is rendered once per day."""
+    partition = Partition(str(tmp_path / "daily-{date}.log"), ROTATE_DAY, 0)
+    assert partition.resolve(NOON, 10)
+    assert partition.path == str(tmp_path / "daily-2026-10-17.log")
+    assert not partition.resolve(EVENING, 10)
+    assert partition.resolve(MIDNIGHT, 10)
+    assert partition.path == str(tmp_path / "daily-2026-10-18.log")
+
+
+def test_hour_partition(tmp_path: Path) -> None:
+    """Test hourly partitions and a custom date format."""
+    hourly = Partition(str(tmp_path / "{date}.log"), ROTATE_HOUR, 0)
+    hourly.resolve(NOON, 10)
+    assert hourly.path == str(tmp_path / "2026-10-17-12.log")
+    custom = Partition(str(tmp_path / "log.{date:%Y%m%d}"), ROTATE_DAY, 0)
+    custom.resolve(NOON, 10)
+    assert custom.path == str(tmp_path / "log.20261017")
+    assert Partition(str(tmp_path / "plain.log"), ROTATE_DAY, 0).static
+
+
+def test_size_rollover(tmp_path: Path) -> None:
+    """Test partitions roll over by size and a new process continues them."""
+    template = str(tmp_path / "daily-{date}.log")
+    partition = Partition(template, ROTATE_DAY, 20)
+    partition.resolve(NOON, 15)
+    Path(partition.path).write_text("x" * 15)
+    assert partition.resolve(NOON, 10)
+    assert partition.path == str(tmp_path / "daily-2026-10-17.1.log")
+    Path(partition.path).write_text("x" * 10)
+    restarted = Partition(template, ROTATE_DAY, 20)
+    restarted.resolve(NOON, 5)
+    assert restarted.path == str(tmp_path / "daily-2026-10-17.1.log")
+
+
+def test_size_rollover_bytes(tmp_path: Path) -> None:
+    """Test max_bytes counts the encoded bytes of non-ASCII lines."""
+    Cache.use_rotation(Rotation(max_bytes=200))
+    template = str(tmp_path / "daily-{date}.log")
+    for _ in range(10):
+        Cache.append_daily("INFO", "Schnee ist weiß, ❄❄❄❄❄", template)
+    partitions = partition_paths(template)
+    assert len(partitions) > 1
+    assert all(Path(path).stat().st_size <= 200 for path in partitions)
+
+
+def test_partition_paths(tmp_path: Path) -> None:
+    """Test partitions are listed by date and sequence."""
+    names = [
+        "daily-2026-10-17.10.log",
+        "daily-2026-10-16.log.gz",
+        "daily-2026-10-17.log",
+        "daily-2026-10-17.2.log",
+        "other.log",
+    ]
+    for name in names:
+        (tmp_path / name).write_text("")
+    ordered = [
+        "daily-2026-10-16.log.gz",
+        "daily-2026-10-17.log",
+        "daily-2026-10-17.2.log",
+        "daily-2026-10-17.10.log",
+    ]
+    paths = partition_paths(str(tmp_path / "daily-{date}.log"))
+    assert paths == [str(tmp_path / name) for name in ordered]
+
+
+def test_retention(tmp_path: Path) -> None:
+    """Test old partitions are deleted and closed partitions compressed."""
+    for day in range(13, 18):
+        (tmp_path / "daily-2026-10-{0}.log".format(day)).write_text("day\n")
+    rotation = Rotation(retain=3, compress="gzip")
+    template = str(tmp_path / "daily-{date}.log")
+    rotation.retain_partitions(template, str(tmp_path / "daily-2026-10-17.log"))
+    rotation.join()
+    assert [Path(path).name for path in partition_paths(template)] == [
+        "daily-2026-10-15.log.gz",
+        "daily-2026-10-16.log",
+        "daily-2026-10-17.log",
+    ]
+    assert list(read_partitions(template)) == ["day\n", "day\n", "day\n"]
+
+
+def test_retention_missing_partition(tmp_path: Path) -> None:
+    """Test a partition removed by the compressor is skipped by retention."""
+    for day in range(15, 18):
+        (tmp_path / "daily-2026-10-{0}.log".format(day)).write_text("day\n")
+    rotation = Rotation(retain=2)
+    closed = [str(tmp_path / "daily-2026-10-14.log")]
+    closed.extend(partition_paths(str(tmp_path / "daily-{date}.log"))[:2])
+    kept = rotation._delete_excess(closed)  # noqa: WPS437
+    assert kept == [str(tmp_path / "daily-2026-10-16.log")]
+    assert not (tmp_path / "daily-2026-10-15.log").exists()
+
+
+def test_cache_rotation(tmp_path: Path) -> None:
+    """Test use_rotation selects the rotation of append_daily."""
+    with pytest.raises(ValueError, match="retain apply to all instances"):
+        Cache(cache=str(tmp_path / "dailylog.json"), retain=2)
+    Cache.use_rotation(Rotation(ROTATE_HOUR, retain=2))
+    assert Cache.rotation.period == ROTATE_HOUR
+    assert Cache.rotation.retain == 2
+    template = str(tmp_path / "daily-{date}.log")
+    Cache.append_daily("INFO", "rotated", template)
+    partitions = partition_paths(template)
+    assert len(Path(partitions[0]).name) == len("daily-2026-10-17-12.log")
+    assert "INFO: rotated" in Path(partitions[0]).read_text()
+    with pytest.raises(ValueError, match="Unknown rotation period"):
+        Rotation("week")
@@ -0,0 +1,172 @@
+"""Test level module test_sqlstore for dailylog-lib."""
+
+import multiprocessing
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.record import CONST_DAY, CacheRecord
+from dailylog_lib.sqlstore import SqliteStore
+
+CACHE_KEY = "test"
+MESSAGE = "Do not eat yellow snow."
+WORKERS = 4
+ROUNDS = 200
+
+SqlRow = Tuple[Union[int, str], ...]
+
+
+def _record(shown: int, suppressed: int, expires: int = 0) -> CacheRecord:
+    """Return a cache record."""
+    return CacheRecord.from_values(shown, suppressed, expires or shown + CONST_DAY)
+
+
+class _FailingCommit(object):
+    """Connection wrapper whose first COMMIT fails."""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+        self.failed = False
+
+    def execute(self, sql: str, row: SqlRow = ()) -> sqlite3.Cursor:
+        """Execute sql, raising instead of the first COMMIT."""
+        if sql == "COMMIT" and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.db.execute(sql, row)
+
+    def executemany(self, sql: str, rows: List[SqlRow]) -> sqlite3.Cursor:
+        """Execute sql for every row."""
+        return self.db.executemany(sql, rows)
+
+
+def test_sqlite_wal_and_index(tmp_path: Path) -> None:
+    """Test database uses WAL mode and has an index on shown."""
+    path = tmp_path / "dailylog.sqlite"
+    store = SqliteStore(path)
+    store.load()
+    store.close()
+    db = sqlite3.connect(str(path))
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = db.execute("PRAGMA index_list(entries)").fetchall()
+    assert "entries_shown" in {index[1] for index in indexes}
+    db.close()
+
+
+def test_sqlite_shared_between_stores(tmp_path: Path) -> None:  # noqa: WPS218
+    """Test stores sharing a database only overwrite changed keys."""
+    path = tmp_path / "dailylog.sqlite"
+    first = SqliteStore(path)
+    second = SqliteStore(path)
+    first.load()
+    second.load()
+    first.put(CACHE_KEY, _record(1, 2))
+    assert first.get(CACHE_KEY) is not None
+    assert second.get(CACHE_KEY) is None
+    first.save()
+    second.put("other", _record(3, 0))
+    second.save()
+    record = second.get(CACHE_KEY)
+    assert record is not None
+    assert record.to_dict() == {
+        "shown": 1,
+        "suppressed": 2,
+        "expires": 1 + CONST_DAY,
+    }
+    assert len(first) == 2
+    assert first.delete_shown_before(2) == 1
+    assert set(second.to_dict()["entries"]) == {"other"}
+    first.close()
+    second.close()
+
+
+def test_cache_sqlite_backend(tmp_path: Path) -> None:
+    """Test the SQLite backend is selected by the cache suffix."""
+    log_fn = str(tmp_path / "daily.log")
+    cache_fn = str(tmp_path / "dailylog.sqlite")
+    config_fn = str(tmp_path / "dailylog.yaml")
+    with Cache(cache=cache_fn, config=config_fn) as cache:
+        assert isinstance(cache.store, SqliteStore)
+        cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn)
+        cache.log_message(CACHE_KEY, MESSAGE, logfn=log_fn)
+        assert cache.cache["entries"][CACHE_KEY]["suppressed"] == 1
+
+
+def test_sqlite_evict(tmp_path: Path) -> None:
+    """Test the row count is bounded."""
+    now = int(time.time())
+    store = SqliteStore(tmp_path / "dailylog.sqlite", max_entries=8)
+    store.load()
+    for index in range(12):
+        key = "key{0}".format(index)
+        store.put(key, _record(now + index, 0, now + 60))
+    store.put("expired", _record(now - 60, 0, now - 1))
+    store.save()
+    assert len(store) == 8
+    assert store.get("key0") is None
+    assert store.get("key11") is not None
+    store.close()
+
+
+def test_sqlite_prune(tmp_path: Path) -> None:
+    """Test expired rows are pruned in the next write transaction."""
+    now = int(time.time())
+    store = SqliteStore(tmp_path / "dailylog.sqlite")
+    store.load()
+    store.put("expired", _record(now - 60, 0, now - 1))
+    store.save()
+    assert not store.prune(4)
+    assert store.get("expired") is not None
+    store.suppress(CACHE_KEY, 60)
+    assert store.get("expired") is None
+    store.close()
+
+
+def test_sqlite_failed_commit_keeps_pending(tmp_path: Path) -> None:
+    """Test a failed COMMIT keeps the pending records for the next save."""
+    now = int(time.time())
+    store = SqliteStore(tmp_path / "dailylog.sqlite")
+    store.load()
+    db = store._connection()  # noqa: WPS437
+    store._db = _FailingCommit(db)  # type: ignore[assignment]  # noqa: WPS437
+    store.put(CACHE_KEY, _record(now, 2))
+    with pytest.raises(sqlite3.OperationalError):
+        store.save()
+    store.save()
+    store._db = db  # noqa: WPS437
+    record = store.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == 2
+    store.close()
+
+
+def _suppress_many(path: str) -> None:
+    """Suppress the test key ROUNDS times through a Cache of its own."""
+    config_fn = str(Path(path).with_suffix(".yaml"))
+    cache = Cache(cache=path, config=config_fn)
+    for _ in range(ROUNDS):
+        cache.log_message(CACHE_KEY, MESSAGE, quiet=False, logfn=os.devnull)
+    cache.close()
+
+
+def test_sqlite_shared_between_processes(tmp_path: Path) -> None:
+    """Test processes suppressing one key never lose a suppressed count."""
+    path = tmp_path / "dailylog.sqlite"
+    ctx = multiprocessing.get_context("fork")
+    workers = [
+        ctx.Process(target=_suppress_many, args=(str(path),)) for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store = SqliteStore(path)
+    record = store.get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == WORKERS * ROUNDS - 1
+    store.close()
@@ -0,0 +1,79 @@
+"""Test level module test_stamps for dailylog-lib."""
+
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.stamps import (
+    LOCAL_FORMAT,
+    EpochStamper,
+    IsoStamper,
+    LocalStamper,
+    make_stamper,
+)
+
+SECOND = 1792245789
+
+
+def test_local_stamp_unchanged() -> None:
+    """Test the local stamp matches the traditional format."""
+    expected = datetime.fromtimestamp(SECOND).astimezone().strftime(LOCAL_FORMAT)
+    assert LocalStamper().render(SECOND) == expected
+
+
+def test_iso_and_epoch_stamps() -> None:
+    """Test the ISO-8601 and epoch stamps parse back to the second."""
+    iso = IsoStamper().render(SECOND)
+    assert datetime.fromisoformat(iso).timestamp() == SECOND
+    assert EpochStamper().render(SECOND) == str(SECOND)
+
+
+class CountingStamper(EpochStamper):
+    """Epoch stamper recording the rendered seconds."""
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        super().__init__()
+        self.rendered: List[int] = []
+
+    def render(self, second: int) -> str:
+        """Record and render an epoch second."""
+        self.rendered.append(second)
+        return super().render(second)
+
+
+def test_stamp_cached_per_second(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test render is only called when the second changes."""
+    stamper = CountingStamper()
+    clock = iter([SECOND + 0.1, SECOND + 0.9, SECOND + 1.2])
+    monkeypatch.setattr(time, "time", lambda: next(clock))
+    assert stamper.stamp() == str(SECOND)
+    assert stamper.stamp() == str(SECOND)
+    assert stamper.stamp() == str(SECOND + 1)
+    assert stamper.rendered == [SECOND, SECOND + 1]
+
+
+def test_unknown_stamp() -> None:
+    """Test an unknown format name is rejected."""
+    with pytest.raises(ValueError, match="Unknown stamp format"):
+        make_stamper("julian")
+
+
+def test_cache_use_stamper(tmp_path: Path) -> None:
+    """Test use_stamper selects the format of log lines of all instances."""
+    log_fn = tmp_path / "daily.log"
+    with pytest.raises(ValueError, match="set them with Cache.use_stamper()"):
+        Cache(cache=str(tmp_path / "dailylog.json"), stamp="epoch")
+    Cache.use_stamper("epoch")
+    cache = Cache(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+    )
+    Cache.append_daily("INFO", "epoch stamped", str(log_fn))
+    cache.close()
+    stamp = log_fn.read_text().split()[0]
+    assert abs(int(stamp) - time.time()) < 5
@@ -0,0 +1,64 @@
+"""Test level module test_storage for dailylog-lib."""
+
+from pathlib import Path
+
+import pytest
+
+from dailylog_lib import storage
+from dailylog_lib.record import CONST_DAY, CacheRecord
+
+CACHE_KEY = "test"
+
+
+def _store(path: Path) -> storage.JsonStore:
+    """Return a loaded JSON store."""
+    store = storage.JsonStore(path)
+    store.load()
+    return store
+
+
+def test_json_merge_on_save(tmp_path: Path) -> None:
+    """Test suppressions of two processes sharing the file are summed."""
+    path = tmp_path / "dailylog.json"
+    first = _store(path)
+    first.suppress(CACHE_KEY, CONST_DAY)
+    first.save()
+    second = _store(path)
+    for _ in range(3):
+        first.suppress(CACHE_KEY, CONST_DAY)
+    for _ in range(2):
+        second.suppress(CACHE_KEY, CONST_DAY)
+    second.suppress("other", CONST_DAY)
+    second.save()
+    first.save()
+    record = _store(path).get(CACHE_KEY)
+    assert record is not None
+    assert record.suppressed == 5
+    assert first.get("other") is not None
+
+
+def test_json_save_skips_unchanged(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the file is only re-read when another process wrote it."""
+    store = _store(tmp_path / "dailylog.json")
+    store.suppress(CACHE_KEY, CONST_DAY)
+
+    def fail(path: Path) -> None:  # noqa: WPS430
+        raise AssertionError("re-read {0}".format(path))
+
+    monkeypatch.setattr(storage, "load_json_file", fail)
+    store.save()
+    store.save()
+
+
+def test_merge_record_newest_shown_wins() -> None:
+    """Test the record shown last replaces an older one."""
+    older = CacheRecord.from_values(10, 7, 20)
+    newer = CacheRecord.from_values(15, 1, 25)
+    assert storage.merge_record(older, newer, (10, 7)) is newer
+    assert storage.merge_record(newer, older, (10, 5)) is newer
+    changed = CacheRecord.from_values(10, 9, 20)
+    merged = storage.merge_record(older, changed, (10, 7))
+    assert merged.suppressed == 9
@@ -0,0 +1,106 @@
+"""Test level module test_writer for dailylog-lib."""
+
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from dailylog_lib.cache import Cache
+from dailylog_lib.handles import HandlePool
+from dailylog_lib.metrics import DROPPED, Metrics
+from dailylog_lib.writer import (
+    OVERFLOW_DROP_NEW,
+    OVERFLOW_DROP_OLDEST,
+    BackgroundWriter,
+)
+
+MESSAGE = "Do not eat yellow snow."
+LOG_FN = "daily.log"
+
+
+class GatedPool(HandlePool):
+    """Handle pool recording writes and holding them until opened."""
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        super().__init__()
+        self.gate = threading.Event()
+        self.writes: List[str] = []
+
+    def write(self, log_fn: str, text: str) -> None:
+        """Record text once the gate is open."""
+        self.gate.wait()
+        self.writes.append(text)
+
+
+def _fill(writer: BackgroundWriter, count: int) -> List[bool]:
+    """Queue count lines while the first batch is held at the gate."""
+    queued = [writer.write(LOG_FN, "0\n")]
+    while len(writer):  # wait for the writer thread to take the first line
+        threading.Event().wait(0.001)
+    for index in range(1, count):
+        queued.append(writer.write(LOG_FN, "{0}\n".format(index)))
+    return queued
+
+
+def test_writer_batches_per_file(tmp_path: Path) -> None:
+    """Test queued lines are appended in order."""
+    log_fn = str(tmp_path / "daily.log")
+    writer = BackgroundWriter()
+    for index in range(100):
+        writer.write(log_fn, "{0}\n".format(index))
+    assert writer.flush(timeout=5)
+    writer.close()
+    lines = Path(log_fn).read_text().splitlines()
+    assert lines == [str(index) for index in range(100)]
+    with pytest.raises(ValueError, match="closed writer"):
+        writer.write(log_fn, MESSAGE)
+
+
+def test_writer_drop_new() -> None:
+    """Test the drop-new policy discards lines written to a full queue."""
+    pool = GatedPool()
+    writer = BackgroundWriter(queue_size=2, overflow=OVERFLOW_DROP_NEW, handles=pool)
+    writer.metrics = Metrics()
+    assert _fill(writer, 5) == [True, True, True, False, False]
+    assert writer.dropped == 2
+    assert writer.metrics.counters[DROPPED] == 2
+    pool.gate.set()
+    writer.close()
+    assert "".join(pool.writes) == "0\n1\n2\n"
+
+
+def test_writer_drop_oldest() -> None:
+    """Test the drop-oldest policy discards the oldest queued lines."""
+    pool = GatedPool()
+    writer = BackgroundWriter(queue_size=2, overflow=OVERFLOW_DROP_OLDEST, handles=pool)
+    assert all(_fill(writer, 5))
+    assert writer.dropped == 2
+    pool.gate.set()
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert "".join(pool.writes) == "0\n3\n4\n"
+
+
+def test_writer_unknown_overflow() -> None:
+    """Test an unknown overflow policy is rejected."""
+    with pytest.raises(ValueError, match="Unknown overflow policy"):
+        BackgroundWriter(overflow="drop-all")
+
+
+def test_cache_async_write(tmp_path: Path) -> None:
+    """Test log lines are written by the background writer."""
+    log_fn = str(tmp_path / "daily.log")
+    with pytest.raises(ValueError, match="set them with Cache.start_writer()"):
+        Cache(cache=str(tmp_path / "dailylog.json"), async_write=True)
+    Cache.start_writer()
+    with Cache(
+        cache=str(tmp_path / "dailylog.json"),
+        config=str(tmp_path / "dailylog.yaml"),
+    ) as cache:
+        assert Cache.writer is not None
+        cache.log_message("key", MESSAGE, logfn=log_fn, quiet=True)
+    assert MESSAGE in Path(log_fn).read_text()
+    Cache.stop_writer()
+    assert Cache.writer is None